@@ -0,0 +1,104 @@
+"""
+Extraction cache for linked gedcom files
+
+Scanning a big gedcom file takes a while, and the file rarely changes between
+sessions. The extracted individuals and sources, together with the record
+index of the file, are therefore pickled into a cache file named after the
+gedcom file's path, along with the fingerprint (path, size, mtime and content
+hash) of the version they came from. As long as the fingerprint matches, the
+cache is loaded instead of scanning the file again.
+"""
+
+import hashlib
+import os
+from array import array
+from typing import Callable, List, Optional, Tuple
+from PyQt5.QtCore import QStandardPaths
+from grant.models.gedcom_scanner import GedcomFile
+from grant.models.individuals_model import Individual
+from grant.models.sources_model import Source
+from grant.research.load_cache import read_cache_file, write_cache_file
+
+CACHE_MAGIC = b"GRANTG\x02\n"
+
+
+def default_cache_directory() -> str:
+    """ The user's cache directory for gedcom extractions """
+    location = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return os.path.join(location, "grant", "gedcom")
+
+
+def cache_filename(cache_directory: str, file_path: str) -> str:
+    """ The cache file for the gedcom file at the given path """
+    path = os.path.abspath(file_path)
+    name = hashlib.sha256(path.encode("utf-8")).hexdigest()
+    return os.path.join(cache_directory, name + ".cache")
+
+
+def fingerprint(gedcom_file: GedcomFile) -> tuple:
+    """ Identifies one particular version of a gedcom file """
+    (size, mtime) = gedcom_file.signature
+    content_hash = gedcom_file.content_hash()
+    return (os.path.abspath(gedcom_file.file_path), size, mtime, content_hash)
+
+
+def restore(
+    gedcom_file: GedcomFile, data
+) -> Optional[Tuple[List[Individual], List[Source]]]:
+    """
+    The individuals and sources of cached data, restoring the record index of
+    the file. None if the data doesn't have the expected shape.
+    """
+    try:
+        offsets = array("q")
+        offsets.frombytes(data["offsets"])
+        pointers = dict(data["pointers"])
+        individuals = [Individual(*fields) for fields in data["individuals"]]
+        sources = [Source(*fields) for fields in data["sources"]]
+    except Exception:  # pylint: disable=broad-except
+        return None  # Written by another version, it will be regenerated
+    gedcom_file.offsets = offsets
+    gedcom_file.pointers = pointers
+    return (individuals, sources)
+
+
+def scan_cached(
+    gedcom_file: GedcomFile,
+    cache_directory: str = None,
+    report: Callable = None,
+    batch_size: int = 1000,
+) -> Tuple[List[Individual], List[Source]]:
+    """
+    Same as GedcomFile.scan(), but uses and maintains the extraction cache.
+    On a cache hit the record index is restored without scanning the file,
+    and the cached individuals and sources are reported in batches.
+    """
+    if cache_directory is None:
+        cache_directory = default_cache_directory()
+    filename = cache_filename(cache_directory, gedcom_file.file_path)
+    key = fingerprint(gedcom_file)
+
+    data = read_cache_file(filename, CACHE_MAGIC, key)
+    result = None if data is None else restore(gedcom_file, data)
+    if result is not None:
+        (individuals, sources) = result
+        if report is not None:
+            for start in range(0, max(len(individuals), len(sources)), batch_size):
+                end = start + batch_size
+                report(individuals[start:end], sources[start:end])
+        return (individuals, sources)
+
+    (individuals, sources) = gedcom_file.scan(report, batch_size)
+    data = {
+        "individuals": [
+            (i.pointer, i.first_name, i.last_name, i.birth_year, i.death_year)
+            for i in individuals
+        ],
+        "sources": [
+            (s.pointer, s.title, s.author, s.publisher, s.abbreviation) for s in sources
+        ],
+        "offsets": gedcom_file.offsets.tobytes(),
+        "pointers": gedcom_file.pointers,
+    }
+    write_cache_file(filename, CACHE_MAGIC, key, data)
+    return (individuals, sources)
@@ -0,0 +1,116 @@
+"""
+Applies a new extraction of the linked gedcom file to the individuals and
+sources models, by pointer, instead of resetting them
+"""
+
+from typing import Dict, List
+from PyQt5.QtCore import QAbstractTableModel
+from PyQt5.QtCore import QModelIndex
+
+INDIVIDUAL = "individual"
+SOURCE = "source"
+
+
+class GedcomChanges:
+    """
+    The pointers of the individuals and sources that a refresh added, removed
+    or renamed. A record is renamed when the name it is linked by, its
+    autocomplete name, changed.
+    """
+
+    __slots__ = ("added", "removed", "renamed")
+
+    def __init__(self):
+        self.added: Dict[str, List[str]] = {INDIVIDUAL: [], SOURCE: []}
+        self.removed: Dict[str, List[str]] = {INDIVIDUAL: [], SOURCE: []}
+        self.renamed: Dict[str, List[str]] = {INDIVIDUAL: [], SOURCE: []}
+
+    def __bool__(self):
+        return any(
+            pointers
+            for changes in (self.added, self.removed, self.renamed)
+            for pointers in changes.values()
+        )
+
+    def summary(self) -> str:
+        """ A short description like "2 individuals added, 1 source renamed" """
+        parts = []
+        for (changes, verb) in [
+            (self.added, "added"),
+            (self.removed, "removed"),
+            (self.renamed, "renamed"),
+        ]:
+            for kind in (INDIVIDUAL, SOURCE):
+                count = len(changes[kind])
+                if count:
+                    parts.append(f"{count} {kind}{'' if count == 1 else 's'} {verb}")
+        return ", ".join(parts) if parts else "No changes"
+
+
+def merge_rows(
+    model: QAbstractTableModel,
+    rows: list,
+    records: list,
+    changes: GedcomChanges,
+    kind: str,
+):
+    """
+    Turns rows, the list shown by the model, into records. Rows whose pointer
+    is gone are removed, new records are inserted where they appear, and
+    records whose fields changed are replaced with a dataChanged for their
+    row. Only if the remaining records were reordered is the model reset.
+    The differences are recorded in changes under kind.
+    """
+    current = {row.pointer: row for row in rows}
+    pointers = {record.pointer for record in records}
+    changes.removed[kind].extend(
+        row.pointer for row in rows if row.pointer not in pointers
+    )
+    changes.added[kind].extend(r.pointer for r in records if r.pointer not in current)
+    changes.renamed[kind].extend(
+        record.pointer
+        for record in records
+        if record.pointer in current
+        and record.autocomplete_name() != current[record.pointer].autocomplete_name()
+    )
+
+    # Removals, the last run first so that the earlier row numbers stay valid
+    row = len(rows) - 1
+    while row >= 0:
+        if rows[row].pointer in pointers:
+            row -= 1
+            continue
+        last = row
+        while row >= 0 and rows[row].pointer not in pointers:
+            row -= 1
+        model.beginRemoveRows(QModelIndex(), row + 1, last)
+        del rows[row + 1 : last + 1]
+        model.endRemoveRows()
+
+    kept = [record.pointer for record in records if record.pointer in current]
+    if kept != [row.pointer for row in rows]:
+        model.beginResetModel()
+        rows[:] = records
+        model.endResetModel()
+        return
+
+    # Every record now either matches the next row or is new
+    last_column = model.columnCount() - 1
+    row = 0
+    while row < len(records):
+        record = records[row]
+        if row < len(rows) and rows[row].pointer == record.pointer:
+            if vars(rows[row]) != vars(record):
+                rows[row] = record
+                model.dataChanged.emit(
+                    model.index(row, 0), model.index(row, last_column)
+                )
+            row += 1
+            continue
+        last = row
+        while last + 1 < len(records) and records[last + 1].pointer not in current:
+            last += 1
+        model.beginInsertRows(QModelIndex(), row, last)
+        rows[row:row] = records[row : last + 1]
+        model.endInsertRows()
+        row = last + 1
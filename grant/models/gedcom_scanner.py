@@ -0,0 +1,286 @@
+"""
+Streaming scanner for the individuals and sources of a gedcom file
+
+Reads the file line by line and only keeps the fields that end up in the
+Individual and Source lists, instead of building an element tree of the whole
+file. The results are the same as reading the file with python-gedcom's
+Parser, including its validation of every line, and its rules for which
+name, date and source field wins when a record has several.
+
+The file is memory-mapped while it is scanned, and the scan also records the
+byte offset of every level-0 record, so that full records such as notes,
+events and families can be read and decoded when they are needed instead of
+being held in memory. The file is neither mapped nor open in between, so the
+user can overwrite it while it is linked, also on Windows, where a mapped file
+cannot be replaced.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+from gedcom.parser import GedcomFormatViolationError
+from grant.models.individuals_model import Individual
+from grant.models.sources_model import Source
+
+GEDCOM_LINE = re.compile(
+    r"^(0|[1-9]+[0-9]*) (@[^@]+@ |)([A-Za-z0-9_]+)( [^\n\r]*|)([\r\n]{1,2})"
+)
+SOURCE_FIELDS = {"TITL": "title", "AUTH": "author", "PUBL": "publisher"}
+SOURCE_FIELDS["ABBR"] = "abbreviation"
+
+
+class IndividualRecord:
+    """ The fields of an INDI record that are needed for an Individual """
+
+    def __init__(self, pointer: str):
+        self.pointer = pointer
+        self.given_name = ""
+        self.surname = ""
+        self.found_given_name = False
+        self.found_surname = False
+        self.name_done = False
+        self.birth_year = ""
+        self.death_year = ""
+
+    def child(self, tag: str, value: str):
+        """ A line on level 1 """
+        self.close_name()
+        if tag == "NAME" and value != "" and not self.name_done:
+            name = value.split("/")
+            self.given_name = name[0].strip()
+            if len(name) > 1:
+                self.surname = name[1].strip()
+            self.name_done = True
+
+    def grandchild(self, parent: str, tag: str, value: str):
+        """ A line on level 2, below a line with the parent tag """
+        if parent == "NAME" and not self.name_done:
+            if tag == "GIVN":
+                self.given_name = value
+                self.found_given_name = True
+            if tag == "SURN":
+                self.surname = value
+                self.found_surname = True
+        if tag == "DATE" and parent in ("BIRT", "DEAT"):
+            words = value.split()
+            year = words[-1] if words else ""
+            if parent == "BIRT":
+                self.birth_year = year
+            else:
+                self.death_year = year
+
+    def close_name(self):
+        """ Given name and surname from the parts of a NAME end the search """
+        if self.found_given_name and self.found_surname:
+            self.name_done = True
+
+    @staticmethod
+    def year(value: str) -> int:
+        """ The year as a number, -1 if it isn't one """
+        try:
+            return int(value)
+        except ValueError:
+            return -1
+
+    def result(self) -> Individual:
+        """ The scanned individual """
+        return Individual(
+            self.pointer,
+            self.given_name,
+            self.surname,
+            self.year(self.birth_year),
+            self.year(self.death_year),
+        )
+
+
+class SourceRecord:
+    """ The fields of a SOUR record that are needed for a Source """
+
+    def __init__(self, pointer: str):
+        self.pointer = pointer
+        self.fields = {field: "" for field in SOURCE_FIELDS.values()}
+
+    def child(self, tag: str, value: str):
+        """ A line on level 1 """
+        if tag in SOURCE_FIELDS:
+            self.fields[SOURCE_FIELDS[tag]] = value
+
+    def grandchild(self, parent: str, tag: str, value: str):
+        """ Lines below level 1 don't matter for sources """
+
+    def result(self) -> Source:
+        """ The scanned source """
+        return Source(self.pointer, **self.fields)
+
+
+class GedcomScanner:
+    """ Collects individuals and sources from the lines fed to it """
+
+    def __init__(self):
+        self.individuals: List[Individual] = []
+        self.sources: List[Source] = []
+        self.level = -1
+        self.record = None
+        self.pointer = ""  # Of the current level-0 record
+        self.parent_tag = ""
+        self.reported = (0, 0)  # Individuals and sources in earlier batches
+
+    def feed(self, line_number: int, line: str):
+        """ Scans the next line of the file """
+        match = GEDCOM_LINE.match(line)
+        if match is None:
+            raise GedcomFormatViolationError(
+                "Line %d of document violates GEDCOM format 5.5" % line_number
+            )
+        level = int(match.group(1))
+        if level > self.level + 1:
+            raise GedcomFormatViolationError(
+                "Line %d of document violates GEDCOM format 5.5" % line_number
+                + "\nLines must be no more than one level higher than previous line."
+            )
+        self.level = level
+
+        if level == 0:
+            self.finish()
+            self.pointer = match.group(2).rstrip(" ")[1:-1]
+            tag = match.group(3)
+            if tag == "INDI":
+                self.record = IndividualRecord(self.pointer)
+            elif tag == "SOUR":
+                self.record = SourceRecord(self.pointer)
+        elif self.record is None:
+            return
+        elif level == 1:
+            self.parent_tag = match.group(3)
+            self.record.child(self.parent_tag, match.group(4)[1:])
+        elif level == 2:
+            self.record.grandchild(self.parent_tag, match.group(3), match.group(4)[1:])
+
+    def pending(self) -> int:
+        """ Number of individuals and sources found since the last batch """
+        return len(self.individuals) + len(self.sources) - sum(self.reported)
+
+    def batch(self) -> Tuple[List[Individual], List[Source]]:
+        """ The individuals and sources found since the last batch """
+        (individuals, sources) = self.reported
+        self.reported = (len(self.individuals), len(self.sources))
+        return (self.individuals[individuals:], self.sources[sources:])
+
+    def finish(self):
+        """ Completes the current record, at the next record or the end of file """
+        if isinstance(self.record, IndividualRecord):
+            self.individuals.append(self.record.result())
+        elif isinstance(self.record, SourceRecord):
+            self.sources.append(self.record.result())
+        self.record = None
+
+
+class GedcomFile:
+    """
+    A gedcom file with an index of the byte offsets of its level-0 records,
+    keyed by pointer
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        stat = os.stat(file_path)
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        self.offsets = array("q")  # Start of every level-0 record, then the size
+        self.pointers: Dict[str, int] = {}  # Pointer -> position in offsets
+
+    def scan(
+        self, report: Callable = None, batch_size: int = 1000
+    ) -> Tuple[List[Individual], List[Source]]:
+        """
+        The individuals and sources of the file, indexing all records. With
+        report given, it is called with the individuals and sources of every
+        batch_size records as they are found. The file is only mapped while
+        it is scanned.
+        """
+        scanner = GedcomScanner()
+        self.offsets = array("q")
+        self.pointers = {}
+        offset = 0
+        with open(self.file_path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            self.signature = (stat.st_size, stat.st_mtime_ns)
+            # An empty file cannot be mapped, but has no records either
+            data = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                if stat.st_size
+                else None
+            )
+        try:
+            lines = iter(data.readline, b"") if data is not None else []
+            for (line_number, line) in enumerate(lines, 1):
+                scanner.feed(line_number, line.decode("utf-8-sig"))
+                if scanner.level == 0:
+                    if scanner.pointer:
+                        self.pointers[scanner.pointer] = len(self.offsets)
+                    self.offsets.append(offset)
+                    if report is not None and scanner.pending() >= batch_size:
+                        report(*scanner.batch())
+                offset += len(line)
+        finally:
+            if data is not None:
+                data.close()
+        self.offsets.append(offset)
+        scanner.finish()
+        if report is not None and scanner.pending():
+            report(*scanner.batch())
+        return (scanner.individuals, scanner.sources)
+
+    def content_hash(self) -> str:
+        """ The SHA-256 digest of the file's content, read in chunks """
+        content_hash = hashlib.sha256()
+        with open(self.file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    def has_record(self, pointer: str) -> bool:
+        """ Whether the file has a level-0 record with the pointer """
+        return pointer in self.pointers
+
+    def record(self, pointer: str) -> Optional[List[str]]:
+        """
+        The lines of the level-0 record with the pointer, including its
+        sub-records, read from the file. None if there is no such record, or
+        if the file changed since it was scanned.
+        """
+        position = self.pointers.get(pointer)
+        if position is None or not self.is_unchanged():
+            return None
+        start = self.offsets[position]
+        try:
+            with open(self.file_path, "rb") as file:
+                file.seek(start)
+                record = file.read(self.offsets[position + 1] - start)
+        except OSError:
+            return None
+        return [line.decode("utf-8-sig") for line in record.splitlines()]
+
+    def is_unchanged(self) -> bool:
+        """ Whether the file on disk is still the one that was scanned """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self.signature
+
+    def close(self):
+        """ Forgets the record index """
+        self.offsets = array("q")
+        self.pointers = {}
+
+
+def scan_gedcom(file_path: str) -> Tuple[List[Individual], List[Source]]:
+    """ The individuals and sources of the gedcom file, in file order """
+    gedcom_file = GedcomFile(file_path)
+    try:
+        return gedcom_file.scan()
+    finally:
+        gedcom_file.close()
@@ -5,6 +5,7 @@ from enum import IntEnum, unique
 from PyQt5.QtCore import QAbstractTableModel
 from PyQt5.QtCore import QModelIndex
 from PyQt5.QtCore import Qt
+from grant.models.gedcom_diff import INDIVIDUAL, GedcomChanges, merge_rows
 
 
 @unique
@@ -65,6 +66,19 @@ class IndividualsModel(QAbstractTableModel):
         self.individuals = individuals
         self.endResetModel()
 
+    def merge_list(self, individuals: List[Individual], changes: GedcomChanges):
+        """ Changes the list into the given one, row by row, recording changes """
+        merge_rows(self, self.individuals, individuals, changes, INDIVIDUAL)
+
+    def add_rows(self, individuals: List[Individual]):
+        """ Appends individuals to the end of the list """
+        if not individuals:
+            return
+        first = len(self.individuals)
+        self.beginInsertRows(QModelIndex(), first, first + len(individuals) - 1)
+        self.individuals.extend(individuals)
+        self.endInsertRows()
+
     def rowCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
         """ Number of individuals """
         if parent.isValid():
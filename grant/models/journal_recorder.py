@@ -0,0 +1,98 @@
+""" Turns TreeModel edits into change journal records """
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QModelIndex
+from grant.models.tree_model import TreeModel, TreeModelCols
+
+
+class JournalRecorder(QObject):
+    """
+    Listens to the TreeModel and collects the records of every edit. The
+    records are only complete for the project in the project attribute, the
+    one whose file was last read or written as a whole, see track(). Once the
+    model shows another project that is None until the next track().
+    """
+
+    fields = {
+        "plan": {
+            TreeModelCols.TEXT: "ancestor",
+            TreeModelCols.DESCRIPTION: "goal",
+            TreeModelCols.LINK: "ancestor_link",
+        },
+        "task": {
+            TreeModelCols.TEXT: "source",
+            TreeModelCols.DESCRIPTION: "description",
+            TreeModelCols.RESULT: "result",
+            TreeModelCols.LINK: "source_link",
+        },
+    }
+
+    def __init__(self, model: TreeModel, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.project = model.project
+        self.records = []
+        model.dataChanged.connect(self.data_changed)
+        model.rowsInserted.connect(self.rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.rows_removed)
+        model.modelReset.connect(self.model_reset)
+
+    def track(self, project):
+        """ Starts afresh for the project, e.g. after it was loaded or saved """
+        self.project = project
+        self.records = []
+
+    def model_reset(self):
+        """ Showing the same project again, e.g. after Save As, keeps the records """
+        if self.model.project is not self.project:
+            self.track(None)
+
+    def take_records(self):
+        """ Returns the records collected so far and starts afresh """
+        records = self.records
+        self.records = []
+        return records
+
+    def record(self, record: dict):
+        """ Adds a record that did not come through the model """
+        self.records.append(record)
+
+    def data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex):
+        """ Records field changes """
+        if not top_left.isValid():
+            return
+        parent = top_left.parent()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            for column in range(top_left.column(), bottom_right.column() + 1):
+                index = self.model.index(row, column, parent)
+                self.record_field(index)
+
+    def record_field(self, index: QModelIndex):
+        """ Records the current value of the field at the given index """
+        node = index.internalPointer()
+        field = self.fields.get(node.type, {}).get(index.column(), None)
+        if field is None:
+            return
+        value = getattr(node.data, field)
+        if field == "result" and value is not None:
+            value = value.to_py()
+        record = {"op": "set", "field": field, "value": value}
+        record[node.type + "_id"] = node.data.id
+        self.records.append(record)
+
+    def rows_inserted(self, parent: QModelIndex, first: int, _):
+        """ Records newly created plans or tasks """
+        index = self.model.index(first, 0, parent)
+        node = index.internalPointer()
+        record = {"op": "add_" + node.type, "data": node.data.to_py()}
+        if node.type == "task":
+            record["plan_id"] = node.parent.data.id
+        if first < len(node.parent.children) - 1:
+            record["position"] = first  # Put back in place by undo
+        self.records.append(record)
+
+    def rows_removed(self, parent: QModelIndex, first: int, _):
+        """ Records plans or tasks that are about to be deleted """
+        node = self.model.index(first, 0, parent).internalPointer()
+        key = node.type + "_id"
+        self.records.append({"op": "delete_" + node.type, key: node.data.id})
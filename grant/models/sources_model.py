@@ -5,6 +5,7 @@ from enum import IntEnum, unique
 from PyQt5.QtCore import QAbstractTableModel
 from PyQt5.QtCore import QModelIndex
 from PyQt5.QtCore import Qt
+from grant.models.gedcom_diff import SOURCE, GedcomChanges, merge_rows
 
 
 @unique
@@ -50,6 +51,19 @@ class SourcesModel(QAbstractTableModel):
         self.sources = sources
         self.endResetModel()
 
+    def merge_list(self, sources: List[Source], changes: GedcomChanges):
+        """ Changes the list into the given one, row by row, recording changes """
+        merge_rows(self, self.sources, sources, changes, SOURCE)
+
+    def add_rows(self, sources: List[Source]):
+        """ Appends sources to the end of the list """
+        if not sources:
+            return
+        first = len(self.sources)
+        self.beginInsertRows(QModelIndex(), first, first + len(sources) - 1)
+        self.sources.extend(sources)
+        self.endInsertRows()
+
     def rowCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
         """ Number of sources """
         if parent.isValid():
@@ -66,6 +66,8 @@ class TableModel(QAbstractProxyModel):
 
     def columnCount(self, index):  # pylint: disable=invalid-name
         """ Return column count of source model for this index """
+        if self.sourceModel() is None:
+            return 0
         return self.sourceModel().columnCount(self.mapToSource(index))
 
     def rowCount(self, index):  # pylint: disable=invalid-name
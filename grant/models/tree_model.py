@@ -4,8 +4,9 @@ from enum import IntEnum, unique
 from PyQt5.QtCore import QAbstractItemModel
 from PyQt5.QtCore import QModelIndex
 from PyQt5.QtCore import Qt
-from grant.research import ResearchProject
+from grant.research import ResearchProject, ResearchPlan, ResearchResult
 from grant.models.tree_node import TreeNode
+from grant.models.undo_stack import UndoStack
 
 
 @unique
@@ -19,17 +20,34 @@ class TreeModelCols(IntEnum):
     LINK = 4
 
 
+def undo_value(value):
+    """ The value as kept on the undo stack, results are kept as pythonic data """
+    if isinstance(value, ResearchResult):
+        return value.to_py()
+    return value
+
+
 class TreeModel(QAbstractItemModel):
-    """ Represent the ResearchProject as a tree """
+    """
+    Represent the ResearchProject as a tree
+
+    Every edit pushes its inverse onto the undo stack. Undo and redo apply
+    those operations through the same row and data signals as the edits.
+    """
 
     def __init__(self):
         QAbstractItemModel.__init__(self)
         self.project = None
         self.plans_node = None
         self.plans_index = QModelIndex()
+        self.undo_stack = UndoStack()
 
     def set_project(self, project):
-        """ Updates the internal project representation """
+        """
+        Updates the internal project representation. The undo stack is only
+        cleared for another project, not when the same one is shown again.
+        """
+        other_project = project is not self.project
         self.beginResetModel()
         self.project: ResearchProject = project
         if self.project is not None:
@@ -37,6 +55,8 @@ class TreeModel(QAbstractItemModel):
         self.endResetModel()
 
         self.plans_index = QModelIndex()
+        if other_project:
+            self.undo_stack.clear()
 
     def delete_node(self, index):
         """ Deletes the node at the given index """
@@ -45,6 +65,8 @@ class TreeModel(QAbstractItemModel):
         self.beginRemoveRows(index.parent(), index.row(), index.row())
         node = index.internalPointer()
         parent = node.parent
+        parent_id = None if parent is self.plans_node else parent.data.id
+        self.undo_stack.push(("insert", parent_id, index.row(), node.data.to_py()))
 
         parent.delete_child(index.row())
 
@@ -61,10 +83,78 @@ class TreeModel(QAbstractItemModel):
         self.beginInsertRows(index, len(node.children), len(node.children) + 1)
 
         node.create_child()
+        self.undo_stack.push(("delete", node.children[-1].data.id))
 
         self.endInsertRows()
         self.layoutChanged.emit()
 
+    def insert_node(self, parent, row, data):
+        """ Puts a plan or task back at the given row, e.g. to undo a deletion """
+        node = self.plans_node if not parent.isValid() else parent.internalPointer()
+        self.beginInsertRows(parent, row, row)
+        node.insert_child(row, data)
+        self.undo_stack.push(("delete", data["id"]))
+        self.endInsertRows()
+
+    def index_for_id(self, item_id, column=0):
+        """
+        The index of the plan or task with the ID, invalid if there is none.
+        The item and its row are found through the project's ID index.
+        """
+        item = None if self.project is None else self.project.find(item_id)
+        if item is None:
+            return QModelIndex()
+        ids = self.project.ids
+        if isinstance(item, ResearchPlan):
+            return self.index(ids.position(item_id), column, QModelIndex())
+        plan = ids.owner(item_id)
+        plan_index = self.index(ids.position(plan.id), 0, QModelIndex())
+        return self.index(ids.position(item_id), column, plan_index)
+
+    def undo(self):
+        """ Reverts the last edit """
+        operation = self.undo_stack.take_undo()
+        if operation is not None:
+            self.undo_stack.push_redo(self.apply_operation(operation))
+
+    def redo(self):
+        """ Repeats the last undone edit """
+        operation = self.undo_stack.take_redo()
+        if operation is not None:
+            self.undo_stack.push_undo(self.apply_operation(operation))
+
+    def apply_operation(self, operation):
+        """ Applies an operation of the undo stack and returns its inverse """
+        with self.undo_stack.pause():
+            if operation[0] == "set":
+                (_, item_id, column, value) = operation
+                index = self.index_for_id(item_id, column)
+                inverse = (
+                    "set",
+                    item_id,
+                    column,
+                    undo_value(self.data(index, Qt.EditRole)),
+                )
+                if isinstance(value, dict):
+                    result = ResearchResult(False)
+                    result.from_py(value)
+                    value = result
+                self.setData(index, value)
+                return inverse
+            if operation[0] == "insert":
+                (_, parent_id, row, data) = operation
+                parent = (
+                    QModelIndex() if parent_id is None else self.index_for_id(parent_id)
+                )
+                self.insert_node(parent, row, data)
+                return ("delete", data["id"])
+            index = self.index_for_id(operation[1])
+            node = index.internalPointer()
+            parent_id = None if node.type == "plan" else node.parent.data.id
+            inverse = ("insert", parent_id, index.row(), node.data.to_py())
+            self.delete_node(index)
+            return inverse
+
     def index(self, row, column, parent):
         """ Return index object for given item """
         if self.project is None:
@@ -93,7 +183,7 @@ class TreeModel(QAbstractItemModel):
         if not parent.isValid():
             return len(self.plans_node.children) != 0
         node = parent.internalPointer()
-        return len(node.children) != 0
+        return node.child_count() != 0
 
     def rowCount(self, parent):  # pylint: disable=invalid-name
         """ Return number of children for the given index object """
@@ -114,13 +204,15 @@ class TreeModel(QAbstractItemModel):
             return None
         node = index.internalPointer()
         if role in [Qt.DisplayRole, Qt.EditRole]:
+            # Only fetch the requested column, the description of a lazily
+            # loaded plan is expensive to produce
             return {
-                TreeModelCols.TEXT: node.get_text(),
-                TreeModelCols.DESCRIPTION: node.get_description(),
-                TreeModelCols.RESULT: node.get_result(),
-                TreeModelCols.ANCESTOR: node.get_ancestor(),
-                TreeModelCols.LINK: node.get_link(),
-            }[index.column()]
+                TreeModelCols.TEXT: node.get_text,
+                TreeModelCols.DESCRIPTION: node.get_description,
+                TreeModelCols.RESULT: node.get_result,
+                TreeModelCols.ANCESTOR: node.get_ancestor,
+                TreeModelCols.LINK: node.get_link,
+            }[index.column()]()
         if role == Qt.DecorationRole:
             return node.get_icon()
         if role == Qt.FontRole:
@@ -145,13 +237,16 @@ class TreeModel(QAbstractItemModel):
             prev = node.get_description()
             node.set_description(value)
         if index.column() == TreeModelCols.RESULT:
-            prev = node.get_result()
+            # A copy, as the result of a task store row changes with the row
+            prev = undo_value(node.get_result())
             node.set_result(value)
         if index.column() == TreeModelCols.LINK:
             prev = node.get_link()
             node.set_link(value)
 
-        if prev != value:
+        if prev != undo_value(value):
+            node.mark_modified()
+            self.undo_stack.push(("set", node.data.id, index.column(), prev))
             self.dataChanged.emit(index, index)
         return True
 
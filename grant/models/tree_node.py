@@ -2,6 +2,7 @@
 
 from PyQt5.QtGui import QFont
 from PyQt5.QtGui import QIcon
+from grant.research.changes import PLAN, TASK
 
 
 class TreeNode:
@@ -12,7 +13,20 @@ class TreeNode:
         self.data = data
         self.parent = parent
         self.row = row
-        self.children = self.get_children()
+        self._children = None
+
+    @property
+    def children(self):
+        """The child nodes, only created once they are needed"""
+        if self._children is None:
+            self._children = self.get_children()
+        return self._children
+
+    def child_count(self):
+        """Number of children, without creating the child nodes of a plan"""
+        if self._children is None and self.type == "plan":
+            return self.data.task_count()
+        return len(self.children)
 
     def get_children(self):
         """Return the sub-items (plans/tasks/etc) for the given node"""
@@ -30,21 +44,37 @@ class TreeNode:
 
     def delete_child(self, index):
         """Delete index from children"""
+        children = self.children  # Build the nodes before the data changes
         if self.type == "plans":
             self.data.delete_plan(index)
-            del self.children[index]
+            del children[index]
         if self.type == "plan":
             self.data.delete_task(index)
-            del self.children[index]
+            del children[index]
+        for row in range(index, len(children)):
+            children[row].row = row
 
     def create_child(self):
         """Creates a new child depending on the type"""
+        children = self.children  # Build the nodes before the data changes
         if self.type == "plans":
             plan = self.data.add_plan()
-            self.children.append(TreeNode("plan", plan, self, len(self.children)))
+            children.append(TreeNode("plan", plan, self, len(children)))
         if self.type == "plan":
             task = self.data.add_task()
-            self.children.append(TreeNode("task", task, self, len(self.children)))
+            children.append(TreeNode("task", task, self, len(children)))
+
+    def insert_child(self, index, data):
+        """Puts a child back at index from its pythonic representation"""
+        children = self.children  # Build the nodes before the data changes
+        if self.type == "plans":
+            plan = self.data.insert_plan(index, data)
+            children.insert(index, TreeNode("plan", plan, self, index))
+        if self.type == "plan":
+            task = self.data.insert_task(index, data)
+            children.insert(index, TreeNode("task", task, self, index))
+        for row in range(index, len(children)):
+            children[row].row = row
 
     def get_text(self):
         """Return a stringified representation for the given node"""
@@ -63,9 +93,9 @@ class TreeNode:
     def set_text(self, value):
         """Updates the text property of the node"""
         if self.type == "plan":
-            self.data.ancestor = value
+            self.data.ancestor = self.intern(value)
         if self.type == "task":
-            self.data.source = value
+            self.data.source = self.intern(value)
 
     def get_description(self):
         """Return a description for the given node"""
@@ -91,7 +121,12 @@ class TreeNode:
     def set_result(self, value):
         """Updates the result for a task"""
         if self.type == "task":
+            stats = self.stats()
+            if stats is not None:
+                stats.count_task(self.data, -1)
             self.data.result = value
+            if stats is not None:
+                stats.count_task(self.data)
 
     def get_ancestor(self):
         """Return the parent plan's ancestor value"""
@@ -109,10 +144,46 @@ class TreeNode:
 
     def set_link(self, value):
         """Sets the node's gedcom link to value"""
+        stats = self.stats()
         if self.type == "task":
-            self.data.source_link = value
+            if stats is not None:
+                stats.count_task(self.data, -1)
+            self.data.source_link = self.intern(value)
+            if stats is not None:
+                stats.count_task(self.data)
+        if self.type == "plan":
+            if stats is not None:
+                stats.count_plan(self.data, -1)
+            self.data.ancestor_link = self.intern(value)
+            if stats is not None:
+                stats.count_plan(self.data)
+
+    def project(self):
+        """The project the node belongs to, None outside of a project tree"""
+        node = self
+        while node is not None and node.type != "plans":
+            node = node.parent
+        return None if node is None else node.data
+
+    def intern(self, value):
+        """Shares value with equal strings of the project, if there is one"""
+        project = self.project()
+        return value if project is None else project.strings.intern(value)
+
+    def stats(self):
+        """The live counts of the project, if there is one"""
+        project = self.project()
+        return None if project is None else project.stats
+
+    def mark_modified(self):
+        """Records an edit of the plan or task in the project's change set"""
+        project = self.project()
+        if project is None:
+            return
         if self.type == "plan":
-            self.data.ancestor_link = value
+            project.changes.modify(PLAN, self.data.id, self.data.id)
+        if self.type == "task":
+            project.changes.modify(TASK, self.data.id, self.parent.data.id)
 
     def get_icon(self):
         """Returns a QIcon for this node"""
@@ -0,0 +1,111 @@
+""" Keeps the inverse operations of TreeModel edits for undo and redo """
+
+import sys
+from collections import deque
+from contextlib import contextmanager
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QObject
+
+
+def estimate_size(value) -> int:
+    """ Rough number of bytes held by an operation and the data it carries """
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for (key, item) in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class UndoStack(QObject):
+    """
+    The operations that undo, or redo, the edits of a TreeModel. Operations
+    address plans and tasks by ID and only carry what is needed to reverse
+    an edit:
+
+        ("set", item_id, column, value)
+        ("insert", plan_id or None, position, data)
+        ("delete", item_id)
+
+    The oldest operations are dropped once the estimated memory of all
+    operations exceeds the limit.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, limit: int = 8 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.limit = limit
+        self.undo_operations = deque()  # (operation, size), newest last
+        self.redo_operations = deque()
+        self.size = 0
+        self.paused = False
+
+    def can_undo(self) -> bool:
+        """ Whether there is an edit to undo """
+        return len(self.undo_operations) != 0
+
+    def can_redo(self) -> bool:
+        """ Whether there is an undone edit to redo """
+        return len(self.redo_operations) != 0
+
+    def clear(self):
+        """ Forgets all operations, e.g. when another project is set """
+        self.undo_operations.clear()
+        self.redo_operations.clear()
+        self.size = 0
+        self.changed.emit()
+
+    @contextmanager
+    def pause(self):
+        """ Ignores pushed operations, while undo or redo applies one """
+        self.paused = True
+        try:
+            yield
+        finally:
+            self.paused = False
+
+    def push(self, operation: tuple):
+        """ Adds the inverse of a new edit, which makes the redo operations obsolete """
+        if self.paused:
+            return
+        self.size -= sum(size for (_, size) in self.redo_operations)
+        self.redo_operations.clear()
+        self.add(self.undo_operations, operation)
+
+    def take_undo(self) -> tuple:
+        """ Removes and returns the newest undo operation """
+        return self.take(self.undo_operations)
+
+    def take_redo(self) -> tuple:
+        """ Removes and returns the newest redo operation """
+        return self.take(self.redo_operations)
+
+    def push_undo(self, operation: tuple):
+        """ Adds the inverse of a redone edit, keeping the redo operations """
+        self.add(self.undo_operations, operation)
+
+    def push_redo(self, operation: tuple):
+        """ Adds the inverse of an undone edit """
+        self.add(self.redo_operations, operation)
+
+    def add(self, operations: deque, operation: tuple):
+        """ Appends the operation and drops the oldest ones past the limit """
+        size = estimate_size(operation)
+        operations.append((operation, size))
+        self.size += size
+        while self.size > self.limit and (self.undo_operations or self.redo_operations):
+            oldest = self.undo_operations or self.redo_operations
+            (_, dropped) = oldest.popleft()
+            self.size -= dropped
+        self.changed.emit()
+
+    def take(self, operations: deque) -> tuple:
+        """ Removes and returns the newest of the operations, None if empty """
+        if not operations:
+            return None
+        (operation, size) = operations.pop()
+        self.size -= size
+        self.changed.emit()
+        return operation
@@ -3,3 +3,4 @@ from .research import ResearchProject
 from .research import ResearchPlan
 from .research import ResearchTask
 from .research import ResearchResult
+from .research import StringTable
@@ -0,0 +1,97 @@
+""" Keeps track of what changed in a project since the last checkpoint """
+
+from typing import Dict, Set
+
+PLAN = "plan"
+TASK = "task"
+
+
+class ChangeSet:
+    """
+    The plans and tasks that were added, modified or deleted since a
+    checkpoint, by ID. An item that was added and then edited only counts as
+    added, one that was added and deleted again isn't listed at all, and one
+    that was deleted and put back counts as modified.
+    """
+
+    __slots__ = ("added", "modified", "deleted", "owners", "fields")
+
+    def __init__(self):
+        self.added: Dict[int, str] = {}  # ID -> PLAN or TASK
+        self.modified: Dict[int, str] = {}
+        self.deleted: Dict[int, str] = {}
+        self.owners: Dict[int, int] = {}  # Task ID -> plan ID
+        self.fields: Set[str] = set()  # Changed project fields, e.g. "gedcom"
+
+    def __bool__(self):
+        return bool(self.added or self.modified or self.deleted or self.fields)
+
+    def add(self, kind: str, item_id: int, plan_id: int = None):
+        """ Records a new plan or task """
+        self.owners[item_id] = plan_id
+        if self.deleted.pop(item_id, None) is not None:
+            self.modified[item_id] = kind
+        else:
+            self.added[item_id] = kind
+
+    def modify(self, kind: str, item_id: int, plan_id: int = None):
+        """ Records a change to the fields of a plan or task """
+        self.owners[item_id] = plan_id
+        if item_id not in self.added:
+            self.modified[item_id] = kind
+
+    def delete(self, kind: str, item_id: int, plan_id: int = None):
+        """ Records a deleted plan or task, a plan takes its tasks with it """
+        self.modified.pop(item_id, None)
+        if self.added.pop(item_id, None) is None:
+            self.deleted[item_id] = kind
+        self.owners[item_id] = plan_id
+        if kind == PLAN:
+            for task_id in [t for (t, p) in self.owners.items() if p == item_id]:
+                if task_id != item_id:
+                    self.added.pop(task_id, None)
+                    self.modified.pop(task_id, None)
+                    self.deleted.pop(task_id, None)
+                    del self.owners[task_id]
+
+    def modify_field(self, field: str):
+        """ Records a change to a field of the project itself """
+        self.fields.add(field)
+
+    def update(self, later: "ChangeSet"):
+        """ Adds the changes recorded after this set, e.g. after a failed save """
+        for (item_id, kind) in later.deleted.items():
+            self.delete(kind, item_id, later.owners.get(item_id))
+        for (item_id, kind) in later.added.items():
+            self.add(kind, item_id, later.owners.get(item_id))
+        for (item_id, kind) in later.modified.items():
+            self.modify(kind, item_id, later.owners.get(item_id))
+        self.fields |= later.fields
+
+    def is_changed(self, item_id: int) -> bool:
+        """ Whether the plan or task was added or modified """
+        return item_id in self.added or item_id in self.modified
+
+    def changed_plans(self) -> Set[int]:
+        """ IDs of the plans that were added or modified, or had tasks changed """
+        plans = set()
+        for changes in (self.added, self.modified, self.deleted):
+            for (item_id, kind) in changes.items():
+                plans.add(item_id if kind == PLAN else self.owners.get(item_id))
+        plans.discard(None)
+        return plans - set(self.deleted)
+
+    def summary(self) -> str:
+        """ A short description like "1 plan added, 3 tasks modified" """
+        parts = []
+        for (changes, verb) in [
+            (self.added, "added"),
+            (self.modified, "modified"),
+            (self.deleted, "deleted"),
+        ]:
+            for kind in (PLAN, TASK):
+                count = sum(1 for item_kind in changes.values() if item_kind == kind)
+                if count:
+                    parts.append(f"{count} {kind}{'' if count == 1 else 's'} {verb}")
+        parts.extend(f"{field} changed" for field in sorted(self.fields))
+        return ", ".join(parts) if parts else "No changes"
@@ -0,0 +1,153 @@
+"""
+Turns HTML into plain text the way QTextDocument.toPlainText() does
+
+Goals and descriptions used to be stored as the HTML of a QTextEdit, so the
+HTML to convert is almost always what QTextDocument.toHtml() produced. That is
+reproduced exactly, other HTML is converted on a best effort basis.
+
+Nested paragraphs, lists and block quotes come out like in Qt, one line per
+block. Where Qt's own output is an accident of its layout, the text follows
+the blocks instead: text after a closing </div> starts a new line, where Qt
+appends it to the div's last line, and whitespace between block tags is
+dropped, where Qt can leave a trailing space.
+"""
+
+import re
+from html.parser import HTMLParser
+
+MARKUP = re.compile(r"<[A-Za-z!/?]|&(#[0-9]+|#[xX][0-9A-Fa-f]+|[A-Za-z][A-Za-z0-9]*);")
+WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+QT_PRE_WRAP = re.compile(r"p\s*,\s*li\s*\{\s*white-space:\s*pre-wrap")
+PRE_STYLE = re.compile(r"white-space:\s*pre")
+
+BLOCK_TAGS = {"blockquote", "body", "dd", "div", "dl", "dt", "h1", "h2", "h3"}
+BLOCK_TAGS |= {"h4", "h5", "h6", "hr", "html", "li", "ol", "p", "pre", "table"}
+BLOCK_TAGS |= {"td", "th", "tr", "ul"}
+HIDDEN_TAGS = {"head", "script", "style", "title"}
+VOID_TAGS = {"area", "br", "col", "hr", "img", "input", "link", "meta", "param"}
+PRE_WRAP_TAGS = {"li", "p"}
+
+
+def has_markup(text: str) -> bool:
+    """ Whether the text contains any tags or character references """
+    return MARKUP.search(text) is not None
+
+
+class HtmlTextExtractor(HTMLParser):
+    """
+    Collects the text of an HTML document. Block elements start a new line,
+    and whitespace is collapsed unless the element preserves it.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []  # (tag, preserves whitespace, empty Qt paragraph)
+        self.hidden = 0
+        self.pre_wrap_paragraphs = False
+        self.at_block_start = True
+        self.pending_space = False
+
+    def text(self) -> str:
+        """ The text collected so far """
+        return "".join(self.parts)
+
+    def preserve_whitespace(self) -> bool:
+        """ Whether the innermost open element keeps its whitespace """
+        return bool(self.open_tags) and self.open_tags[-1][1]
+
+    def in_empty_paragraph(self) -> bool:
+        """ Whether the innermost open element is an empty Qt paragraph """
+        return bool(self.open_tags) and self.open_tags[-1][2]
+
+    def break_block(self):
+        """ Ends the current line unless nothing was written since the last one """
+        if not self.at_block_start:
+            self.parts.append("\n")
+        self.at_block_start = True
+        self.pending_space = False
+
+    def write(self, text: str):
+        """ Adds inline text """
+        if self.pending_space and not self.at_block_start:
+            self.parts.append(" ")
+        self.pending_space = False
+        self.parts.append(text)
+        self.at_block_start = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self.hidden += 1
+            return
+        if self.hidden:
+            return
+        if tag == "br":
+            if not self.in_empty_paragraph():
+                self.write("\n")
+            return
+        if tag == "img":
+            self.write("\ufffc")  # Qt's object replacement character
+            return
+        if tag in BLOCK_TAGS:
+            self.break_block()
+        if tag in VOID_TAGS:
+            return
+        style = dict(attrs).get("style") or ""
+        preserve = (
+            tag == "pre"
+            or PRE_STYLE.search(style) is not None
+            or (tag in PRE_WRAP_TAGS and self.pre_wrap_paragraphs)
+            or (tag not in BLOCK_TAGS and self.preserve_whitespace())
+        )
+        empty = tag == "p" and "-qt-paragraph-type:empty" in style
+        self.open_tags.append((tag, preserve, empty))
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self.hidden = max(0, self.hidden - 1)
+            return
+        if self.hidden or tag in VOID_TAGS:
+            return
+        if not any(open_tag[0] == tag for open_tag in self.open_tags):
+            return
+        while self.open_tags:
+            (open_tag, _, empty) = self.open_tags.pop()
+            if empty:
+                self.parts.append("\n")  # Qt writes an empty line
+                self.at_block_start = True
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self.break_block()
+
+    def handle_data(self, data):
+        if self.hidden:
+            if QT_PRE_WRAP.search(data):
+                self.pre_wrap_paragraphs = True
+            return
+        if self.preserve_whitespace():
+            self.write(data)
+            return
+        # Splitting leaves empty words where data starts or ends with spaces
+        for (number, word) in enumerate(WHITESPACE.split(data)):
+            if number > 0:
+                self.pending_space = True
+            if word != "":
+                self.write(word)
+
+
+def html_to_text(html: str) -> str:
+    """
+    The plain text of the HTML document, with outer whitespace stripped. Like
+    QTextDocument.toPlainText(), non-breaking spaces become plain spaces.
+    """
+    parser = HtmlTextExtractor()
+    head_end = html.find("</head>")
+    if head_end != -1:
+        # The head has no text, only the style sheet matters
+        head = html[:head_end]
+        parser.pre_wrap_paragraphs = QT_PRE_WRAP.search(head) is not None
+        html = html[head_end + len("</head>") :]
+    parser.feed(html)
+    parser.close()
+    return parser.text().replace("\xa0", " ").strip()
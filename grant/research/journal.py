@@ -0,0 +1,247 @@
+"""
+Append-only change journal kept next to a project file
+
+Every record is a small dict describing one edit, plans and tasks are
+addressed by their IDs:
+    {"op": "add_plan", "data": {...}}
+    {"op": "add_task", "plan_id": 12, "data": {...}}
+    {"op": "delete_plan", "plan_id": 12}
+    {"op": "delete_task", "task_id": 34}
+    {"op": "set", "field": "gedcom", "value": "..."}
+    {"op": "set", "plan_id": 12, "field": "goal", "value": "..."}
+    {"op": "set", "task_id": 34, "field": "source", "value": "..."}
+
+Added plans and tasks go to the end, unless the record has a "position", as
+for deletions that were undone.
+
+Records that address plans and tasks by ID can be replayed over data that
+already contains them: adding an ID that exists, or changing or deleting one
+that doesn't, is skipped. A crash after a compacted project file replaced the
+old one, but before the compacted records were trimmed from the journal,
+therefore doesn't duplicate plans and tasks on the next load.
+
+Journals written before plans and tasks had IDs address them by position
+instead, with "plan" and "task" keys, which are still understood.
+
+Each append is one frame: a header line "#<length> <crc32>" followed by the
+records as a YAML list of that many bytes. A crash in the middle of an append
+leaves a frame that is cut short or doesn't match its checksum. Reading stops
+at the first such frame and cuts it, and anything after it, off the file, so
+the records of the last save are lost but the project can still be opened.
+The header is a YAML comment, and journals without frames are read as a
+single YAML document.
+"""
+
+import os
+import re
+import zlib
+from typing import List, Tuple
+import yaml
+from grant.research.serializers import FormatError, YamlDumper, YamlLoader
+from grant.research.serializers import atomic_write
+
+FRAME_HEADER = re.compile(rb"#(\d+) ([0-9a-f]{8})\n")
+
+
+def journal_filename(filename: str) -> str:
+    """ The sidecar file holding the journal for the given project """
+    return filename + ".journal"
+
+
+def journal_size(filename: str) -> int:
+    """ Size of the project's journal in bytes, 0 if there is none """
+    try:
+        return os.path.getsize(journal_filename(filename))
+    except OSError:
+        return 0
+
+
+def frame_header(payload: bytes) -> bytes:
+    """ The line in front of the records of one append """
+    return b"#%d %08x\n" % (len(payload), zlib.crc32(payload))
+
+
+def append_records(filename: str, records: List[dict]):
+    """ Appends the records to the project's journal, as one frame """
+    if not records:
+        return
+    payload = yaml.dump(records, Dumper=YamlDumper, encoding="utf-8")
+    with open(journal_filename(filename), "ab") as file:
+        file.write(frame_header(payload) + payload)
+
+
+def read_frames(file) -> Tuple[List[dict], int]:
+    """
+    Returns the records of all complete frames and the offset after the last
+    one. Reading stops at a frame that is cut short or corrupt.
+    """
+    records = []
+    end = 0
+    while True:
+        match = FRAME_HEADER.fullmatch(file.readline())
+        if match is None:
+            break
+        payload = file.read(int(match.group(1)))
+        if len(payload) != int(match.group(1)):
+            break
+        if zlib.crc32(payload) != int(match.group(2), 16):
+            break
+        try:
+            records.extend(yaml.load(payload, Loader=YamlLoader) or [])
+        except yaml.YAMLError:
+            break
+        end = file.tell()
+    return (records, end)
+
+
+def read_records(filename: str) -> List[dict]:
+    """
+    Returns all records in the project's journal. A torn or corrupt tail is
+    removed from the file.
+    """
+    journal = journal_filename(filename)
+    try:
+        with open(journal, "rb") as file:
+            if file.read(1) != b"#":
+                file.seek(0)
+                return yaml.load(file, Loader=YamlLoader) or []
+            file.seek(0)
+            (records, end) = read_frames(file)
+            torn = file.seek(0, os.SEEK_END) != end
+        if torn:
+            os.truncate(journal, end)
+        return records
+    except FileNotFoundError:
+        return []
+    except yaml.YAMLError as error:
+        raise FormatError(f"Invalid journal: {error}") from error
+
+
+def trim_journal(filename: str, offset: int):
+    """ Drops the first offset bytes, which have been compacted into the project """
+    journal = journal_filename(filename)
+    try:
+        with open(journal, "rb") as file:
+            file.seek(offset)
+            remainder = file.read()
+    except FileNotFoundError:
+        return
+    if remainder:
+        with atomic_write(journal) as file:
+            file.write(remainder)
+    else:
+        os.remove(journal)
+
+
+def remove_journal(filename: str):
+    """ Deletes the journal, e.g. after the project was fully written """
+    try:
+        os.remove(journal_filename(filename))
+    except FileNotFoundError:
+        pass
+
+
+class DataIndex:
+    """
+    Finds the pythonic plans and tasks by ID, or by position for old records.
+    The index is built on the first lookup and kept up to date after that.
+    Plans and tasks that aren't there are None for records with IDs.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.items = None  # ID -> (dict, list holding the dict)
+
+    def add(self, item: dict, container: list):
+        """ Indexes a plan or task dict that was added to the container """
+        if self.items is None or "id" not in item:
+            return
+        self.items[item["id"]] = (item, container)
+        for task in item.get("tasks") or []:
+            if "id" in task:
+                self.items[task["id"]] = (task, item["tasks"])
+
+    def lookup(self, item_id: int):
+        """ The plan or task dict and the list holding it, None if there is none """
+        if self.items is None:
+            self.items = {}
+            for plan in self.data["plans"]:
+                self.add(plan, self.data["plans"])
+        return self.items.get(item_id, None)
+
+    def contains(self, item: dict) -> bool:
+        """ Whether the plan or task dict of an add record is already there """
+        return "id" in item and self.lookup(item["id"]) is not None
+
+    def plan(self, record: dict) -> dict:
+        """ The plan the record refers to """
+        if "plan_id" in record:
+            found = self.lookup(record["plan_id"])
+            return None if found is None else found[0]
+        return self.data["plans"][record["plan"]]
+
+    def target(self, record: dict) -> dict:
+        """ The project, plan or task dict whose field the record sets """
+        if "task_id" in record:
+            found = self.lookup(record["task_id"])
+            return None if found is None else found[0]
+        if "plan_id" not in record and "plan" not in record:
+            return self.data
+        plan = self.plan(record)
+        if plan is None or "task" not in record:
+            return plan
+        return plan["tasks"][record["task"]]
+
+    def delete(self, record: dict, key: str):
+        """ Deletes the plan or task the record refers to by ID, if it is there """
+        found = self.lookup(record[key])
+        if found is None:
+            return
+        (item, container) = found
+        position = next(n for (n, other) in enumerate(container) if other is item)
+        del container[position]
+        del self.items[record[key]]
+        for task in item.get("tasks") or [] if key == "plan_id" else []:
+            self.items.pop(task.get("id"), None)
+
+
+def apply_records(data: dict, records: List[dict]):
+    """ Replays the records over the pythonic project representation """
+    index = DataIndex(data)
+    for record in records:
+        operation = record["op"]
+        plans = data["plans"]
+        if operation == "add_plan":
+            if index.contains(record["data"]):
+                continue
+            plans.insert(record.get("position", len(plans)), record["data"])
+            index.add(record["data"], plans)
+        elif operation == "add_task":
+            plan = index.plan(record)
+            if plan is None or index.contains(record["data"]):
+                continue
+            tasks = plan.setdefault("tasks", [])
+            tasks.insert(record.get("position", len(tasks)), record["data"])
+            index.add(record["data"], tasks)
+        elif operation == "delete_plan" and "plan_id" in record:
+            index.delete(record, "plan_id")
+        elif operation == "delete_plan":
+            del plans[record["plan"]]
+        elif operation == "delete_task" and "task_id" in record:
+            index.delete(record, "task_id")
+        elif operation == "delete_task":
+            del plans[record["plan"]]["tasks"][record["task"]]
+        elif operation == "set":
+            target = index.target(record)
+            if target is not None:
+                target[record["field"]] = record["value"]
+        else:
+            raise FormatError(f"Unknown journal operation '{operation}'")
+
+
+def replay_journal(filename: str, data: dict):
+    """ Applies the project's journal, if any, to the freshly loaded data """
+    try:
+        apply_records(data, read_records(filename))
+    except (IndexError, KeyError, TypeError, StopIteration) as error:
+        raise FormatError(f"Journal does not match project: {error}") from error
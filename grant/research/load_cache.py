@@ -0,0 +1,129 @@
+"""
+Binary load cache kept next to a project file
+
+Parsing a big YAML project is slow, so the parsed data is pickled into a
+.cache sidecar together with the fingerprint (size, mtime and content hash)
+of the file it came from. As long as the fingerprint matches, the cache is
+loaded instead of parsing the file again.
+
+A cache file starts with a magic string naming its kind, followed by the
+SHA-256 digest of the rest of the file, the pickled key and the pickled data.
+Nothing is unpickled before the digest has been checked, and any failure to
+read the file is a cache miss. read_cache_file() and write_cache_file() are
+shared with the other caches, such as the gedcom extraction cache.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Tuple
+from grant.research.serializers import FormatError, RestrictedUnpickler
+from grant.research.serializers import Serializer, atomic_write
+from grant.research.serializers import LOAD_ERRORS, detect_file_serializer
+
+CACHE_MAGIC = b"GRANTC\x02\n"
+DIGEST_SIZE = hashlib.sha256().digest_size
+CHUNK_SIZE = 1024 * 1024
+
+
+def cache_filename(filename: str) -> str:
+    """ The sidecar file holding the load cache for the given project """
+    return filename + ".cache"
+
+
+def fingerprint(file, stat: os.stat_result) -> tuple:
+    """
+    Identifies one particular version of a project file. The open binary
+    file is hashed in chunks and left at its start.
+    """
+    content_hash = hashlib.sha256()
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+        content_hash.update(chunk)
+    file.seek(0)
+    return (stat.st_size, stat.st_mtime_ns, content_hash.hexdigest())
+
+
+class HashingWriter:
+    """ Passes writes on to the file, hashing everything that was written """
+
+    def __init__(self, file):
+        self.file = file
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """ Same as file.write() """
+        self.hash.update(data)
+        return self.file.write(data)
+
+
+def read_cache_file(path: str, magic: bytes, key: tuple):
+    """
+    Returns the data of the cache file if it matches key, None if it doesn't
+    or if the file is missing or damaged in any way
+    """
+    try:
+        with open(path, "rb") as file:
+            if file.read(len(magic)) != magic:
+                return None
+            digest = file.read(DIGEST_SIZE)
+            start = file.tell()
+            content_hash = hashlib.sha256()
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                content_hash.update(chunk)
+            if content_hash.digest() != digest:
+                return None
+            file.seek(start)
+            if tuple(RestrictedUnpickler(file).load()) != key:
+                return None
+            return RestrictedUnpickler(file).load()
+    except Exception:  # pylint: disable=broad-except
+        return None  # Missing or corrupt, it will be regenerated
+
+
+def write_cache_file(path: str, magic: bytes, key: tuple, data):
+    """ Stores the data for the file version identified by key """
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with atomic_write(path) as file:
+            file.write(magic)
+            digest_offset = file.tell()
+            file.write(bytes(DIGEST_SIZE))  # Filled in once the rest is written
+            writer = HashingWriter(file)
+            pickle.dump(key, writer, protocol=4)
+            pickle.dump(data, writer, protocol=4)
+            file.seek(digest_offset)
+            file.write(writer.hash.digest())
+    except OSError:
+        pass  # The cache is an optimisation only
+
+
+def read_cache(filename: str, key: tuple):
+    """ Returns the cached data if it matches key, None otherwise """
+    return read_cache_file(cache_filename(filename), CACHE_MAGIC, key)
+
+
+def write_cache(filename: str, key: tuple, data):
+    """ Stores the data for the file version identified by key """
+    write_cache_file(cache_filename(filename), CACHE_MAGIC, key, data)
+
+
+def load_file_cached(filename: str) -> Tuple[dict, Serializer]:
+    """
+    Same as serializers.load_file(), but uses and maintains the load cache.
+    The file is read twice, for its fingerprint and for parsing it on a miss,
+    but never held in memory as a whole.
+    """
+    with open(filename, "rb") as file:
+        key = fingerprint(file, os.fstat(file.fileno()))
+        serializer = detect_file_serializer(file)
+        data = read_cache(filename, key) if serializer.cacheable else None
+        if data is not None:
+            return (data, serializer)
+
+        try:
+            data = serializer.load(file)
+        except LOAD_ERRORS as error:
+            raise FormatError(f"Invalid {serializer.name} project: {error}") from error
+    if serializer.cacheable:
+        write_cache(filename, key, data)
+    return (data, serializer)
@@ -0,0 +1,81 @@
+"""
+Converts the plans of very large projects in a pool of worker processes
+
+Each worker receives a contiguous chunk of the plans list, builds the
+ResearchPlan objects including the conversion of goals and descriptions, and
+sends them back pickled. The chunks are merged back in order. The workers are
+spawned rather than forked, because the loading thread is only one of several
+threads in the application.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from grant.research.research import ResearchProject, ResearchPlan
+from grant.research.research import assign_missing_ids
+
+PARALLEL_THRESHOLD = 50000  # Tasks below which starting the pool doesn't pay off
+CHUNKS_PER_PROCESS = 4  # More chunks than processes for finer progress reports
+
+
+def count_tasks(data: dict) -> int:
+    """ Number of tasks in the pythonic project representation """
+    return sum(len(plan.get("tasks") or []) for plan in data["plans"])
+
+
+def build_plans(plans_data: List[dict]) -> List[ResearchPlan]:
+    """ Worker entry point, converts one chunk of plans """
+    plans = []
+    for plan_data in plans_data:
+        plan = ResearchPlan()
+        plan.from_py(plan_data)
+        plans.append(plan)
+    return plans
+
+
+def split(items: list, count: int) -> List[list]:
+    """ Splits items into at most count contiguous chunks of similar size """
+    size = -(-len(items) // max(1, count))
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def from_py_parallel(
+    project: ResearchProject,
+    data: dict,
+    progress=None,
+    lazy: bool = False,
+    processes: int = None,
+    threshold: int = PARALLEL_THRESHOLD,
+):
+    """
+    Same as project.from_py(data, progress, lazy), but converts the plans in
+    parallel if the project has at least threshold tasks. Lazy loading doesn't
+    convert the plans up front, and the columns of a task store can't be
+    filled from other processes, so both always happen in this process.
+    """
+    processes = processes or os.cpu_count() or 1
+    serial = lazy or project.store is not None or processes < 2
+    if serial or count_tasks(data) < threshold:
+        project.from_py(data, progress, lazy)
+        return
+
+    plans_data = data["plans"]
+    project.from_py(dict(data, plans=[]))
+    project.new_ids = assign_missing_ids(plans_data)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        futures = [
+            pool.submit(build_plans, chunk)
+            for chunk in split(plans_data, processes * CHUNKS_PER_PROCESS)
+        ]
+        try:
+            for future in futures:
+                for plan in future.result():
+                    project.append_plan(plan)
+                if progress is not None:
+                    progress(len(project.plans), len(plans_data))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
@@ -1,23 +1,169 @@
 """ The Research-related classes """
 
-from typing import List
+import random
+import sys
+from typing import List, Optional
 from datetime import datetime
-from PyQt5.QtCore import QObject
-from PyQt5.QtGui import QTextDocument
+from grant.research.html_text import has_markup, html_to_text
+from grant.research.changes import ChangeSet, PLAN, TASK
 
 
 def convert_html(text: str) -> str:
-    """ Converts potential HTML into plain text """
-    document = QTextDocument()
-    document.setHtml(text)
-    return document.toPlainText().rstrip().lstrip()
+    """
+    Converts potential HTML into plain text. Plain text is only stripped, and
+    its non-breaking spaces become spaces like in converted HTML.
+    """
+    if not has_markup(text):
+        return text.replace("\xa0", " ").strip()
+    return html_to_text(text)
+
+
+def new_id() -> int:
+    """
+    A new plan or task ID. IDs are random so that they can be created without
+    knowing the project, e.g. in a worker process or for a stand-alone task.
+    """
+    return random.getrandbits(63)
+
+
+def assign_missing_ids(plans_data: List[dict]) -> bool:
+    """
+    Gives the pythonic plans and tasks that have no ID, e.g. from files saved
+    before there were IDs, a new one. Returns whether any ID was missing.
+    """
+    missing = False
+    for plan_data in plans_data:
+        if "id" not in plan_data:
+            plan_data["id"] = new_id()
+            missing = True
+        if "summary" in plan_data:
+            continue  # The tasks are in a shard, which always has IDs
+        for task_data in plan_data.get("tasks") or []:
+            if "id" not in task_data:
+                task_data["id"] = new_id()
+                missing = True
+    return missing
+
+
+class ProjectStats:
+    """
+    Live counts of a project's plans and tasks. They are kept up to date by
+    the project and plan methods and by TreeNode edits, so reading them never
+    needs a pass over the project. Tasks of lazy plans are counted from their
+    pythonic data, or its task summary if it has one.
+    """
+
+    task_fields = ("tasks", "open_tasks", "success", "nil", "linked_sources")
+
+    __slots__ = (
+        "plans",
+        "tasks",
+        "open_tasks",
+        "success",
+        "nil",
+        "linked_individuals",
+        "linked_sources",
+    )
 
+    def __init__(self):
+        self.plans = 0
+        self.tasks = 0
+        self.open_tasks = 0
+        self.success = 0
+        self.nil = 0
+        self.linked_individuals = 0
+        self.linked_sources = 0
+
+    @property
+    def complete_tasks(self) -> int:
+        """ Tasks with a result """
+        return self.success + self.nil
+
+    def count_plan(self, plan: "ResearchPlan", sign: int = 1):
+        """ Adds (or with sign -1 removes) the plan's own fields """
+        self.plans += sign
+        if plan.ancestor_link != "":
+            self.linked_individuals += sign
+
+    def count_task(self, task: "ResearchTask", sign: int = 1):
+        """ Adds (or with sign -1 removes) the task """
+        self.tasks += sign
+        if task.source_link != "":
+            self.linked_sources += sign
+        result = task.result
+        if result is None:
+            self.open_tasks += sign
+        elif result.is_nil():
+            self.nil += sign
+        else:
+            self.success += sign
+
+    def count_task_data(self, data: dict, sign: int = 1):
+        """ Adds (or with sign -1 removes) a task in pythonic representation """
+        self.tasks += sign
+        if data.get("source_link", "") != "":
+            self.linked_sources += sign
+        result = data.get("result", None)
+        if result is None:
+            self.open_tasks += sign
+        elif result.get("nil", True) is True:
+            self.nil += sign
+        else:
+            self.success += sign
+
+    def count_summary(self, summary: dict, sign: int = 1):
+        """ Adds (or with sign -1 removes) the tasks counted by task_summary() """
+        for field in self.task_fields:
+            setattr(self, field, getattr(self, field) + sign * summary.get(field, 0))
+
+    def task_summary(self) -> dict:
+        """ The task counts, e.g. for the tasks of a single plan """
+        return {field: getattr(self, field) for field in self.task_fields}
+
+    def add_plan(self, plan: "ResearchPlan", sign: int = 1):
+        """ Adds (or with sign -1 removes) the plan and all its tasks """
+        self.count_plan(plan, sign)
+        if plan.task_summary() is not None:
+            self.count_summary(plan.task_summary(), sign)
+        elif plan.is_materialized():
+            for task in plan.tasks:
+                self.count_task(task, sign)
+        else:
+            for task_data in plan.raw_tasks():
+                self.count_task_data(task_data, sign)
+
+    def remove_plan(self, plan: "ResearchPlan"):
+        """ Removes the plan and all its tasks """
+        self.add_plan(plan, -1)
+
+
+class StringTable:
+    """
+    Shares one object between equal strings, so a source or link that appears
+    on thousands of tasks is only kept in memory once
+    """
+
+    __slots__ = ("strings",)
+
+    def __init__(self):
+        self.strings = {}
 
-class ResearchResult(QObject):
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, value):
+        """ The shared string equal to value, anything but a str is kept """
+        if type(value) is not str:  # pylint: disable=unidiomatic-typecheck
+            return value
+        return self.strings.setdefault(value, value)
+
+
+class ResearchResult:
     """ Result of a Task """
 
+    __slots__ = ("date", "document", "summary", "nil")
+
     def __init__(self, success: bool):
-        super().__init__()
         self.date = datetime.now()
         self.document = ""
         self.summary = ""
@@ -60,7 +206,10 @@ class ResearchResult(QObject):
 class ResearchTask:
     """ A single task """
 
+    __slots__ = ("id", "source", "source_link", "description", "result")
+
     def __init__(self):
+        self.id = new_id()
         self.source = ""
         self.source_link = ""
         self.description = ""
@@ -69,10 +218,13 @@ class ResearchTask:
     def __str__(self):
         return "Research Task: " + self.description
 
-    def from_py(self, data):
-        """ Converts from pythonic to class """
+    def from_py(self, data, strings: StringTable = None):
+        """ Converts from pythonic to class, sharing strings if a table is given """
+        self.id = data.get("id", self.id)
         self.source = data.get("source", "")
         self.source_link = data.get("source_link", "")
+        if strings is not None:
+            self.intern_strings(strings)
         self.description = convert_html(data.get("description", ""))
         result = data.get("result", None)
         if result is not None:
@@ -82,6 +234,7 @@ class ResearchTask:
     def to_py(self):
         """ Converts from class to pythonic """
         data = {}
+        data["id"] = self.id
         data["source"] = self.source
         data["source_link"] = self.source_link
         data["description"] = self.description
@@ -92,78 +245,282 @@ class ResearchTask:
         """ Whether the task is still open """
         return self.result is None
 
+    def intern_strings(self, strings: StringTable):
+        """ Replaces the source and link with the table's shared strings """
+        self.source = strings.intern(self.source)
+        self.source_link = strings.intern(self.source_link)
+
 
 class ResearchPlan:
-    """ A collection of tasks with a common goal """
+    """
+    A collection of tasks with a common goal
+
+    When loaded lazily, the plan only converts its ancestor fields and keeps
+    the rest of its pythonic data until the goal or tasks are first accessed.
+    Data with a "summary" of the task counts, as read from a sharded project,
+    answers task_count() and the stats without reading the tasks.
+    A plan that belongs to a project keeps its tasks in the project's task
+    store if there is one, and keeps the project's string table, ID index,
+    stats and change set up to date.
+    """
+
+    __slots__ = (
+        "id",
+        "ancestor",
+        "ancestor_link",
+        "_goal",
+        "_tasks",
+        "_raw",
+        "_unreadable",
+        "_project",
+    )
 
     default_ancestor = "My Ancestor"
 
-    def __init__(self):
+    def __init__(self, project: "ResearchProject" = None):
+        self.id = new_id()
         self.ancestor = self.default_ancestor
         self.ancestor_link = ""
-        self.goal = "Describe your goals for this plan..."
-        self.tasks: List[ResearchTask] = []
+        self._goal = "Describe your goals for this plan..."
+        self._tasks: List[ResearchTask] = []
+        if project is not None and project.store is not None:
+            self._tasks = project.store.task_list()
+        self._raw = None
+        self._unreadable = None  # Data whose goal and tasks could not be read
+        self._project = project
 
     def __str__(self):
         retval = "Research Plan: " + self.ancestor
         return retval
 
-    def from_py(self, data):
+    @property
+    def goal(self) -> str:
+        """ The goal of the plan """
+        self.materialize()
+        return self._goal
+
+    @goal.setter
+    def goal(self, value: str):
+        self.materialize()
+        self._goal = value
+
+    @property
+    def tasks(self) -> List[ResearchTask]:
+        """ The tasks of the plan """
+        self.materialize()
+        return self._tasks
+
+    def from_py(self, data, lazy=False):
         """ Converts from pythonic to class """
+        self.id = data.get("id", self.id)
         self.ancestor = data.get("ancestor", None)
         self.ancestor_link = data.get("ancestor_link", "")
-        self.goal = convert_html(data.get("goal", ""))
-        for task_data in data.get("tasks", []):
-            task = ResearchTask()
-            task.from_py(task_data)
-            self.tasks.append(task)
+        if self._project is not None:
+            self.ancestor = self._project.strings.intern(self.ancestor)
+            self.ancestor_link = self._project.strings.intern(self.ancestor_link)
+        self._raw = data
+        if not lazy:
+            self.materialize()
+
+    def is_materialized(self) -> bool:
+        """ Whether the goal and tasks have been converted yet """
+        return self._raw is None
+
+    def materialize(self):
+        """ Converts the goal and tasks kept back by a lazy from_py() """
+        if self._raw is None:
+            return
+        data = self._raw
+        self._raw = None
+        self._goal = convert_html(data.get("goal", ""))
+        project = self._project
+        if getattr(data, "error", None) is not None:
+            # An unreadable shard, the plan is empty but its summary was counted
+            self._unreadable = data
+            if project is not None and data.get("summary") is not None:
+                project.stats.count_summary(data["summary"], -1)
+        strings = None if project is None else project.strings
+        if project is not None and project.store is not None:
+            self._tasks.extend_py(data.get("tasks", []), strings)
+        else:
+            for task_data in data.get("tasks", []):
+                task = ResearchTask()
+                task.from_py(task_data, strings)
+                self._tasks.append(task)
+        if project is not None:
+            project.ids.add_tasks(self)
+
+    def load_error(self) -> Optional[str]:
+        """
+        Why the goal and tasks could not be read, e.g. from a broken plan
+        shard. None if they could, or if they haven't been read yet.
+        """
+        data = self._raw if self._raw is not None else self._unreadable
+        return getattr(data, "error", None)
+
+    def unread_entry(self) -> Optional[dict]:
+        """ The index entry of the data that could not be read, if any """
+        return self._unreadable
+
+    def raw_tasks(self) -> List[dict]:
+        """ The pythonic tasks kept back by a lazy from_py(), empty once converted """
+        if self._raw is None:
+            return []
+        return self._raw.get("tasks") or []
+
+    def task_summary(self) -> dict:
+        """ The task counts kept with the pythonic data, None if there are none """
+        if self._raw is None:
+            return None
+        return self._raw.get("summary", None)
+
+    def task_count(self) -> int:
+        """ Number of tasks, without materializing them """
+        if self.task_summary() is not None:
+            return self.task_summary()["tasks"]
+        if self._raw is not None:
+            return len(self._raw.get("tasks", []))
+        return len(self._tasks)
+
+    def task_ids(self, read: bool = True) -> Optional[List[int]]:
+        """
+        The IDs of the tasks, without materializing them. A shard index lists
+        them, older ones don't, and then the shard is read unless read is
+        False, which gives None instead.
+        """
+        if self._raw is None:
+            return [task.id for task in self._tasks]
+        if "task_ids" in self._raw:
+            return self._raw["task_ids"]
+        if not (read or getattr(self._raw, "loaded", True)):
+            return None
+        return [task.get("id") for task in self.raw_tasks()]
+
+    def has_linked_tasks(self) -> bool:
+        """ Whether any task is linked to a source, without materializing them """
+        if self.task_summary() is not None:
+            return self.task_summary()["linked_sources"] != 0
+        if self._raw is not None:
+            return any(task.get("source_link") for task in self._raw.get("tasks", []))
+        return any(task.source_link != "" for task in self._tasks)
 
     def to_py(self):
         """ Converts from class to pythonic """
         data = {}
+        data["id"] = self.id
         data["ancestor"] = self.ancestor
         data["ancestor_link"] = self.ancestor_link
-        data["goal"] = self.goal
+        if self._raw is not None:
+            data["goal"] = self._raw.get("goal", "")
+            data["tasks"] = self._raw.get("tasks", [])
+            return data
+        data["goal"] = self._goal
         data["tasks"] = []
-        for task in self.tasks:
+        for task in self._tasks:
             data["tasks"].append(task.to_py())
         return data
 
     def add_task(self):
         """ Create a new task and return it """
+        self.tasks.append(ResearchTask())
+        task = self.tasks[-1]
+        if self._project is not None:
+            self._project.ids.add_task(task, self)
+            self._project.stats.count_task(task)
+            self._project.changes.add(TASK, task.id, self.id)
+        return task
+
+    def insert_task(self, index: int, data: dict) -> ResearchTask:
+        """ Puts a task back from its pythonic representation, keeping its ID """
         task = ResearchTask()
-        self.tasks.append(task)
+        task.from_py(data, None if self._project is None else self._project.strings)
+        self.tasks.insert(index, task)
+        task = self.tasks[index]
+        if self._project is not None:
+            self._project.ids.add_task(task, self)
+            self._project.stats.count_task(task)
+            self._project.changes.add(TASK, task.id, self.id)
         return task
 
     def delete_task(self, index: int):
         """ Deletes the task at the given index """
         if index > len(self.tasks) or len(self.tasks) == 0:
             return
+        if self._project is not None:
+            task = self.tasks[index]
+            self._project.ids.remove(task.id)
+            self._project.stats.count_task(task, -1)
+            self._project.changes.delete(TASK, task.id, self.id)
         del self.tasks[index]
 
+    def attach(self, project: "ResearchProject"):
+        """
+        Connects a plan that was built without the project, e.g. in a worker
+        process. The ancestor and the converted tasks' sources and links are
+        shared through the project's string table from now on.
+        """
+        self._project = project
+        strings = project.strings
+        self.ancestor = strings.intern(self.ancestor)
+        self.ancestor_link = strings.intern(self.ancestor_link)
+        if self._raw is None:
+            for task in self._tasks:
+                task.intern_strings(strings)
+
+    def release_tasks(self):
+        """ Takes the tasks out of the task store, when the plan is deleted """
+        if self._project is not None and self._project.store is not None:
+            if self._raw is None:
+                self._tasks.detach()
+
 
 class ResearchProject:
-    """ All the research plans for a gedcom """
+    """
+    All the research plans for a gedcom
 
-    def __init__(self, filename):
+    If a TaskStore is given, the tasks of all plans are kept in its columns.
+    Equal ancestors, sources and links share one string through the project's
+    StringTable, and every plan and task can be found by its ID. The stats
+    count the plans and tasks as they change, and the change set records which
+    of them changed since the last checkpoint, usually the last save.
+    """
+
+    def __init__(self, filename, store=None):
         self.version = "1.0"
         self.gedcom = ""
         self.filename = filename
         self.plans = []
+        self.store = store
+        self.strings = StringTable()
+        self.ids = IdIndex(self)
+        self.new_ids = False  # IDs were assigned that the file doesn't have yet
+        self.stats = ProjectStats()
+        self.changes = ChangeSet()
 
     def __str__(self):
         return self.filename
 
-    def from_py(self, data):
-        """ Converts from pythonic datastructures to class """
+    def from_py(self, data, progress=None, lazy=False):
+        """
+        Converts from pythonic datastructures to class
+
+        If given, progress is called with (plans_done, plans_total) after
+        every plan and may raise to abort the conversion. With lazy set, plans
+        are only fully converted when they are first used.
+        """
         self.version = data["version"]
         self.gedcom = data.get("gedcom", "")
         if self.gedcom == "none":
             self.gedcom = ""  # backwards compatibility check
+        self.new_ids = assign_missing_ids(data["plans"])
+        total = len(data["plans"])
         for plan_data in data["plans"]:
-            plan = ResearchPlan()
-            plan.from_py(plan_data)
+            plan = ResearchPlan(self)
+            plan.from_py(plan_data, lazy)
             self.plans.append(plan)
+            self.stats.add_plan(plan)
+            if progress is not None:
+                progress(len(self.plans), total)
 
     def to_py(self):
         """ Converts to pythonic representation """
@@ -179,14 +536,241 @@ class ResearchProject:
         """ Whether a gedcom file is associated with this project """
         return self.gedcom != ""
 
+    def append_plan(self, plan: ResearchPlan):
+        """ Adds a plan that was built outside the project, see ResearchPlan.attach """
+        plan.attach(self)
+        self.plans.append(plan)
+        self.ids.add_plan(plan)
+        self.stats.add_plan(plan)
+
     def add_plan(self):
         """ Creates and returns a new plan """
-        plan = ResearchPlan()
+        plan = ResearchPlan(self)
         self.plans.append(plan)
+        self.ids.add_plan(plan)
+        self.stats.add_plan(plan)
+        self.changes.add(PLAN, plan.id, plan.id)
+        return plan
+
+    def insert_plan(self, index: int, data: dict) -> ResearchPlan:
+        """ Puts a plan back from its pythonic representation, keeping its ID """
+        plan = ResearchPlan(self)
+        plan.from_py(data, lazy=True)
+        self.plans.insert(index, plan)
+        self.ids.add_plan(plan)
+        self.stats.add_plan(plan)
+        self.changes.add(PLAN, plan.id, plan.id)
         return plan
 
     def delete_plan(self, index):
         """ Delete plan at index """
         if index > len(self.plans) or len(self.plans) == 0:
             return
+        plan = self.plans[index]
+        self.ids.remove_plan(plan)
+        self.stats.remove_plan(plan)
+        self.changes.delete(PLAN, plan.id, plan.id)
+        plan.release_tasks()
         del self.plans[index]
+
+    def unreadable_plans(self) -> List["ResearchPlan"]:
+        """
+        The plans whose goal and tasks could not be read. Lazy plans are read
+        for this, but not converted.
+        """
+        for plan in self.plans:
+            plan.raw_tasks()
+        return [plan for plan in self.plans if plan.load_error() is not None]
+
+    def checkpoint(self) -> ChangeSet:
+        """ Returns the changes recorded so far and starts a new change set """
+        (changes, self.changes) = (self.changes, ChangeSet())
+        return changes
+
+    def find(self, item_id: int):
+        """ The plan or task with the given ID, None if there is none """
+        return self.ids.find(item_id)
+
+    def delete(self, item_id: int):
+        """ Deletes the plan or task with the given ID """
+        item = self.ids.find(item_id)
+        if isinstance(item, ResearchPlan):
+            self.delete_plan(self.ids.position(item_id))
+        elif item is not None:
+            plan = self.ids.owner(item_id)
+            plan.delete_task(self.ids.position(item_id))
+
+    def move_task(self, task_id: int, plan_id: int, position: int = None):
+        """ Moves the task to the plan with plan_id, at the end by default """
+        task = self.ids.find(task_id)
+        plan = self.ids.find(plan_id)
+        if task is None or not isinstance(plan, ResearchPlan):
+            return
+        source = self.ids.owner(task_id)
+        del source.tasks[self.ids.position(task_id)]
+        if position is None:
+            position = len(plan.tasks)
+        plan.tasks.insert(position, task)
+        # A task store gives the moved task a new view, so look it up again
+        self.ids.add_task(plan.tasks[position], plan)
+        self.changes.modify(PLAN, source.id, source.id)
+        self.changes.modify(TASK, task_id, plan.id)
+
+    def string_sharing(self) -> dict:
+        """
+        Diagnostic of how much memory sharing equal strings saves, compared to
+        every ancestor, source and link having its own copy. Plans that are
+        not materialized yet only count with their ancestor fields.
+        """
+        counts = {}
+        for plan in self.plans:
+            values = [plan.ancestor, plan.ancestor_link]
+            if plan.is_materialized():
+                for task in plan.tasks:
+                    values.append(task.source)
+                    values.append(task.source_link)
+            for value in values:
+                if isinstance(value, str) and value != "":
+                    (_, references) = counts.get(id(value), (value, 0))
+                    counts[id(value)] = (value, references + 1)
+        saved = sum(
+            (references - 1) * sys.getsizeof(value)
+            for (value, references) in counts.values()
+        )
+        return {
+            "references": sum(references for (_, references) in counts.values()),
+            "objects": len(counts),
+            "table_size": len(self.strings),
+            "saved_bytes": saved,
+        }
+
+
+class IdIndex:
+    """
+    Finds the plans and tasks of a project by their ID, and their position.
+    The index is only built on first use, and after that kept up to date by
+    the add and delete methods of the project and its plans. Tasks of lazy
+    plans are added once the plan is materialized.
+
+    An ID that isn't indexed, including one that doesn't exist at all, is
+    looked up in the task IDs of the plans that aren't materialized yet.
+    These are collected on the first miss, from the shard index or the raw
+    tasks, so later misses are dict lookups as well. Positions are cached
+    per ID and checked against the owning list before they are used. A stale
+    one, e.g. after an insert in front of it, re-numbers that list once.
+    """
+
+    __slots__ = ("project", "items", "owners", "positions", "lazy")
+
+    def __init__(self, project: ResearchProject):
+        self.project = project
+        self.items = None
+        self.owners = None
+        self.positions = {}
+        self.lazy = None  # Task ID to plan, for the plans that aren't converted
+
+    def build(self):
+        """ Indexes all plans and their converted tasks """
+        self.items = {}
+        self.owners = {}
+        for plan in self.project.plans:
+            self.add_plan(plan)
+
+    def add_plan(self, plan: ResearchPlan):
+        """ Indexes a plan that was added to the project """
+        if self.items is None:
+            return
+        self.add(plan)
+        if plan.is_materialized():
+            self.add_tasks(plan)
+        elif self.lazy is not None:
+            self.add_lazy(plan)
+
+    def add_lazy(self, plan: ResearchPlan):
+        """ Remembers the task IDs of a plan that isn't materialized """
+        for task_id in plan.task_ids():
+            self.lazy[task_id] = plan
+
+    def add_tasks(self, plan: ResearchPlan):
+        """ Indexes all tasks of a plan """
+        if self.items is None:
+            return
+        for task in plan.tasks:
+            self.add_task(task, plan)
+
+    def add_task(self, task: ResearchTask, plan: ResearchPlan):
+        """ Indexes a task that was added to the plan """
+        if self.items is None:
+            return
+        self.add(task)
+        self.owners[task.id] = plan
+
+    def add(self, item):
+        """
+        Indexes a plan or task, giving it a new ID if the ID is taken. A task
+        of a task store is a new view on every access, views of the same row
+        are the same task.
+        """
+        while self.items.get(item.id, item) != item:
+            item.id = new_id()
+        self.items[item.id] = item
+
+    def remove_plan(self, plan: ResearchPlan):
+        """ Removes a plan that is deleted, and its tasks """
+        if self.items is None:
+            return
+        self.remove(plan.id)
+        if plan.is_materialized():
+            for task in plan.tasks:
+                self.remove(task.id)
+
+    def remove(self, item_id: int):
+        """ Removes the plan or task with the ID """
+        if self.items is None:
+            return
+        self.items.pop(item_id, None)
+        self.owners.pop(item_id, None)
+        self.positions.pop(item_id, None)
+
+    def find(self, item_id: int):
+        """ The plan or task with the ID, None if there is none """
+        if self.items is None:
+            self.build()
+        item = self.items.get(item_id, None)
+        if item is not None:
+            return item
+        if self.lazy is None:
+            self.lazy = {}
+            for plan in self.project.plans:
+                if not plan.is_materialized():
+                    self.add_lazy(plan)
+        plan = self.lazy.pop(item_id, None)
+        if plan is None:
+            return None
+        plan.materialize()
+        return self.items.get(item_id, None)
+
+    def owner(self, task_id: int) -> ResearchPlan:
+        """ The plan holding the task with the ID """
+        if self.find(task_id) is None:
+            return None
+        return self.owners.get(task_id, None)
+
+    def position(self, item_id: int) -> int:
+        """
+        The row of the plan in the project, or of the task in its plan. None
+        if there is no plan or task with the ID.
+        """
+        item = self.find(item_id)
+        if item is None:
+            return None
+        if isinstance(item, ResearchPlan):
+            items = self.project.plans
+        else:
+            items = self.owners[item_id].tasks
+        row = self.positions.get(item_id, None)
+        if row is None or row >= len(items) or items[row] != item:
+            for (row, entry) in enumerate(items):
+                self.positions[entry.id] = row
+            row = self.positions[item_id]
+        return row
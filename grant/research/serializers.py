@@ -0,0 +1,416 @@
+""" Serialization backends for project files """
+
+import contextlib
+import datetime
+import gzip
+import json
+import lzma
+import os
+import pickle
+import stat
+import tempfile
+from typing import Dict, Tuple
+import yaml
+from yaml.events import AliasEvent, ScalarEvent
+from yaml.events import MappingStartEvent, MappingEndEvent
+from yaml.events import SequenceStartEvent, SequenceEndEvent
+from yaml.events import DocumentStartEvent, DocumentEndEvent
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:  # pragma: no cover - libyaml is not always available
+    from yaml import SafeLoader as YamlLoader
+    from yaml import SafeDumper as YamlDumper
+
+
+class FormatError(Exception):
+    """ Raised when a project file cannot be decoded """
+
+
+class Serializer:
+    """ Converts the pythonic project representation to and from bytes """
+
+    name = ""
+    cacheable = False  # Whether loading is slow enough to keep a load cache
+
+    def dump(self, data, file):
+        """ Writes data to the binary file object """
+        raise NotImplementedError("dump() must be implemented in sub-classes")
+
+    def load(self, file):
+        """ Reads data from the binary file object """
+        raise NotImplementedError("load() must be implemented in sub-classes")
+
+    def detect(self, header: bytes) -> bool:  # pylint: disable=no-self-use
+        """ Whether the file header belongs to this format """
+        return False
+
+    def dump_project(self, project, file):
+        """ Writes the whole project, formats may stream it instead of dump() """
+        self.dump(project.to_py(), file)
+
+
+class YamlSerializer(Serializer):
+    """ The human-readable default, using libyaml where it is installed """
+
+    name = "yaml"
+    cacheable = True
+
+    def dump(self, data, file):
+        yaml.dump(data, file, Dumper=YamlDumper, encoding="utf-8")
+
+    def load(self, file):
+        return yaml.load(file, Loader=YamlLoader)
+
+    def dump_project(self, project, file):
+        ProjectEmitter(file).emit_project(project)
+
+    def detect(self, header: bytes) -> bool:
+        return True  # Anything we don't recognise is treated as YAML
+
+
+class ProjectEmitter:
+    """
+    Writes a project as YAML one plan at a time, so only the pythonic form of
+    the plan being written exists at any point. The output is the same as
+    yaml.dump(project.to_py()), except that an object shared between two plans
+    is written out twice rather than as an alias.
+    """
+
+    def __init__(self, file):
+        self.dumper = YamlDumper(file, encoding="utf-8")
+        self.anchors = {}
+        self.serialized = set()
+        self.last_anchor_id = 0
+
+    def emit_project(self, project):
+        """ Writes the complete document """
+        fields = {"gedcom": project.gedcom, "plans": None, "version": project.version}
+        dumper = self.dumper
+        dumper.open()
+        dumper.emit(DocumentStartEvent())
+        dumper.emit(MappingStartEvent(None, MappingNode.id, True, flow_style=False))
+        for (key, value) in sorted(fields.items()):
+            self.emit_data(key)
+            if key != "plans":
+                self.emit_data(value)
+                continue
+            dumper.emit(
+                SequenceStartEvent(None, SequenceNode.id, True, flow_style=False)
+            )
+            for plan in project.plans:
+                self.emit_data(plan.to_py())
+            dumper.emit(SequenceEndEvent())
+        dumper.emit(MappingEndEvent())
+        dumper.emit(DocumentEndEvent())
+        dumper.close()
+        dumper.dispose()
+
+    def emit_data(self, data):
+        """ Represents and writes a self-contained piece of the document """
+        dumper = self.dumper
+        node = dumper.represent_data(data)
+        dumper.represented_objects = {}
+        dumper.object_keeper = []
+        dumper.alias_key = None
+        self.anchors = {}
+        self.serialized = set()
+        self.anchor_node(node)
+        self.serialize_node(node)
+
+    def anchor_node(self, node):
+        """ Finds the nodes that are referenced more than once """
+        if node in self.anchors:
+            if self.anchors[node] is None:
+                self.last_anchor_id += 1
+                self.anchors[node] = "id%03d" % self.last_anchor_id
+            return
+        self.anchors[node] = None
+        if isinstance(node, SequenceNode):
+            for item in node.value:
+                self.anchor_node(item)
+        elif isinstance(node, MappingNode):
+            for (key, value) in node.value:
+                self.anchor_node(key)
+                self.anchor_node(value)
+
+    def serialize_node(self, node):
+        """ Emits the events for the node, like yaml.serializer.Serializer """
+        dumper = self.dumper
+        alias = self.anchors[node]
+        if node in self.serialized:
+            dumper.emit(AliasEvent(alias))
+            return
+        self.serialized.add(node)
+        if isinstance(node, ScalarNode):
+            detected_tag = dumper.resolve(ScalarNode, node.value, (True, False))
+            default_tag = dumper.resolve(ScalarNode, node.value, (False, True))
+            implicit = (node.tag == detected_tag), (node.tag == default_tag)
+            dumper.emit(
+                ScalarEvent(alias, node.tag, implicit, node.value, style=node.style)
+            )
+        elif isinstance(node, SequenceNode):
+            implicit = node.tag == dumper.resolve(SequenceNode, node.value, True)
+            dumper.emit(
+                SequenceStartEvent(
+                    alias, node.tag, implicit, flow_style=node.flow_style
+                )
+            )
+            for item in node.value:
+                self.serialize_node(item)
+            dumper.emit(SequenceEndEvent())
+        elif isinstance(node, MappingNode):
+            implicit = node.tag == dumper.resolve(MappingNode, node.value, True)
+            dumper.emit(
+                MappingStartEvent(alias, node.tag, implicit, flow_style=node.flow_style)
+            )
+            for (key, value) in node.value:
+                self.serialize_node(key)
+                self.serialize_node(value)
+            dumper.emit(MappingEndEvent())
+
+
+class JsonSerializer(Serializer):
+    """ JSON with tagged objects for the dates """
+
+    name = "json"
+
+    @staticmethod
+    def encode_object(value):
+        """ Converts the types that JSON doesn't know about """
+        if isinstance(value, datetime.datetime):
+            return {"__datetime__": value.isoformat()}
+        if isinstance(value, datetime.date):
+            return {"__date__": value.isoformat()}
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    @staticmethod
+    def decode_object(value: dict):
+        """ Reverses encode_object """
+        if "__datetime__" in value:
+            return datetime.datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return datetime.date.fromisoformat(value["__date__"])
+        return value
+
+    def dump(self, data, file):
+        text = json.dumps(data, default=self.encode_object, separators=(",", ":"))
+        file.write(text.encode("utf-8"))
+
+    def load(self, file):
+        return json.loads(file.read(), object_hook=self.decode_object)
+
+    def detect(self, header: bytes) -> bool:
+        return header.lstrip().startswith(b"{")
+
+
+class RestrictedUnpickler(pickle.Unpickler):
+    """ Only allows the classes that can appear in a project """
+
+    allowed = {("datetime", "datetime"), ("datetime", "date")}
+
+    def find_class(self, module, name):
+        if (module, name) not in self.allowed:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed")
+        return super().find_class(module, name)
+
+
+class BinarySerializer(Serializer):
+    """ Compact binary format, identified by a magic header """
+
+    name = "binary"
+    magic = b"GRANT\x00\x01\n"
+
+    def dump(self, data, file):
+        file.write(self.magic)
+        pickle.dump(data, file, protocol=4)
+
+    def load(self, file):
+        if file.read(len(self.magic)) != self.magic:
+            raise pickle.UnpicklingError("Not a binary project file")
+        return RestrictedUnpickler(file).load()
+
+    def detect(self, header: bytes) -> bool:
+        return header.startswith(self.magic)
+
+
+class Compression:
+    """ A compressed container around any of the formats """
+
+    name = ""
+    magic = b""
+
+    def open(self, file, mode: str):
+        """ A file object that (de)compresses to or from the binary file object """
+        raise NotImplementedError("open() must be implemented in sub-classes")
+
+
+class GzipCompression(Compression):
+    """ Fast, and widely supported """
+
+    name = "gzip"
+    magic = b"\x1f\x8b"
+
+    def open(self, file, mode: str):
+        # Without a name or time stamp equal projects compress to equal bytes
+        return gzip.GzipFile("", mode, compresslevel=6, fileobj=file, mtime=0)
+
+
+class XzCompression(Compression):
+    """ Slower, but compresses the repetitive parts of projects better """
+
+    name = "xz"
+    magic = b"\xfd7zXZ\x00"
+
+    def open(self, file, mode: str):
+        return lzma.LZMAFile(file, mode)
+
+
+class CompressedSerializer(Serializer):
+    """
+    Streams one of the formats through a compression. Data is compressed while
+    it is dumped and decompressed while it is loaded, so neither the
+    compressed nor the uncompressed file is ever held in memory as a whole.
+    """
+
+    def __init__(self, serializer: Serializer, compression: Compression):
+        self.serializer = serializer
+        self.compression = compression
+        self.name = f"{serializer.name}+{compression.name}"
+        self.cacheable = serializer.cacheable
+
+    def dump(self, data, file):
+        with self.compression.open(file, "wb") as stream:
+            self.serializer.dump(data, stream)
+
+    def load(self, file):
+        with self.compression.open(file, "rb") as stream:
+            return self.serializer.load(stream)
+
+    def dump_project(self, project, file):
+        with self.compression.open(file, "wb") as stream:
+            self.serializer.dump_project(project, stream)
+
+    def detect(self, header: bytes) -> bool:
+        return header.startswith(self.compression.magic)
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    serializer.name: serializer
+    for serializer in [BinarySerializer(), JsonSerializer(), YamlSerializer()]
+}
+DEFAULT_SERIALIZER = SERIALIZERS["yaml"]
+COMPRESSIONS: Dict[str, Compression] = {
+    compression.name: compression
+    for compression in [GzipCompression(), XzCompression()]
+}
+HEADER_SIZE = 16
+# Corrupt gzip data raises OSError, which callers already report
+LOAD_ERRORS = (
+    yaml.YAMLError,
+    ValueError,
+    EOFError,
+    pickle.UnpicklingError,
+    lzma.LZMAError,
+)
+# Writing fails on the disk, or on data that the format can't represent
+SAVE_ERRORS = (
+    OSError,
+    FormatError,
+    yaml.YAMLError,
+    TypeError,
+    ValueError,
+    pickle.PicklingError,
+)
+
+
+def detect_serializer(header: bytes) -> Serializer:
+    """ Picks the serializer from the first bytes of a file """
+    for serializer in SERIALIZERS.values():
+        if serializer.detect(header):
+            return serializer
+    return DEFAULT_SERIALIZER
+
+
+def detect_file_serializer(file) -> Serializer:
+    """
+    Picks the serializer for the open binary file, looking inside compressed
+    files for the format. The file is left at its start.
+    """
+    header = file.read(HEADER_SIZE)
+    file.seek(0)
+    for compression in COMPRESSIONS.values():
+        if header.startswith(compression.magic):
+            try:
+                with compression.open(file, "rb") as stream:
+                    header = stream.read(HEADER_SIZE)
+            except LOAD_ERRORS as error:
+                raise FormatError(
+                    f"Invalid {compression.name} file: {error}"
+                ) from error
+            file.seek(0)
+            return CompressedSerializer(detect_serializer(header), compression)
+    return detect_serializer(header)
+
+
+def load_file(filename: str) -> Tuple[dict, Serializer]:
+    """ Loads the project data from file, returning it and the detected format """
+    with open(filename, "rb") as file:
+        serializer = detect_file_serializer(file)
+        try:
+            return (serializer.load(file), serializer)
+        except LOAD_ERRORS as error:
+            raise FormatError(f"Invalid {serializer.name} project: {error}") from error
+
+
+def current_umask() -> int:
+    """ The process' umask, which can only be read by setting it """
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once, as setting the umask affects files created by other threads
+NEW_FILE_MODE = 0o666 & ~current_umask()
+
+
+@contextlib.contextmanager
+def atomic_write(filename: str):
+    """
+    Opens a temporary file next to filename for binary writing, which replaces
+    filename only once it has been written completely. A crash or error while
+    writing leaves the original file untouched. The file keeps its mode, a
+    new file gets the mode open() would give it rather than mkstemp's 0600.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    (handle, temp_name) = tempfile.mkstemp(
+        prefix=os.path.basename(filename) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(handle, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(filename):
+            os.chmod(temp_name, stat.S_IMODE(os.stat(filename).st_mode))
+        else:
+            os.chmod(temp_name, NEW_FILE_MODE)
+        os.replace(temp_name, filename)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_name)
+        raise
+
+
+def save_file(filename: str, data, serializer: Serializer = DEFAULT_SERIALIZER):
+    """ Writes the project data to file in the given format """
+    with atomic_write(filename) as file:
+        serializer.dump(data, file)
+
+
+def save_project(filename: str, project, serializer: Serializer = DEFAULT_SERIALIZER):
+    """ Writes the project to file, streaming it where the format supports it """
+    with atomic_write(filename) as file:
+        serializer.dump_project(project, file)
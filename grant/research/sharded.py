@@ -0,0 +1,156 @@
+"""
+Sharded project layout, with one file per plan next to a small index
+
+The project file itself only holds the index: the project fields and, for
+every plan, its ID, ancestor fields, a summary of its task counts and the IDs
+of its tasks, so that they can be found without reading the shard. Indexes
+written before the task IDs were added still load. The goal and tasks of
+each plan are kept in a shard file named after the plan's ID in the
+<project>.plans directory. Shards are only read once their plan is
+materialized, and saving only rewrites the shards of plans that changed.
+
+A shard is read when the GUI first shows its plan's tasks, so a shard that
+cannot be read doesn't raise. Its plan gets an empty goal and no tasks, and
+the error is passed to the on_error callback given to open_shards(). The
+plan's load_error() tells it apart from an empty plan. The shard on disk, and
+its summary and task IDs in the index, are left alone unless the plan is
+edited, and such a project must not be saved anywhere else.
+"""
+
+import contextlib
+import os
+from typing import Callable, Optional, Set
+from grant.research.research import ProjectStats, ResearchProject
+from grant.research.serializers import DEFAULT_SERIALIZER, FormatError, Serializer
+from grant.research.serializers import load_file, save_file
+
+LAYOUT = "sharded"
+
+
+def shard_directory(filename: str) -> str:
+    """ The directory holding the plan shards of the given project index """
+    return filename + ".plans"
+
+
+def shard_filename(filename: str, plan_id: int) -> str:
+    """ The shard holding the goal and tasks of the plan """
+    return os.path.join(shard_directory(filename), f"{plan_id}.gra")
+
+
+def is_sharded(data: dict) -> bool:
+    """ Whether the loaded project data is a shard index """
+    return data.get("layout", "") == LAYOUT
+
+
+class PlanShard(dict):
+    """
+    The pythonic data of a plan from the index, which reads the goal and
+    tasks from the plan's shard when they are first accessed
+    """
+
+    def __init__(self, entry: dict, filename: str, on_error: Callable = None):
+        super().__init__(entry)
+        self.filename = filename
+        self.on_error = on_error
+        self.loaded = False
+        self.error: Optional[str] = None
+
+    def load(self):
+        """ Reads the goal and tasks from the shard, or reports why it can't """
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            (data, _) = load_file(self.filename)
+            if not isinstance(data, dict):
+                raise FormatError("Not a plan")
+        except (OSError, FormatError) as error:
+            self.error = f"Cannot read plan shard {self.filename}: {error}"
+            self["goal"] = ""
+            self["tasks"] = []
+            if self.on_error is not None:
+                self.on_error(self.error)
+            return
+        self["goal"] = data.get("goal", "")
+        self["tasks"] = data.get("tasks") or []
+
+    def get(self, key, default=None):
+        if key in ("goal", "tasks"):
+            self.load()
+        return super().get(key, default)
+
+    def __getitem__(self, key):
+        if key in ("goal", "tasks"):
+            self.load()
+        return super().__getitem__(key)
+
+
+def open_shards(filename: str, data: dict, on_error: Callable = None) -> bool:
+    """
+    Replaces the index entries of sharded project data by PlanShards, so that
+    the data can be loaded like any other project, lazily. Returns whether the
+    data is sharded. on_error is called with the message of every shard that
+    cannot be read.
+    """
+    if not is_sharded(data):
+        return False
+    data["plans"] = [
+        PlanShard(entry, shard_filename(filename, entry["id"]), on_error)
+        for entry in data["plans"]
+    ]
+    return True
+
+
+def save_sharded(
+    filename: str,
+    project: ResearchProject,
+    serializer: Serializer = DEFAULT_SERIALIZER,
+    changed: Set[int] = None,
+):
+    """
+    Writes the project as a shard index. With changed given, only the shards
+    of the plans with those IDs are rewritten, plus any that are missing, and
+    all shards otherwise. A changed plan is rewritten even if it isn't
+    materialized, as a plan put back by undo keeps its edited tasks unconverted.
+    Shards of plans that no longer exist are removed.
+    """
+    os.makedirs(shard_directory(filename), exist_ok=True)
+    entries = []
+    for plan in project.plans:
+        shard = shard_filename(filename, plan.id)
+        rewrite = changed is None or plan.id in changed or not os.path.exists(shard)
+        if rewrite:
+            data = plan.to_py()
+            save_file(shard, {"goal": data["goal"], "tasks": data["tasks"]}, serializer)
+        stats = ProjectStats()
+        stats.add_plan(plan)
+        entry = {
+            "id": plan.id,
+            "ancestor": plan.ancestor,
+            "ancestor_link": plan.ancestor_link,
+            "summary": stats.task_summary(),
+        }
+        task_ids = plan.task_ids(read=False)
+        unread = plan.unread_entry()
+        if not rewrite and unread is not None:
+            # The unreadable shard is kept, and so is what the index says of it
+            (entry["summary"], task_ids) = (
+                unread.get("summary"),
+                unread.get("task_ids"),
+            )
+        if task_ids is not None:
+            entry["task_ids"] = task_ids
+        entries.append(entry)
+
+    index = {"version": project.version, "gedcom": project.gedcom, "layout": LAYOUT}
+    index["plans"] = entries
+    save_file(filename, index, serializer)
+
+    # Only once the index no longer refers to them
+    shards = {
+        os.path.basename(shard_filename(filename, plan.id)) for plan in project.plans
+    }
+    for name in os.listdir(shard_directory(filename)):
+        if name.endswith(".gra") and name not in shards:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(shard_directory(filename), name))
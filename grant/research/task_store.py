@@ -0,0 +1,315 @@
+"""
+Keeps the tasks of a project in columns instead of one object per task
+
+The TaskStore holds one parallel array per task field, with a row per task,
+and records the plan each row belongs to. A plan's tasks become a TaskList of
+row numbers, and the tasks and results handed out are views that read and
+write those rows. They behave like ResearchTask and ResearchResult, so the
+rest of the application doesn't notice the difference, while filters,
+statistics and exports can scan a whole column at once.
+
+Rows are never moved, so a view stays valid for as long as the store exists.
+Deleted rows are only marked as such and revived when their view is put back
+into a plan.
+"""
+
+from array import array
+from typing import Iterator, List
+from collections.abc import MutableSequence
+from grant.research.research import ResearchTask, ResearchResult, StringTable
+from grant.research.research import convert_html, new_id
+
+OPEN = 0
+SUCCESS = 1
+NIL = 2
+DELETED = -1  # Plan id of rows that don't belong to any plan
+
+
+class TaskStore:
+    """ The columns holding the tasks of all plans of a project """
+
+    def __init__(self):
+        self.id = array("q")
+        self.source: List[str] = []
+        self.source_link: List[str] = []
+        self.description: List[str] = []
+        self.status = array("b")
+        self.date = []
+        self.document: List[str] = []
+        self.summary: List[str] = []
+        self.plan = array("q")
+        self.deleted = set()
+        self.plan_count = 0
+
+    def __len__(self):
+        """ Number of rows, including the deleted ones """
+        return len(self.plan)
+
+    def task_list(self) -> "TaskList":
+        """ Creates the task list of a new plan """
+        self.plan_count += 1
+        return TaskList(self, self.plan_count - 1)
+
+    def add_row(self, plan_id: int) -> int:
+        """ Appends an empty row and returns its number """
+        self.id.append(new_id())
+        self.source.append("")
+        self.source_link.append("")
+        self.description.append("")
+        self.status.append(OPEN)
+        self.date.append(None)
+        self.document.append("")
+        self.summary.append("")
+        self.plan.append(plan_id)
+        return len(self.plan) - 1
+
+    def add_py(self, plan_id: int, data: dict, strings: StringTable = None) -> int:
+        """ Appends a row from the pythonic task representation """
+        row = self.add_row(plan_id)
+        self.id[row] = data.get("id", self.id[row])
+        self.source[row] = data.get("source", "")
+        self.source_link[row] = data.get("source_link", "")
+        if strings is not None:
+            self.source[row] = strings.intern(self.source[row])
+            self.source_link[row] = strings.intern(self.source_link[row])
+        self.description[row] = convert_html(data.get("description", ""))
+        result = data.get("result", None)
+        if result is not None:
+            self.status[row] = NIL if result.get("nil", True) is True else SUCCESS
+            self.date[row] = result.get("date", None)
+            self.document[row] = result.get("document", "")
+            self.summary[row] = result.get("summary", "")
+        return row
+
+    def add_task(self, plan_id: int, task: ResearchTask) -> int:
+        """
+        Returns the row for a task that is put into a plan. Deleted rows of
+        this store are revived, anything else is copied into a new row.
+        """
+        if isinstance(task, TaskView) and task.store is self:
+            if task.row in self.deleted:
+                self.deleted.discard(task.row)
+                self.plan[task.row] = plan_id
+                return task.row
+        row = self.add_row(plan_id)
+        self.id[row] = task.id
+        self.source[row] = task.source
+        self.source_link[row] = task.source_link
+        self.description[row] = task.description
+        self.set_result(row, task.result)
+        return row
+
+    def delete_row(self, row: int):
+        """ Takes the row out of its plan, keeping its contents """
+        self.plan[row] = DELETED
+        self.deleted.add(row)
+
+    def set_result(self, row: int, result: ResearchResult):
+        """ Stores the result of the task in the row """
+        if isinstance(result, ResultView) and result.store is self:
+            if result.row == row:
+                return
+        if result is None:
+            self.status[row] = OPEN
+            self.date[row] = None
+            self.document[row] = ""
+            self.summary[row] = ""
+            return
+        self.status[row] = NIL if result.nil is True else SUCCESS
+        self.date[row] = result.date
+        self.document[row] = result.document
+        self.summary[row] = result.summary
+
+    def row_to_py(self, row: int) -> dict:
+        """ The pythonic task representation of a row """
+        result = None
+        if self.status[row] != OPEN:
+            result = {
+                "date": self.date[row],
+                "document": self.document[row],
+                "summary": self.summary[row],
+                "nil": self.status[row] == NIL,
+            }
+        return {
+            "id": self.id[row],
+            "source": self.source[row],
+            "source_link": self.source_link[row],
+            "description": self.description[row],
+            "result": result,
+        }
+
+    def rows(self) -> Iterator[int]:
+        """ The rows that belong to a plan """
+        if not self.deleted:
+            return iter(range(len(self.plan)))
+        return (row for row in range(len(self.plan)) if row not in self.deleted)
+
+    def count_status(self, status: int) -> int:
+        """ Number of tasks with the given status (OPEN, SUCCESS or NIL) """
+        deleted = sum(1 for row in self.deleted if self.status[row] == status)
+        return self.status.count(status) - deleted
+
+
+class ResultView(ResearchResult):
+    """ The result of a task stored in a TaskStore row """
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):  # pylint: disable=super-init-not-called
+        self.store = store
+        self.row = row
+
+    @property
+    def date(self):
+        """ When the result was found """
+        return self.store.date[self.row]
+
+    @date.setter
+    def date(self, value):
+        self.store.date[self.row] = value
+
+    @property
+    def document(self) -> str:
+        """ The document the result was found in """
+        return self.store.document[self.row]
+
+    @document.setter
+    def document(self, value: str):
+        self.store.document[self.row] = value
+
+    @property
+    def summary(self) -> str:
+        """ What was found """
+        return self.store.summary[self.row]
+
+    @summary.setter
+    def summary(self, value: str):
+        self.store.summary[self.row] = value
+
+    @property
+    def nil(self) -> bool:
+        """ Whether the result is negative """
+        return self.store.status[self.row] == NIL
+
+    @nil.setter
+    def nil(self, value: bool):
+        self.store.status[self.row] = NIL if value is True else SUCCESS
+
+
+class TaskView(ResearchTask):
+    """ A task stored in a TaskStore row """
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):  # pylint: disable=super-init-not-called
+        self.store = store
+        self.row = row
+
+    def __eq__(self, other):
+        if not isinstance(other, TaskView):
+            return NotImplemented
+        return self.store is other.store and self.row == other.row
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    @property
+    def id(self) -> int:  # pylint: disable=invalid-name
+        """ The ID of the task """
+        return self.store.id[self.row]
+
+    @id.setter
+    def id(self, value: int):  # pylint: disable=invalid-name
+        self.store.id[self.row] = value
+
+    @property
+    def source(self) -> str:
+        """ The name of the source to search """
+        return self.store.source[self.row]
+
+    @source.setter
+    def source(self, value: str):
+        self.store.source[self.row] = value
+
+    @property
+    def source_link(self) -> str:
+        """ The gedcom pointer of the source """
+        return self.store.source_link[self.row]
+
+    @source_link.setter
+    def source_link(self, value: str):
+        self.store.source_link[self.row] = value
+
+    @property
+    def description(self) -> str:
+        """ What to search for """
+        return self.store.description[self.row]
+
+    @description.setter
+    def description(self, value: str):
+        self.store.description[self.row] = value
+
+    @property
+    def result(self) -> ResearchResult:
+        """ The result, None while the task is open """
+        if self.store.status[self.row] == OPEN:
+            return None
+        return ResultView(self.store, self.row)
+
+    @result.setter
+    def result(self, value: ResearchResult):
+        self.store.set_result(self.row, value)
+
+    def to_py(self):
+        return self.store.row_to_py(self.row)
+
+    def is_open(self):
+        return self.store.status[self.row] == OPEN
+
+
+class TaskList(MutableSequence):
+    """ The tasks of one plan, as a list of TaskStore rows """
+
+    def __init__(self, store: TaskStore, plan_id: int):
+        self.store = store
+        self.plan_id = plan_id
+        self.rows = array("q")
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TaskView(self.store, row) for row in self.rows[index]]
+        return TaskView(self.store, self.rows[index])
+
+    def __iter__(self):
+        store = self.store
+        return (TaskView(store, row) for row in self.rows)
+
+    def __setitem__(self, index, task: ResearchTask):
+        if isinstance(index, slice):
+            raise TypeError("Task lists don't support slice assignment")
+        self.store.delete_row(self.rows[index])
+        self.rows[index] = self.store.add_task(self.plan_id, task)
+
+    def __delitem__(self, index):
+        positions = range(len(self.rows))[index]
+        if isinstance(positions, int):
+            positions = [positions]
+        for position in sorted(positions, reverse=True):
+            self.store.delete_row(self.rows[position])
+            del self.rows[position]
+
+    def insert(self, index: int, value: ResearchTask):
+        self.rows.insert(index, self.store.add_task(self.plan_id, value))
+
+    def extend_py(self, tasks_data: List[dict], strings: StringTable = None):
+        """ Appends tasks from their pythonic representations """
+        for task_data in tasks_data:
+            self.rows.append(self.store.add_py(self.plan_id, task_data, strings))
+
+    def detach(self):
+        """ Takes all tasks out of the store, e.g. when the plan is deleted """
+        for row in self.rows:
+            self.store.delete_row(row)
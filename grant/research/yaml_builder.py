@@ -0,0 +1,226 @@
+"""
+Builds a ResearchProject straight from the YAML event stream
+
+yaml.load() creates a generic tree of dicts and lists for the whole document,
+which ResearchProject.from_py() then walks a second time. The ProjectBuilder
+knows the project layout instead and creates the research objects while the
+parser is still running, so only the fields of the current task exist as
+plain python values at any one time.
+
+The builder goes through the same project and plan methods as from_py(), so
+the task store, string table, stats and ID index of the project are set up
+just the same. The entries of a shard index become lazy plans reading their
+shard, like open_shards() does for the pythonic data. A journal can only be
+replayed onto pythonic data, so projects that have one are loaded the usual
+way, see is_buildable().
+"""
+
+from typing import Callable, Iterator
+import yaml
+from yaml.events import AliasEvent, ScalarEvent
+from yaml.events import MappingStartEvent, MappingEndEvent
+from yaml.events import SequenceStartEvent, SequenceEndEvent
+from yaml.events import StreamStartEvent, StreamEndEvent
+from yaml.events import DocumentStartEvent, DocumentEndEvent
+from yaml.nodes import ScalarNode
+from grant.research.research import ResearchProject, ResearchPlan, ResearchTask
+from grant.research.serializers import DEFAULT_SERIALIZER, FormatError, YamlLoader
+from grant.research.serializers import detect_file_serializer
+from grant.research.journal import journal_size
+from grant.research.sharded import PlanShard, is_sharded, shard_filename
+
+STR_TAG = "tag:yaml.org,2002:str"
+
+
+class ProjectBuilder:
+    """
+    Consumes the parser events of a project document and fills in the empty
+    project. The scalars are resolved and constructed exactly like the safe
+    loader does, and any keys the research classes don't know about are
+    parsed and then ignored.
+    """
+
+    def __init__(self, stream, project: ResearchProject, on_shard_error=None):
+        self.loader = YamlLoader(stream)
+        self.project = project
+        self.on_shard_error = on_shard_error
+        self.progress = None
+        self.anchors = {}
+        self.new_ids = False
+
+    def build(self) -> bool:
+        """ Parses the whole stream, returns whether the project is sharded """
+        try:
+            self.expect(StreamStartEvent)
+            self.expect(DocumentStartEvent)
+            sharded = self.build_project()
+            self.expect(DocumentEndEvent)
+            self.expect(StreamEndEvent)
+        except (yaml.YAMLError, ValueError) as error:
+            raise FormatError(f"Invalid yaml project: {error}") from error
+        finally:
+            self.loader.dispose()
+        return sharded
+
+    def build_project(self) -> bool:
+        """ The top level mapping """
+        project = self.project
+        fields = {}
+        for key in self.mapping_keys("project"):
+            if key == "plans":
+                for _ in self.sequence_items("plans"):
+                    plan = self.build_plan()
+                    project.plans.append(plan)
+                    project.stats.add_plan(plan)
+                    if self.progress is not None:
+                        self.progress(len(project.plans), 0)
+            else:
+                fields[key] = self.value()
+        fields["plans"] = []
+        try:
+            project.from_py(fields)
+        except KeyError as error:
+            raise FormatError(f"Project is missing {error}") from error
+        project.new_ids = self.new_ids
+        return is_sharded(fields)
+
+    def build_plan(self) -> ResearchPlan:
+        """ One entry of the plans list, its tasks are added as they are parsed """
+        plan = ResearchPlan(self.project)
+        fields = {}
+        for key in self.mapping_keys("plan"):
+            if key == "tasks":
+                for _ in self.sequence_items("tasks"):
+                    self.build_task(plan)
+            else:
+                fields[key] = self.value()
+        if "id" not in fields:
+            self.new_ids = True
+        if "summary" in fields:
+            # An entry of a shard index, the tasks are read on demand
+            shard = shard_filename(self.project.filename, fields["id"])
+            plan.from_py(PlanShard(fields, shard, self.on_shard_error), lazy=True)
+        else:
+            plan.from_py(fields)
+        return plan
+
+    def build_task(self, plan: ResearchPlan):
+        """ One entry of a plan's tasks list """
+        fields = {key: self.value() for key in self.mapping_keys("task")}
+        if "id" not in fields:
+            self.new_ids = True
+        strings = self.project.strings
+        if self.project.store is not None:
+            plan.tasks.extend_py([fields], strings)
+        else:
+            task = ResearchTask()
+            task.from_py(fields, strings)
+            plan.tasks.append(task)
+
+    def expect(self, event_class):
+        """ Consumes the next event, which must be of the given class """
+        event = self.loader.get_event()
+        if not isinstance(event, event_class):
+            raise FormatError(f"Unexpected {event} in project")
+        return event
+
+    def mapping_keys(self, what: str) -> Iterator:
+        """ Yields the keys of a mapping, the caller has to consume each value """
+        if not self.loader.check_event(MappingStartEvent):
+            raise FormatError(f"Expected a mapping for the {what}")
+        self.loader.get_event()
+        while not self.loader.check_event(MappingEndEvent):
+            yield self.value()
+        self.loader.get_event()
+
+    def sequence_items(self, what: str) -> Iterator:
+        """ Yields once per item of a sequence, the caller has to consume it """
+        if self.loader.check_event(ScalarEvent) and self.value() is None:
+            return  # An empty "tasks:" entry
+        if not self.loader.check_event(SequenceStartEvent):
+            raise FormatError(f"Expected a list of {what}")
+        self.loader.get_event()
+        while not self.loader.check_event(SequenceEndEvent):
+            yield None
+        self.loader.get_event()
+
+    def value(self):
+        """ Constructs the next value generically, like the safe loader """
+        event = self.loader.get_event()
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self.anchors:
+                raise FormatError(f"Unknown alias {event.anchor}")
+            return self.anchors[event.anchor]
+        if isinstance(event, ScalarEvent):
+            value = self.scalar(event)
+        elif isinstance(event, SequenceStartEvent):
+            value = []
+            while not self.loader.check_event(SequenceEndEvent):
+                value.append(self.value())
+            self.loader.get_event()
+        elif isinstance(event, MappingStartEvent):
+            value = {}
+            while not self.loader.check_event(MappingEndEvent):
+                key = self.value()
+                value[key] = self.value()
+            self.loader.get_event()
+        else:
+            raise FormatError(f"Unexpected {event} in project")
+        if event.anchor is not None:
+            self.anchors[event.anchor] = value
+        return value
+
+    def scalar(self, event: ScalarEvent):
+        """ Resolves the tag of a scalar and constructs its value """
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = self.loader.resolve(ScalarNode, event.value, event.implicit)
+        if tag == STR_TAG:
+            return event.value
+        node = ScalarNode(tag, event.value, event.start_mark, event.end_mark)
+        constructor = self.loader.yaml_constructors.get(
+            tag, self.loader.yaml_constructors[None]
+        )
+        return constructor(self.loader, node)
+
+
+def build_project(
+    stream,
+    project: ResearchProject,
+    on_shard_error: Callable = None,
+    progress: Callable = None,
+) -> bool:
+    """
+    Builds the empty project from a YAML text or binary stream, returns
+    whether it is sharded. on_shard_error is passed on to the PlanShards.
+    progress is called like by ResearchProject.from_py(), except that the
+    total is 0 as the number of plans isn't known before the end.
+    """
+    builder = ProjectBuilder(stream, project, on_shard_error)
+    builder.progress = progress
+    return builder.build()
+
+
+def load_project(
+    filename: str,
+    project: ResearchProject,
+    on_shard_error: Callable = None,
+    progress: Callable = None,
+) -> bool:
+    """ Reads and builds the YAML project file, see build_project() """
+    with open(filename, "rb") as file:
+        return build_project(file, project, on_shard_error, progress)
+
+
+def is_buildable(filename: str) -> bool:
+    """
+    Whether the project file is plain YAML without a journal. False if the
+    file can't be read, so that the error is reported by the usual load.
+    """
+    if journal_size(filename) > 0:
+        return False
+    try:
+        with open(filename, "rb") as file:
+            return detect_file_serializer(file) is DEFAULT_SERIALIZER
+    except (OSError, FormatError):
+        return False
@@ -0,0 +1,57 @@
+""" Saves the project automatically after it has been edited """
+
+import os
+from PyQt5.QtCore import QElapsedTimer
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QTimer
+from grant.windows.project_file_manager import ProjectFileManager
+
+
+class AutoSaver(QObject):
+    """
+    Debounces bursts of edits and then has the project saved. A save happens
+    once there have been no edits for delay milliseconds, but is not postponed
+    for longer than max_delay. Edits are appended to the journal where that is
+    possible, otherwise the project is written in the background.
+    """
+
+    def __init__(self, project_manager: ProjectFileManager, parent=None):
+        super().__init__(parent)
+        self.project_manager = project_manager
+        self.enabled = True
+        self.delay = 2000
+        self.max_delay = 10000
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.save)
+        self.pending_since = QElapsedTimer()
+
+        self.project_manager.project_changed.connect(self.cancel)
+
+    def schedule(self):
+        """ Called for every edit, (re)starts the countdown to the next save """
+        if not self.enabled:
+            return
+        if not self.timer.isActive():
+            self.pending_since.start()
+        elif self.pending_since.elapsed() >= self.max_delay:
+            return  # Edits keep coming, don't postpone the save any further
+        self.timer.start(self.delay)
+
+    def cancel(self):
+        """ Drops any pending save """
+        self.timer.stop()
+
+    def save(self):
+        """ Writes the project if there is anything to save """
+        project = self.project_manager.project
+        if project is None or not self.project_manager.needs_saving:
+            return
+        if not os.path.exists(project.filename):
+            return  # Never saved by the user, so there is nowhere to save to
+        if self.project_manager.can_append_journal():
+            # Cheap, and compacts the journal in the background once it is big
+            self.project_manager.save_project()
+        elif not self.project_manager.save_in_background():
+            self.timer.start(self.delay)  # Still writing, try again later
@@ -23,7 +23,6 @@ class FilterSelectionScreen(SelectionScreen):
         super(FilterSelectionScreen, self).__init__(data_context)
 
         self.table_model = TableModel()
-        self.table_model.setSourceModel(self.data_context.data_model)
         self.tasks_model = TasksModel()
         self.tasks_model.setSourceModel(self.table_model)
 
@@ -53,9 +52,6 @@ class FilterSelectionScreen(SelectionScreen):
         self.table_view.selectionModel().selectionChanged.connect(
             self.selection_changed
         )
-        self.table_view.hideColumn(TreeModelCols.DESCRIPTION)
-        self.table_view.hideColumn(TreeModelCols.RESULT)
-        self.table_view.hideColumn(TreeModelCols.LINK)
 
         layout = QVBoxLayout()
         layout.addLayout(filter_widgets)
@@ -63,6 +59,23 @@ class FilterSelectionScreen(SelectionScreen):
 
         self.setLayout(layout)
 
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        """ Connect to the data model when the screen is first shown """
+        self.connect_models()
+        super().showEvent(event)
+
+    def connect_models(self):
+        """
+        Filtering visits every task, which would materialize lazily loaded
+        plans, so the filter models are only connected once they are needed
+        """
+        if self.table_model.sourceModel() is not None:
+            return
+        self.table_model.setSourceModel(self.data_context.data_model)
+        self.table_view.hideColumn(TreeModelCols.DESCRIPTION)
+        self.table_view.hideColumn(TreeModelCols.RESULT)
+        self.table_view.hideColumn(TreeModelCols.LINK)
+
     def selection_changed(self, selected, _):
         """ Handle changed selection """
         if len(selected.indexes()) < 1:
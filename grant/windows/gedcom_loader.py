@@ -0,0 +1,60 @@
+""" Loads the linked gedcom file in a background thread """
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QThread
+from gedcom.parser import GedcomFormatViolationError
+from grant.models.gedcom_cache import scan_cached
+from grant.models.gedcom_scanner import GedcomFile
+from grant.windows.project_loader import LoadCancelled
+
+
+class GedcomLoader(QThread):
+    """
+    Scans the gedcom file off the GUI thread, handing the individuals and
+    sources over in batches as they are found. The indexed file is available in
+    the gedcom_file attribute once the thread's finished signal has been
+    emitted.
+    """
+
+    batch = pyqtSignal(list, list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path: str, cache_directory: str = None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cache_directory = cache_directory
+        self.batch_size = 1000
+        self.gedcom_file = None
+
+    def run(self):
+        """ Worker entry point """
+        try:
+            gedcom_file = GedcomFile(self.file_path)
+        except FileNotFoundError:
+            self.failed.emit(
+                "The gedcom file at '" + self.file_path + "' could not be found"
+            )
+            return
+        except OSError as error:
+            self.failed.emit(str(error))
+            return
+
+        try:
+            scan_cached(
+                gedcom_file, self.cache_directory, self.report_batch, self.batch_size
+            )
+        except LoadCancelled:
+            gedcom_file.close()
+            return
+        except (OSError, GedcomFormatViolationError) as error:
+            gedcom_file.close()
+            self.failed.emit(str(error))
+            return
+
+        self.gedcom_file = gedcom_file
+
+    def report_batch(self, individuals: list, sources: list):
+        """ Called by the scan for every batch of records """
+        if self.isInterruptionRequested():
+            raise LoadCancelled()
+        self.batch.emit(individuals, sources)
@@ -1,87 +1,170 @@
 """ Manages the gedcom file link """
 
-from typing import List
+from typing import List, Optional, Tuple
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtCore import QObject
 from PyQt5.QtWidgets import QMessageBox
-from gedcom.parser import Parser
-from gedcom.element.individual import Element, IndividualElement
-from gedcom.tags import GEDCOM_TAG_SOURCE
+from grant.models.gedcom_cache import scan_cached
+from grant.models.gedcom_diff import GedcomChanges
+from grant.models.gedcom_scanner import GedcomFile
 from grant.models.individuals_model import Individual
 from grant.models.sources_model import Source
 from grant.windows.data_context import DataContext
+from grant.windows.gedcom_loader import GedcomLoader
 
 
 class GedcomManager(QObject):
     """ Manager for the gedcom link """
 
+    link_loaded = pyqtSignal()  # Once a background load added all records
+
     def __init__(self, data_context: DataContext, parent=None):
         super().__init__(parent)
-        self.parser = Parser()
         self.individuals: List[Individual] = []
         self.sources: List[Source] = []
+        self.gedcom_file: Optional[GedcomFile] = None
+        self.cache_directory: Optional[str] = None  # The user's cache if None
+        self.loader: Optional[GedcomLoader] = None
+        self.cancelled_loaders: List[GedcomLoader] = []  # Until they finished
+        self.batch_size = 1000  # Records per batch of a background load
         self.data_context = data_context
 
     def load_link(self, file_path):
         """ Loads filename and parses file """
         if file_path is None or file_path == "":
             return
+        result = self.scan_link(file_path)
+        if result is None:
+            return
+        (individuals, sources) = result
+        self.individuals.extend(individuals)
+        self.sources.extend(sources)
+        self.data_context.individuals_model.update_list(self.individuals)
+        self.data_context.sources_model.update_list(self.sources)
+
+    def scan_link(
+        self, file_path: str
+    ) -> Optional[Tuple[List[Individual], List[Source]]]:
+        """ Scans the file as the new link, None if it cannot be found """
+        self.cancel_load()
         try:
-            self.parser.parse_file(file_path)
+            gedcom_file = GedcomFile(file_path)
         except FileNotFoundError:
-            QMessageBox.warning(
-                self.parent(),
-                "Invalid Gedcom File",
-                "The gedcom file at '" + file_path + "' could not be found",
-                QMessageBox.Ok,
+            self.show_load_error(
+                "The gedcom file at '" + file_path + "' could not be found"
             )
+            return None
+        if self.gedcom_file is not None:
+            self.gedcom_file.close()
+        self.gedcom_file = gedcom_file  # Closed by clear_link, even if invalid
+        return scan_cached(gedcom_file, self.cache_directory)
+
+    def load_link_in_background(self, file_path: str):
+        """
+        Replaces the current link by the given file, which is loaded in a
+        GedcomLoader. The individuals and sources are added to the models
+        batch by batch, and link_loaded is emitted once all have been added.
+        """
+        self.clear_link()
+        if file_path is None or file_path == "":
             return
-        root_child_elements = self.parser.get_root_child_elements()
+        loader = GedcomLoader(file_path, self.cache_directory, self)
+        loader.batch_size = self.batch_size
+        loader.batch.connect(
+            lambda individuals, sources: self.add_batch(loader, individuals, sources)
+        )
+        loader.failed.connect(lambda message: self.load_failed(loader, message))
+        loader.finished.connect(lambda: self.background_load_finished(loader))
+        self.loader = loader
+        loader.start()
 
-        for element in root_child_elements:
-            if isinstance(element, IndividualElement):
-                self.add_individual(element)
-            if element.get_tag() == GEDCOM_TAG_SOURCE:
-                self.add_source(element)
-        self.data_context.individuals_model.update_list(self.individuals)
-        self.data_context.sources_model.update_list(self.sources)
+    def add_batch(self, loader: GedcomLoader, individuals: list, sources: list):
+        """ Appends a batch of records from the loader to the lists and models """
+        if loader is not self.loader:
+            return  # From a cancelled load
+        self.individuals.extend(individuals)
+        self.sources.extend(sources)
+        self.data_context.individuals_model.add_rows(individuals)
+        self.data_context.sources_model.add_rows(sources)
+
+    def load_failed(self, loader: GedcomLoader, message: str):
+        """ Shows why the loader could not load the gedcom file """
+        if loader is self.loader:
+            self.show_load_error(message)
 
-    def add_individual(self, element: IndividualElement):
-        """ Adds an individual to the list """
-        pointer = element.get_pointer()[1:-1]
-        (first, last) = element.get_name()
-        birth_year = element.get_birth_year()
-        death_year = element.get_death_year()
+    def background_load_finished(self, loader: GedcomLoader):
+        """ Takes over the indexed file of the loader once all batches were added """
+        loader.deleteLater()
+        if loader in self.cancelled_loaders:
+            self.cancelled_loaders.remove(loader)
+        if loader is not self.loader:
+            if loader.gedcom_file is not None:
+                loader.gedcom_file.close()
+            return
+        self.loader = None
+        if loader.gedcom_file is None:
+            return  # Failed, the error has been shown
+        self.gedcom_file = loader.gedcom_file
+        self.link_loaded.emit()
+
+    def cancel_load(self):
+        """ Stops a running background load, its batches are ignored """
+        if self.loader is None:
+            return
+        self.loader.requestInterruption()
+        self.cancelled_loaders.append(self.loader)
+        self.loader = None
 
-        self.individuals.append(
-            Individual(pointer, first, last, birth_year, death_year)
+    def wait_for_loader(self):
+        """ Cancels any background load and blocks until no loader is running """
+        self.cancel_load()
+        for loader in self.cancelled_loaders:
+            loader.wait()
+
+    def show_load_error(self, message: str):
+        """ Tells the user that the gedcom file cannot be loaded """
+        QMessageBox.warning(
+            self.parent(), "Invalid Gedcom File", message, QMessageBox.Ok,
         )
 
-    def add_source(self, source: Element):
-        """ Adds a source to the list """
-        pointer = source.get_pointer()[1:-1]
-        title = ""
-        author = ""
-        publisher = ""
-        abbreviation = ""
-        for element in source.get_child_elements():
-            if element.get_tag() == "TITL":
-                title = element.get_value()
-            if element.get_tag() == "AUTH":
-                author = element.get_value()
-            if element.get_tag() == "PUBL":
-                publisher = element.get_value()
-            if element.get_tag() == "ABBR":
-                abbreviation = element.get_value()
-        self.sources.append(Source(pointer, title, author, publisher, abbreviation))
+    def has_record(self, pointer: str) -> bool:
+        """ Whether the linked gedcom file has a record with the pointer """
+        return self.gedcom_file is not None and self.gedcom_file.has_record(pointer)
+
+    def record(self, pointer: str) -> Optional[List[str]]:
+        """ The lines of a full record of the linked file, read when asked for """
+        if self.gedcom_file is None:
+            return None
+        return self.gedcom_file.record(pointer)
 
     def clear_link(self):
         """ Unset everything """
+        self.cancel_load()
+        if self.gedcom_file is not None:
+            self.gedcom_file.close()
+            self.gedcom_file = None
         self.individuals.clear()
         self.sources.clear()
         self.data_context.individuals_model.update_list([])
         self.data_context.sources_model.update_list([])
 
-    def refresh_link(self, file_path: str):
-        """ Refresh caches from gedcom file """
-        self.clear_link()
-        self.load_link(file_path)
+    def refresh_link(self, file_path: str) -> Optional[GedcomChanges]:
+        """
+        Reloads the gedcom file and only applies the differences to the lists
+        and models, keeping the rows of unchanged records. Returns what
+        changed, None if the file could not be loaded.
+        """
+        if file_path is None or file_path == "":
+            self.clear_link()
+            return None
+        result = self.scan_link(file_path)
+        if result is None:
+            self.clear_link()
+            return None
+        (individuals, sources) = result
+        changes = GedcomChanges()
+        self.data_context.individuals_model.merge_list(individuals, changes)
+        self.data_context.sources_model.merge_list(sources, changes)
+        self.individuals[:] = individuals
+        self.sources[:] = sources
+        return changes
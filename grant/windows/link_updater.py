@@ -1,6 +1,7 @@
 """ Update linked items from Gedcom """
 
-from PyQt5.QtCore import Qt
+from typing import Callable, Optional
+from PyQt5.QtCore import QAbstractItemModel
 from PyQt5.QtCore import QModelIndex
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QMessageBox
@@ -14,10 +15,18 @@ class LinkUpdater:
     """
     Updates the ResearchProject task/source values from the linked GEDCOM
     file, based on the relevant link field
+
+    If given, has_record tells whether the GEDCOM file has a record with a
+    pointer, from the file's record index, and links without one are broken
+    without looking at the models. The current values are looked up by
+    pointer in the individuals and sources models.
     """
 
-    def __init__(self, context: DataContext):
+    def __init__(self, context: DataContext, has_record: Callable = None):
         self.data_context = context
+        self.has_record = has_record
+        self.individual_rows = {}
+        self.source_rows = {}
         self.clear_pending_updates()
         self.setup_confirmation_dialog()
 
@@ -53,6 +62,12 @@ class LinkUpdater:
         Checks whether any names in the project can be updated from the linked gedcom file
         """
         self.clear_pending_updates()
+        self.individual_rows = pointer_rows(
+            self.data_context.individuals_model, IndividualsModelColumns.POINTER
+        )
+        self.source_rows = pointer_rows(
+            self.data_context.sources_model, SourcesModelColumns.POINTER
+        )
 
         plans: int = self.data_context.data_model.rowCount(QModelIndex())
         for plan_row in range(plans):
@@ -60,6 +75,8 @@ class LinkUpdater:
                 plan_row, TreeModelCols.LINK, QModelIndex()
             )
             self._process_plan_index(plan_index)
+            if not plan_index.internalPointer().data.has_linked_tasks():
+                continue  # Saves converting the tasks of lazily loaded plans
             tasks: int = self.data_context.data_model.rowCount(plan_index)
             for task_row in range(tasks):
                 task_index = self.data_context.data_model.index(
@@ -68,49 +85,45 @@ class LinkUpdater:
                 self._process_task_index(task_index)
 
     def _process_plan_index(self, plan_index: QModelIndex):
-        """ blah """
+        """ Queues the update or fix of a plan's ancestor """
         if plan_index.data() == "":
             return
-        start_index = self.data_context.individuals_model.index(0, 0)
         plan_text = plan_index.siblingAtColumn(TreeModelCols.TEXT)
         plan_link = plan_index.siblingAtColumn(TreeModelCols.LINK)
 
-        matches = self.data_context.individuals_model.match(
-            start_index, Qt.DisplayRole, plan_index.data()
-        )
-        if len(matches) != 1:
-            # print("Broken Link - " + f"Plan {plan_index.row()}: {len(matches)} matches")
+        row = self.linked_row(plan_index.data(), self.individual_rows)
+        if row is None:
             self.ancestor_fixes.append({"index": plan_link, "value": ""})
             return
-        gedcom_value = (
-            matches[0].siblingAtColumn(IndividualsModelColumns.AUTOCOMPLETE).data()
-        )
+        gedcom_value = self.data_context.individuals_model.index(
+            row, IndividualsModelColumns.AUTOCOMPLETE
+        ).data()
         if gedcom_value != plan_text.data():
-            # print(f"Gedcom has changed: {plan_text} -> {gedcom_value}")
             self.ancestor_updates.append({"index": plan_text, "value": gedcom_value})
 
     def _process_task_index(self, task_index: QModelIndex):
-        """ blah """
+        """ Queues the update or fix of a task's source """
         if task_index.data() == "":
             return
-        start_index = self.data_context.sources_model.index(0, 0)
         task_text = task_index.siblingAtColumn(TreeModelCols.TEXT)
         task_link = task_index.siblingAtColumn(TreeModelCols.LINK)
 
-        matches = self.data_context.sources_model.match(
-            start_index, Qt.DisplayRole, task_index.data()
-        )
-        if len(matches) != 1:
-            # print("Broken Link - " + f"Task {task_index.row()}: {len(matches)} matches")
+        row = self.linked_row(task_index.data(), self.source_rows)
+        if row is None:
             self.source_fixes.append({"index": task_link, "value": ""})
             return
-        gedcom_value = (
-            matches[0].siblingAtColumn(SourcesModelColumns.AUTOCOMPLETE).data()
-        )
+        gedcom_value = self.data_context.sources_model.index(
+            row, SourcesModelColumns.AUTOCOMPLETE
+        ).data()
         if gedcom_value != task_text.data():
-            # print(f"Gedcom has changed: {task_text} -> {gedcom_value}")
             self.source_updates.append({"index": task_text, "value": gedcom_value})
 
+    def linked_row(self, pointer: str, rows: dict) -> Optional[int]:
+        """ The model row of the linked record, None if the link is broken """
+        if self.has_record is not None and not self.has_record(pointer):
+            return None
+        return rows.get(pointer, None)
+
     def commit_updates(self):
         """ Commit the pending updates """
         num_ancestor_updates = len(self.ancestor_updates)
@@ -158,3 +171,8 @@ class LinkUpdater:
         ):
             # print(f"Updating {update['index']} to {update['value']}")
             self.data_context.data_model.setData(update["index"], update["value"])
+
+
+def pointer_rows(model: QAbstractItemModel, column: int) -> dict:
+    """ Maps the pointers in the column of a gedcom model to their rows """
+    return {model.index(row, column).data(): row for row in range(model.rowCount())}
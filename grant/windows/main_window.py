@@ -1,14 +1,17 @@
 """ Contains the MainWindow implementation """
 
 import os
-import yaml
 from PyQt5.QtWidgets import QMainWindow
+from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtGui import QIcon
 from grant.research import ResearchProject
+from grant.research.yaml_builder import build_project
 from grant.windows.gedcom_manager import GedcomManager
 from grant.windows.data_context import DataContext
 from grant.windows.project_overview_dialog import ProjectOverviewDialog
 from grant.windows.link_updater import LinkUpdater
+from grant.windows.auto_saver import AutoSaver
+from grant.models.journal_recorder import JournalRecorder
 from .main_window_menu_bar import MenuBar
 from .main_screen import MainScreen
 from .project_file_manager import ProjectFileManager
@@ -42,14 +45,22 @@ class MainWindow(QMainWindow):
         self.data_context = DataContext()
         self.main_screen = None
         self.project_manager = ProjectFileManager(self)
+        self.project_manager.background_loading = True
+        self.project_manager.lazy_loading = True
+        self.project_manager.journaling = True
+        self.project_manager.recorder = JournalRecorder(
+            self.data_context.data_model, self
+        )
         self.gedcom_manager = GedcomManager(self.data_context, self)
+        self.gedcom_manager.link_loaded.connect(self.validate_links)
+        self.auto_saver = AutoSaver(self.project_manager, self)
         self.setup_window()
         self.setup_window_title()
         self.setup_menubar()
 
         if os.getenv("GRANT_TEST", "") != "":
             self.project_manager.project = ResearchProject("test_data")
-            self.project_manager.project.from_py(yaml.safe_load(TEST_DATA))
+            build_project(TEST_DATA, self.project_manager.project)
             self.project_manager.project_changed.emit()
 
     def setup_window_title(self):
@@ -77,11 +88,21 @@ class MainWindow(QMainWindow):
         def model_changed():
             self.project_manager.needs_saving = True
             self.setup_window_title()
+            self.auto_saver.schedule()
 
         self.data_context.data_model.dataChanged.connect(model_changed)
         self.data_context.data_model.layoutChanged.connect(model_changed)
+        self.data_context.data_model.rowsInserted.connect(model_changed)
         self.data_context.data_model.rowsRemoved.connect(model_changed)
 
+    def closeEvent(self, event):  # pylint: disable=invalid-name
+        """ Lets any background load or save complete before the window goes away """
+        self.auto_saver.cancel()
+        self.project_manager.wait_for_loader()
+        self.gedcom_manager.wait_for_loader()
+        self.project_manager.wait_for_writer()
+        super().closeEvent(event)
+
     def setup_menubar(self):
         """ Sets up the menu bar """
         self.menu_bar = MenuBar(self)
@@ -103,17 +124,19 @@ class MainWindow(QMainWindow):
         self.menu_bar.file_save_project_as_action.triggered.connect(
             self.project_manager.save_project_as
         )
+        self.menu_bar.edit_undo_action.triggered.connect(
+            self.data_context.data_model.undo
+        )
+        self.menu_bar.edit_redo_action.triggered.connect(
+            self.data_context.data_model.redo
+        )
         self.menu_bar.gedcom_link_action.triggered.connect(
             self.project_manager.link_gedcom_file
         )
         self.menu_bar.gedcom_unlink_action.triggered.connect(
             self.project_manager.unlink_gedcom_file
         )
-        self.menu_bar.gedcom_refresh_action.triggered.connect(
-            lambda: self.gedcom_manager.refresh_link(
-                self.project_manager.project.gedcom
-            )
-        )
+        self.menu_bar.gedcom_refresh_action.triggered.connect(self.refresh_gedcom)
 
         self.menu_bar.view_project_action.triggered.connect(
             lambda: self.main_screen.change_selection_screen("tree")
@@ -146,19 +169,42 @@ class MainWindow(QMainWindow):
 
         self.project_manager.project_changed.connect(enable_on_project_load)
 
+        undo_stack = self.data_context.data_model.undo_stack
+
+        def enable_undo_redo():
+            self.menu_bar.edit_undo_action.setEnabled(undo_stack.can_undo())
+            self.menu_bar.edit_redo_action.setEnabled(undo_stack.can_redo())
+
+        undo_stack.changed.connect(enable_undo_redo)
+
     def project_changed_handler(self):
         """ Updates all the screens with the new project information """
+        self.data_context.data_model.set_project(self.project_manager.project)
+        self.main_screen.set_project(self.project_manager.project)
         if (
             self.project_manager.project is None
             or self.project_manager.project.gedcom == ""
         ):
             self.gedcom_manager.clear_link()
+            self.validate_links()
         else:
-            self.gedcom_manager.load_link(self.project_manager.project.gedcom)
-        self.data_context.data_model.set_project(self.project_manager.project)
-        self.main_screen.set_project(self.project_manager.project)
-        updater = LinkUpdater(self.data_context)
+            # The links are validated once the gedcom file has been loaded
+            self.gedcom_manager.load_link_in_background(
+                self.project_manager.project.gedcom
+            )
+        self.setup_window_title()
+
+    def refresh_gedcom(self):
+        """ Reloads the linked gedcom file and tells what changed in it """
+        changes = self.gedcom_manager.refresh_link(self.project_manager.project.gedcom)
+        if changes is not None:
+            QMessageBox.information(self, "Gedcom File Reloaded", changes.summary())
+
+    def validate_links(self):
+        """ Offers to update the links of the project from the gedcom file """
+        if self.project_manager.project is None:
+            return
+        updater = LinkUpdater(self.data_context, self.gedcom_manager.has_record)
         updater.calculate_updates()
         if updater.has_pending_updates():
             updater.commit_updates()
-        self.setup_window_title()
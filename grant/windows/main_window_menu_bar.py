@@ -1,6 +1,7 @@
 """ MenuBar for the MainWindow """
 
 import sys
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import QMenuBar
 from PyQt5.QtWidgets import QAction
 from PyQt5.QtWidgets import QMessageBox
@@ -15,6 +16,7 @@ class MenuBar(QMenuBar):
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_file_menu()
+        self.setup_edit_menu()
         self.setup_gedcom_menu()
         self.setup_view_menu()
         self.setup_help_menu()
@@ -52,6 +54,20 @@ class MenuBar(QMenuBar):
         file_menu.addSeparator()
         file_menu.addAction(self.file_quit_action)
 
+    def setup_edit_menu(self):
+        """ Create the Edit menu """
+        self.edit_undo_action = QAction("&Undo", self)
+        self.edit_undo_action.setShortcut(QKeySequence.Undo)
+        self.edit_undo_action.setDisabled(True)
+
+        self.edit_redo_action = QAction("&Redo", self)
+        self.edit_redo_action.setShortcut(QKeySequence.Redo)
+        self.edit_redo_action.setDisabled(True)
+
+        edit_menu = self.addMenu("&Edit")
+        edit_menu.addAction(self.edit_undo_action)
+        edit_menu.addAction(self.edit_redo_action)
+
     def setup_gedcom_menu(self):
         """ Create the gedcom menu """
         self.gedcom_link_action = QAction("&Link Gedcom File", self)
@@ -2,26 +2,72 @@
 
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtCore import QObject
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtWidgets import QMessageBox
-import yaml
+from PyQt5.QtWidgets import QProgressDialog
 from grant.research import ResearchProject
+from grant.research.serializers import DEFAULT_SERIALIZER, SERIALIZERS
+from grant.research.serializers import COMPRESSIONS, CompressedSerializer
+from grant.research.serializers import SAVE_ERRORS, FormatError, save_project
+from grant.research.load_cache import load_file_cached
+from grant.research.parallel_loader import from_py_parallel
+from grant.research.task_store import TaskStore
+from grant.research.journal import append_records, journal_size, remove_journal
+from grant.research.journal import replay_journal, trim_journal
+from grant.research.sharded import open_shards, save_sharded
+from grant.research.yaml_builder import is_buildable, load_project
+from grant.windows.project_loader import ProjectLoader
+from grant.windows.project_writer import ProjectWriter
 
 
 class ProjectFileManager(QObject):
     """ Wraps file actions on project """
 
+    file_filters = {
+        "Grant Project (*.gra)": SERIALIZERS["yaml"],
+        "Grant Project - JSON (*.gra)": SERIALIZERS["json"],
+        "Grant Project - Binary (*.gra)": SERIALIZERS["binary"],
+        "Grant Project - Compressed (*.gra.gz)": CompressedSerializer(
+            SERIALIZERS["yaml"], COMPRESSIONS["gzip"]
+        ),
+        "Grant Project - Compressed, Smallest (*.gra.xz)": CompressedSerializer(
+            SERIALIZERS["yaml"], COMPRESSIONS["xz"]
+        ),
+    }
+    open_filter = "Grant Project (*.gra *.gra.gz *.gra.xz)"
+    sharded_filter = "Grant Project - One File per Plan (*.gra)"
+
     project_changed = pyqtSignal()
     project_saved = pyqtSignal()
+    load_progress = pyqtSignal(int, int)
+    shard_failed = pyqtSignal(str)  # A plan's shard could not be read
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.needs_saving = False
+        self.background_loading = False
+        self.lazy_loading = False
+        self.parallel_loading = False
+        self.columnar_tasks = False
+        self.sharded = False  # One file per plan, see grant.research.sharded
+        self.journaling = False
+        self.journal_limit = 256 * 1024
         self.project = None
+        self.serializer = DEFAULT_SERIALIZER
+        self.recorder = None
+        self.journal_base = None
+        self.loader = None
+        self.cancelled_loaders = []  # Kept until their threads have finished
+        self.writer = None
+        self.load_dialog = None
         self.project_discard = None
         self.gedcom_discard = None
 
         self.setup_project_discards()
+        # Shards are read while the views ask the model for rows, so the
+        # message is only shown once that is done
+        self.shard_failed.connect(self.show_shard_error, Qt.QueuedConnection)
 
     def setup_project_discards(self):
         """ Create re-usable dialogs """
@@ -39,38 +85,165 @@ class ProjectFileManager(QObject):
         self.gedcom_discard.setWindowTitle("Are you sure?")
         self.gedcom_discard.setStandardButtons(QMessageBox.Ok | QMessageBox.Cancel)
 
-    def save_project(self):
-        """ Saves the currently loaded project """
+    def save_project(self) -> bool:
+        """ Saves the currently loaded project, returns whether it was saved """
         if self.project is None:
-            return
+            return False
 
-        with open(self.project.filename, "w") as file:
-            yaml.dump(self.project.to_py(), file)
+        try:
+            if self.can_append_journal():
+                self.append_journal()
+            else:
+                self.write_project()
+        except SAVE_ERRORS as error:
+            self.show_save_error(str(error))
+            return False
         self.needs_saving = False
         self.project_saved.emit()
+        return True
+
+    def append_journal(self):
+        """ Appends the recorded edits to the journal, compacting it if it's big """
+        records = self.recorder.take_records()
+        try:
+            append_records(self.project.filename, records)
+        except SAVE_ERRORS:
+            self.recorder.records[:0] = records  # Still unsaved
+            raise
+        self.project.checkpoint()
+        if journal_size(self.project.filename) > self.journal_limit:
+            self.save_in_background()
+
+    def can_append_journal(self) -> bool:
+        """ Whether the edits can be appended to the journal of the file on disk """
+        return (
+            self.journaling
+            and self.recorder is not None
+            and self.recorder.project is self.project
+            and self.journal_base == self.project.filename
+            and not self.project.new_ids
+            and not self.sharded
+        )
+
+    def write_project(self):
+        """ Writes the whole project, which makes any journal obsolete """
+        self.wait_for_writer()
+        on_disk = self.sharded and self.journal_base == self.project.filename
+        if not on_disk:
+            unreadable = self.project.unreadable_plans()
+            if unreadable:
+                names = ", ".join(plan.ancestor for plan in unreadable)
+                raise FormatError(f"The plans of {names} could not be read")
+        if self.sharded:
+            # The shards on disk are up to date except for the changed plans
+            changed = self.project.changes.changed_plans() if on_disk else None
+            save_sharded(self.project.filename, self.project, self.serializer, changed)
+        else:
+            save_project(self.project.filename, self.project, self.serializer)
+        self.project.new_ids = False
+        self.project.checkpoint()
+        remove_journal(self.project.filename)
+        self.start_journal()
+
+    def start_journal(self):
+        """ The file on disk matches the project, so edits are journaled from here """
+        self.journal_base = self.project.filename
+        if self.recorder is not None:
+            self.recorder.track(self.project)
+
+    def save_in_background(self) -> bool:
+        """
+        Writes a snapshot of the project in a worker thread. Returns False if
+        the previous background write hasn't finished yet.
+        """
+        if self.project is None:
+            return True
+        if self.writer is not None:
+            return False
+        if self.sharded:
+            self.save_project()  # Only writes the changed plans, which is quick
+            return True
+
+        writer = ProjectWriter(self.project, self.serializer, self)
+        writer.journal_offset = journal_size(self.project.filename)
+        if self.recorder is not None:
+            writer.records = self.recorder.take_records()
+        writer.changes = self.project.checkpoint()
+        writer.finished.connect(lambda: self.writer_finished(writer))
+        self.writer = writer
+        self.needs_saving = False
+        writer.start()
+        return True
+
+    def wait_for_writer(self):
+        """ Blocks until any background write has completed """
+        if self.writer is None:
+            return
+        self.writer.wait()
+        self.writer_finished(self.writer)
+
+    def writer_finished(self, writer: ProjectWriter):
+        """ Takes care of the journal once a background write has completed """
+        if writer is not self.writer:
+            return  # Already handled by wait_for_writer()
+        self.writer = None
+        writer.deleteLater()
+
+        if writer.error is None:
+            trim_journal(writer.filename, writer.journal_offset)
+            if writer.project is self.project:
+                self.journal_base = writer.filename
+                self.project.new_ids = False
+                self.project_saved.emit()
+        else:
+            if writer.project is self.project:
+                # Nothing was written, so the edits still need saving
+                if self.recorder is not None:
+                    self.recorder.records[:0] = writer.records
+                writer.changes.update(self.project.changes)
+                self.project.changes = writer.changes
+                self.needs_saving = True
+            self.show_save_error(writer.error)
+
+    def record_change(self, record: dict):
+        """ Passes a change made outside the data model on to the journal """
+        if self.recorder is not None:
+            self.recorder.record(record)
 
     def save_project_as(self):
         """ Saves the currently loaded project as a new name """
         if self.project is None:
             return
 
-        (file_name, _) = QFileDialog.getSaveFileName(
-            self.parent(), "Save as ", ".", "Grant Project (*.gra)"
+        filters = list(self.file_filters) + [self.sharded_filter]
+        (file_name, file_filter) = QFileDialog.getSaveFileName(
+            self.parent(), "Save as ", ".", ";;".join(filters)
         )
         if file_name == "":
             return
 
+        previous = (self.project.filename, self.serializer, self.sharded)
         self.project.filename = file_name
-        self.save_project()
+        self.serializer = self.file_filters.get(file_filter, DEFAULT_SERIALIZER)
+        self.sharded = file_filter == self.sharded_filter
+        if not self.save_project():
+            (self.project.filename, self.serializer, self.sharded) = previous
+            return
 
         self.project_changed.emit()
 
+    def discard_confirmed(self) -> bool:
+        """ Asks before unsaved changes are thrown away, listing what changed """
+        if not self.needs_saving:
+            return True
+        changes = "" if self.project is None else self.project.changes.summary()
+        self.project_discard.setInformativeText(changes)
+        return self.project_discard.exec_() != QMessageBox.Cancel
+
     def create_new_project(self):
         """ Creates a new Research Project """
-        if self.needs_saving:
-            button = self.project_discard.exec_()
-            if button == QMessageBox.Cancel:
-                return
+        if not self.discard_confirmed():
+            return
 
         (file_name, _) = QFileDialog.getSaveFileName(
             self.parent(), "Create a project", ".", "Grant Project (*.gra)"
@@ -78,30 +251,178 @@ class ProjectFileManager(QObject):
         if file_name == "":
             return
 
-        self.project = ResearchProject(file_name)
+        self.project = self.new_project(file_name)
+        self.serializer = DEFAULT_SERIALIZER
+        self.sharded = False
         self.save_project()
 
         self.project_changed.emit()
 
+    def new_project(self, file_name: str) -> ResearchProject:
+        """ An empty project, keeping its tasks in columns if enabled """
+        return ResearchProject(file_name, TaskStore() if self.columnar_tasks else None)
+
     def open_project(self):
         """ Opens an existing project """
-        if self.needs_saving:
-            button = self.project_discard.exec_()
-            if button == QMessageBox.Cancel:
-                return
+        if not self.discard_confirmed():
+            return
 
         (file_name, _) = QFileDialog.getOpenFileName(
-            self.parent(), "Open a project", ".", "Grant Project (*.gra)"
+            self.parent(), "Open a project", ".", self.open_filter
         )
         if file_name == "":
             return
 
-        self.project = ResearchProject(file_name)
-        with open(self.project.filename) as file:
-            self.project.from_py(yaml.safe_load(file))
+        self.load_project(file_name)
+
+    def load_project(self, file_name: str):
+        """ Loads the given project file, in the background if enabled """
+        if self.background_loading:
+            self.start_background_load(file_name)
+            return
+
+        if not (self.lazy_loading or self.parallel_loading) and is_buildable(file_name):
+            self.build_project(file_name)
+            return
+
+        try:
+            (data, serializer) = load_file_cached(file_name)
+            replay_journal(file_name, data)
+        except (OSError, FormatError) as error:
+            self.show_load_error(str(error))
+            return
+
+        self.project = self.new_project(file_name)
+        self.sharded = open_shards(file_name, data, self.shard_failed.emit)
+        lazy = self.lazy_loading or self.sharded  # Shards are read on demand
+        if self.parallel_loading:
+            from_py_parallel(self.project, data, lazy=lazy)
+        else:
+            self.project.from_py(data, lazy=lazy)
+        self.serializer = serializer
+        self.start_journal()
+
+        self.project_changed.emit()
+
+    def build_project(self, file_name: str):
+        """
+        Loads a plain YAML project eagerly, building it straight from the
+        parser events rather than from the pythonic data
+        """
+        project = self.new_project(file_name)
+        try:
+            sharded = load_project(file_name, project, self.shard_failed.emit)
+        except (OSError, FormatError) as error:
+            self.show_load_error(str(error))
+            return
+
+        self.project = project
+        self.sharded = sharded
+        self.serializer = DEFAULT_SERIALIZER
+        self.start_journal()
+
+        self.project_changed.emit()
 
         self.project_changed.emit()
 
+    def start_background_load(self, file_name: str):
+        """ Starts loading the project file in a worker thread """
+        self.cancel_loading()
+
+        loader = ProjectLoader(file_name, self.lazy_loading, self)
+        loader.parallel = self.parallel_loading
+        loader.columnar = self.columnar_tasks
+        loader.on_shard_error = self.shard_failed.emit
+        loader.progress.connect(self.load_progress)
+        loader.progress.connect(self.update_load_dialog)
+        loader.failed.connect(self.show_load_error)
+        loader.finished.connect(lambda: self.background_load_finished(loader))
+        self.loader = loader
+
+        self.load_dialog = QProgressDialog(
+            "Opening project...", "Cancel", 0, 0, self.parent()
+        )
+        self.load_dialog.setWindowTitle("Please wait")
+        self.load_dialog.canceled.connect(self.cancel_loading)
+
+        loader.start()
+
+    def update_load_dialog(self, done: int, total: int):
+        """ Reflects the loader's progress in the dialog """
+        if self.load_dialog is None:
+            return
+        self.load_dialog.setMaximum(total)
+        self.load_dialog.setValue(done)
+
+    def cancel_loading(self):
+        """ Abandons any background load that is still in progress """
+        if self.loader is None:
+            return
+        self.loader.requestInterruption()
+        self.cancelled_loaders.append(self.loader)
+        self.loader = None
+        self.close_load_dialog()
+
+    def wait_for_loader(self):
+        """ Cancels any background load and blocks until no loader is running """
+        self.cancel_loading()
+        for loader in self.cancelled_loaders:
+            loader.wait()
+
+    def close_load_dialog(self):
+        """ Removes the progress dialog """
+        if self.load_dialog is None:
+            return
+        self.load_dialog.canceled.disconnect(self.cancel_loading)
+        self.load_dialog.reset()
+        self.load_dialog.deleteLater()
+        self.load_dialog = None
+
+    def background_load_finished(self, loader: ProjectLoader):
+        """ Takes over the loaded project on the GUI thread """
+        loader.deleteLater()
+        if loader in self.cancelled_loaders:
+            self.cancelled_loaders.remove(loader)
+        if loader is not self.loader:
+            return  # cancelled or superseded by another load
+        self.loader = None
+        self.close_load_dialog()
+        if loader.project is None:
+            return
+
+        self.project = loader.project
+        self.serializer = loader.serializer
+        self.sharded = loader.sharded
+        self.start_journal()
+        self.project_changed.emit()
+
+    def show_shard_error(self, message: str):
+        """ Tells the user that a plan of the project could not be read """
+        QMessageBox.warning(
+            self.parent(),
+            "Invalid Plan File",
+            message + "\nThe plan is shown without its goal and tasks.",
+            QMessageBox.Ok,
+        )
+
+    def show_save_error(self, message: str):
+        """ Tells the user that the project could not be saved """
+        QMessageBox.warning(
+            self.parent(),
+            "Project Not Saved",
+            "The project could not be saved: " + message,
+            QMessageBox.Ok,
+        )
+
+    def show_load_error(self, message: str):
+        """ Tells the user that the project could not be opened """
+        QMessageBox.warning(
+            self.parent(),
+            "Invalid Project File",
+            "The project could not be opened: " + message,
+            QMessageBox.Ok,
+        )
+
     def link_gedcom_file(self):
         """ Asks for the filename and then links that to the project """
         if self.project is None:
@@ -119,6 +440,8 @@ class ProjectFileManager(QObject):
             return
 
         self.project.gedcom = file_name
+        self.record_change({"op": "set", "field": "gedcom", "value": file_name})
+        self.project.changes.modify_field("gedcom")
         self.needs_saving = True
         self.project_changed.emit()
 
@@ -135,5 +458,7 @@ class ProjectFileManager(QObject):
             return
 
         self.project.gedcom = ""
+        self.record_change({"op": "set", "field": "gedcom", "value": ""})
+        self.project.changes.modify_field("gedcom")
         self.needs_saving = True
         self.project_changed.emit()
@@ -0,0 +1,77 @@
+""" Loads a project file in a background thread """
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QThread
+from grant.research import ResearchProject
+from grant.research.serializers import DEFAULT_SERIALIZER, FormatError
+from grant.research.load_cache import load_file_cached
+from grant.research.journal import replay_journal
+from grant.research.sharded import open_shards
+from grant.research.yaml_builder import is_buildable, load_project
+from grant.research.parallel_loader import from_py_parallel
+from grant.research.task_store import TaskStore
+
+
+class LoadCancelled(Exception):
+    """ Raised inside the worker to abort a cancelled load """
+
+
+class ProjectLoader(QThread):
+    """
+    Parses the project file and builds the ResearchProject off the GUI thread.
+    The finished project is available in the project attribute once the
+    thread's finished signal has been emitted.
+    """
+
+    progress = pyqtSignal(int, int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, filename: str, lazy: bool = False, parent=None):
+        super().__init__(parent)
+        self.filename = filename
+        self.lazy = lazy
+        self.parallel = False
+        self.columnar = False
+        self.project = None
+        self.serializer = None
+        self.sharded = False
+        self.on_shard_error = None  # Called for unreadable shards, see sharded
+
+    def run(self):
+        """ Worker entry point """
+        project = ResearchProject(self.filename, TaskStore() if self.columnar else None)
+        try:
+            if not (self.lazy or self.parallel) and is_buildable(self.filename):
+                # Plain YAML is built straight from the parser events
+                serializer = DEFAULT_SERIALIZER
+                self.sharded = load_project(
+                    self.filename, project, self.on_shard_error, self.report_progress
+                )
+            else:
+                (data, serializer) = load_file_cached(self.filename)
+                replay_journal(self.filename, data)
+                self.sharded = open_shards(self.filename, data, self.on_shard_error)
+                lazy = self.lazy or self.sharded  # Shards are read on demand
+                self.check_cancelled()
+                if self.parallel:
+                    from_py_parallel(project, data, self.report_progress, lazy)
+                else:
+                    project.from_py(data, self.report_progress, lazy)
+        except LoadCancelled:
+            return
+        except (OSError, FormatError) as error:
+            self.failed.emit(str(error))
+            return
+
+        self.serializer = serializer
+        self.project = project
+
+    def report_progress(self, done: int, total: int):
+        """ Called by the project for every plan that was converted """
+        self.check_cancelled()
+        self.progress.emit(done, total)
+
+    def check_cancelled(self):
+        """ Aborts the load if an interruption was requested """
+        if self.isInterruptionRequested():
+            raise LoadCancelled()
@@ -22,20 +22,25 @@ class ProjectOverviewDialog(QDialog):
         self.setWindowIcon(QIcon(":/icons/grant.ico"))
         self.setWindowTitle("Project Overview")
 
-        all_tasks = [task for plan in project.plans for task in plan.tasks]
+        stats = project.stats
 
         form_layout = QFormLayout()
 
         self.filename_label = QLabel(project.filename, self)
         self.filename_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
         form_layout.addRow(QLabel("Project File:"), self.filename_label)
-        form_layout.addRow(QLabel("Total Plans:"), QLabel(str(len(project.plans))))
+        form_layout.addRow(QLabel("Total Plans:"), QLabel(str(stats.plans)))
         form_layout.addRow(
-            QLabel("Total Tasks:"), QLabel(str(len(all_tasks))),
+            QLabel("Total Tasks:"), QLabel(str(stats.tasks)),
         )
         form_layout.addRow(
-            QLabel("Open Tasks:"),
-            QLabel(str(len([t for t in all_tasks if t.is_open()]))),
+            QLabel("Open Tasks:"), QLabel(str(stats.open_tasks)),
+        )
+        form_layout.addRow(
+            QLabel("Complete Tasks:"),
+            QLabel(
+                f"{stats.complete_tasks} ({stats.success} success, {stats.nil} nil)"
+            ),
         )
         form_layout.addRow(QLabel(""), QLabel(""))
 
@@ -50,12 +55,10 @@ class ProjectOverviewDialog(QDialog):
             QLabel("Sources Records:"), QLabel(str(context.sources_model.rowCount())),
         )
         form_layout.addRow(
-            QLabel("Linked Individuals:"),
-            QLabel(str(len([p for p in project.plans if p.ancestor_link != ""]))),
+            QLabel("Linked Individuals:"), QLabel(str(stats.linked_individuals)),
         )
         form_layout.addRow(
-            QLabel("Linked Sources:"),
-            QLabel(str(len([t for t in all_tasks if t.source_link != ""]))),
+            QLabel("Linked Sources:"), QLabel(str(stats.linked_sources)),
         )
 
         button_layout = QHBoxLayout()
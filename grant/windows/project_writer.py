@@ -0,0 +1,37 @@
+""" Writes a project snapshot in a background thread """
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import QThread
+from grant.research import ResearchProject
+from grant.research.changes import ChangeSet
+from grant.research.serializers import SAVE_ERRORS, Serializer, save_file
+
+
+class ProjectWriter(QThread):
+    """
+    Serializes a snapshot of the project to disk off the GUI thread. The
+    snapshot is taken when the writer is created, so the project can be edited
+    while the write is running. Any error is emitted by failed, and kept in
+    the error attribute once finished is emitted.
+    """
+
+    failed = pyqtSignal(str)
+
+    def __init__(self, project: ResearchProject, serializer: Serializer, parent=None):
+        super().__init__(parent)
+        self.project = project
+        self.filename = project.filename
+        self.data = project.to_py()
+        self.serializer = serializer
+        self.journal_offset = 0  # Bytes of the journal that the snapshot contains
+        self.records = []  # Unsaved journal records that the snapshot contains
+        self.changes = ChangeSet()  # Changes that the snapshot contains
+        self.error = None
+
+    def run(self):
+        """ Worker entry point """
+        try:
+            save_file(self.filename, self.data, self.serializer)
+        except SAVE_ERRORS as error:
+            self.error = str(error)
+            self.failed.emit(self.error)
@@ -68,9 +68,9 @@ class ResultDialog(QDialog):
         if self.status.currentText() == "<remove>":
             self.result = None
         else:
+            # A new result, the task only changes once it is handed the result
             success = self.status.currentText() == "success"
-            if self.result is None:
-                self.result = ResearchResult(success)
+            self.result = ResearchResult(success)
             self.result.summary = self.summary.toPlainText()
             self.result.document = self.document.text()
             self.result.nil = success is False
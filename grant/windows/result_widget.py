@@ -1,10 +1,10 @@
 """ A custom widget to display a ResearchResult """
 
-from PyQt5.QtCore import pyqtProperty
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import Qt
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QAction
+from PyQt5.QtWidgets import QItemDelegate
 from PyQt5.QtWidgets import QWidget
 from PyQt5.QtWidgets import QHBoxLayout
 from PyQt5.QtWidgets import QPushButton
@@ -41,7 +41,7 @@ class ResultWidget(QWidget):
 
         self.setLayout(result_box)
 
-    @pyqtProperty(QObject, user=True, notify=result_changed)
+    @property
     def result(self):
         """ Result property getter """
         return self._result
@@ -64,3 +64,25 @@ class ResultWidget(QWidget):
         """ Opens the result dialog """
         self.result = ResultDialog.get_result(self.result, self)
         self.result_changed.emit()
+
+
+class ResultDelegate(QItemDelegate):
+    """
+    Lets a QDataWidgetMapper fill in a ResultWidget. Results are plain python
+    objects rather than Qt types, so they can't be mapped through a Qt property
+    and are handed over directly instead.
+    """
+
+    def setEditorData(self, editor, index):  # pylint: disable=invalid-name
+        """ Model to widget """
+        if isinstance(editor, ResultWidget):
+            editor.result = index.data(Qt.EditRole)
+            return
+        super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):  # pylint: disable=invalid-name
+        """ Widget to model """
+        if isinstance(editor, ResultWidget):
+            model.setData(index, editor.result)
+            return
+        super().setModelData(editor, model, index)
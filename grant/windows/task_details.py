@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import QFormLayout
 from PyQt5.QtWidgets import QLabel, QLineEdit, QTextEdit, QGroupBox
 from PyQt5.QtWidgets import QDataWidgetMapper
 from grant.windows.base_screens import DetailScreen
-from grant.windows.result_widget import ResultWidget
+from grant.windows.result_widget import ResultDelegate, ResultWidget
 from grant.windows.linkedlineedit_widget import LinkedLineEdit
 from grant.models.sources_model import SourcesModelColumns
 from grant.models.tree_model import TreeModelCols
@@ -45,6 +45,7 @@ class TaskDetails(DetailScreen):
 
         self.mapper = QDataWidgetMapper()
         self.mapper.setModel(self.data_context.data_model)
+        self.mapper.setItemDelegate(ResultDelegate(self.mapper))
         self.mapper.addMapping(self.source, TreeModelCols.TEXT)
         self.mapper.addMapping(
             self.description, TreeModelCols.DESCRIPTION, b"plainText"
@@ -2,6 +2,7 @@
 Main file
 """
 import sys
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 from grant.windows import MainWindow
@@ -21,4 +22,5 @@ def main(argv):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Project loading may spawn workers
     main(sys.argv)
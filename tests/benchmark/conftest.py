@@ -0,0 +1,20 @@
+""" Common fixtures for the benchmarks """
+
+import os
+import pytest
+from tests.benchmark.generator import generate_project_data
+
+BENCHMARK_TASKS = int(os.getenv("GRANT_BENCHMARK_TASKS", "2000"))
+
+
+def make_project_data(num_tasks: int, tasks_per_plan: int = 20):
+    """ Creates the pythonic representation of a project with num_tasks tasks """
+    return generate_project_data(
+        plans=max(1, num_tasks // tasks_per_plan), tasks_per_plan=tasks_per_plan
+    )
+
+
+@pytest.fixture(scope="session")
+def large_project_data():
+    """ A large project in pythonic representation """
+    return make_project_data(BENCHMARK_TASKS)
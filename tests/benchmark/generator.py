@@ -0,0 +1,143 @@
+"""
+Generates reproducible synthetic projects for the benchmarks
+
+Can also be run on its own to write a .gra file, e.g.
+    python -m tests.benchmark.generator big.gra --plans 5000 --tasks-per-plan 20
+"""
+
+import argparse
+import datetime
+import itertools
+import random
+from grant.research.serializers import SERIALIZERS, save_file
+
+WORDS = [
+    "search",
+    "baptisms",
+    "burials",
+    "marriages",
+    "for",
+    "the",
+    "surname",
+    "and",
+    "variants",
+    "in",
+    "parish",
+    "register",
+    "census",
+    "of",
+    "household",
+    "check",
+    "witnesses",
+    "godparents",
+    "entries",
+    "between",
+    "years",
+    "index",
+]
+FORENAMES = ["William", "Maria", "Johann", "Anna", "Thomas", "Elizabeth", "Jacob"]
+SURNAMES = ["Fitzhugh", "Demarre", "Kuehne", "Smith", "Granthill", "Baker"]
+SOURCES = ["Parish Register", "Census", "Church Book", "Tax List", "Newspaper"]
+SOURCE_POOL = 200  # Distinct sources that the tasks refer to
+
+
+def make_text(generator: random.Random, length: int) -> str:
+    """ Random words adding up to roughly length characters """
+    words = []
+    size = 0
+    while size < length:
+        word = generator.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize()
+
+
+def make_result(generator: random.Random, description_length: int) -> dict:
+    """ The pythonic representation of a task result """
+    start = datetime.datetime(2015, 1, 1)
+    return {
+        "date": start + datetime.timedelta(minutes=generator.randrange(3000000)),
+        "document": f"DOC-{generator.randrange(100000):05}",
+        "summary": make_text(generator, description_length // 2),
+        "nil": generator.random() < 0.5,
+    }
+
+
+def make_task(
+    generator: random.Random, task_id: int, result_ratio: float, description_length
+):
+    """ The pythonic representation of a task """
+    source = generator.randrange(SOURCE_POOL)
+    result = None
+    if generator.random() < result_ratio:
+        result = make_result(generator, description_length)
+    return {
+        "id": task_id,
+        "source": f"{SOURCES[source % len(SOURCES)]} {source}",
+        "source_link": f"@S{source}@",
+        "description": make_text(generator, description_length),
+        "result": result,
+    }
+
+
+def generate_project_data(
+    plans: int = 100,
+    tasks_per_plan: int = 20,
+    result_ratio: float = 0.5,
+    description_length: int = 60,
+    seed: int = 0,
+) -> dict:
+    """
+    The pythonic representation of a project. The same arguments always give
+    the same project.
+    """
+    generator = random.Random(seed)
+    ids = itertools.count(1)
+    plans_data = []
+    for plan in range(plans):
+        born = generator.randrange(1700, 1900)
+        name = f"{generator.choice(FORENAMES)} {generator.choice(SURNAMES)}"
+        plans_data.append(
+            {
+                "id": next(ids),
+                "ancestor": f"{name} ({born} - {born + generator.randrange(20, 90)})",
+                "ancestor_link": f"@I{plan}@",
+                "goal": make_text(generator, description_length),
+                "tasks": [
+                    make_task(generator, next(ids), result_ratio, description_length)
+                    for _ in range(tasks_per_plan)
+                ],
+            }
+        )
+    return {"version": "1.0", "gedcom": "", "plans": plans_data}
+
+
+def generate_project(filename: str, serializer: str = "yaml", **kwargs):
+    """ Writes a generated project to filename, see generate_project_data() """
+    save_file(filename, generate_project_data(**kwargs), SERIALIZERS[serializer])
+
+
+def main(argv=None):
+    """ Command line entry point """
+    parser = argparse.ArgumentParser(description="Generate a synthetic project")
+    parser.add_argument("filename")
+    parser.add_argument("--plans", type=int, default=100)
+    parser.add_argument("--tasks-per-plan", type=int, default=20)
+    parser.add_argument("--result-ratio", type=float, default=0.5)
+    parser.add_argument("--description-length", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=list(SERIALIZERS), default="yaml")
+    args = parser.parse_args(argv)
+    generate_project(
+        args.filename,
+        args.format,
+        plans=args.plans,
+        tasks_per_plan=args.tasks_per_plan,
+        result_ratio=args.result_ratio,
+        description_length=args.description_length,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+""" Compares convert_html() with the QTextDocument conversion it replaced """
+
+import random
+import time
+from PyQt5.QtGui import QTextDocument
+from grant.research.research import convert_html
+
+DESCRIPTIONS = 100000
+HTML_SHARE = 0.1  # Older projects stored some descriptions as QTextEdit HTML
+
+
+def qt_convert(text: str) -> str:
+    """ The previous implementation """
+    document = QTextDocument()
+    document.setHtml(text)
+    return document.toPlainText().strip()
+
+
+def make_descriptions(count: int):
+    """ Mostly plain descriptions, with some in the HTML a QTextEdit writes """
+    generator = random.Random(42)
+    words = ["Search", "baptisms", "for", "the", "surname", "1841", "&", "and"]
+    descriptions = []
+    for _ in range(count):
+        text = " ".join(generator.choice(words) for _ in range(12))
+        if generator.random() < HTML_SHARE:
+            document = QTextDocument()
+            document.setPlainText(text)
+            text = document.toHtml()
+        descriptions.append(text)
+    return descriptions
+
+
+def test_convert_html_benchmark():
+    """ Convert 100k descriptions both ways """
+    # Given
+    descriptions = make_descriptions(DESCRIPTIONS)
+
+    # When
+    start = time.perf_counter()
+    converted = [convert_html(text) for text in descriptions]
+    fast_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [qt_convert(text) for text in descriptions]
+    qt_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\nconvert_html, {DESCRIPTIONS} descriptions: "
+        f"QTextDocument {qt_time:.3f}s, fast path {fast_time:.3f}s"
+    )
+    assert converted == expected
@@ -0,0 +1,70 @@
+""" Compares ways of reading the individuals and sources of a large gedcom file """
+
+import time
+from gedcom.parser import Parser
+from grant.models.gedcom_cache import scan_cached
+from grant.models.gedcom_scanner import GedcomFile, scan_gedcom
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def write_large_gedcom(filename: str, count: int):
+    """ Writes a gedcom file with count individuals and count sources """
+    with open(filename, "w", encoding="utf-8", newline="") as file:
+        file.write("0 HEAD\r\n1 CHAR UTF-8\r\n")
+        for number in range(count):
+            file.write(
+                f"0 @I{number}@ INDI\r\n1 NAME Given{number} /Surname/\r\n"
+                f"1 SEX M\r\n1 BIRT\r\n2 DATE 1 JAN {1700 + number % 200}\r\n"
+                "2 PLAC Somewhere\r\n1 DEAT\r\n2 DATE 1800\r\n"
+                f"1 FAMS @F{number}@\r\n"
+            )
+            file.write(
+                f"0 @S{number}@ SOUR\r\n1 TITL Title {number}\r\n"
+                "1 AUTH Author\r\n1 PUBL Publisher\r\n1 NOTE Some note\r\n"
+            )
+        file.write("0 TRLR\r\n")
+
+
+def test_gedcom_scanner_benchmark(tmpdir):
+    """ Read the same gedcom file with the scanner and with the parser """
+    # Given
+    filename = str(tmpdir.join("benchmark.ged"))
+    write_large_gedcom(filename, BENCHMARK_TASKS * 5)
+
+    # When
+    start = time.perf_counter()
+    Parser().parse_file(filename)
+    parse_time = time.perf_counter() - start
+    start = time.perf_counter()
+    (individuals, sources) = scan_gedcom(filename)
+    scan_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\ngedcom, {BENCHMARK_TASKS * 5} individuals: "
+        f"parser {parse_time:.3f}s, scanner {scan_time:.3f}s"
+    )
+    assert len(individuals) == len(sources) == BENCHMARK_TASKS * 5
+
+
+def test_gedcom_cache_benchmark(tmpdir):
+    """ Scan the same gedcom file once to fill the cache and once from it """
+    # Given
+    filename = str(tmpdir.join("benchmark.ged"))
+    write_large_gedcom(filename, BENCHMARK_TASKS * 5)
+    cache_directory = str(tmpdir.join("cache"))
+
+    # When
+    start = time.perf_counter()
+    scan_cached(GedcomFile(filename), cache_directory)
+    scan_time = time.perf_counter() - start
+    start = time.perf_counter()
+    (individuals, sources) = scan_cached(GedcomFile(filename), cache_directory)
+    cached_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\ngedcom cache, {BENCHMARK_TASKS * 5} individuals: "
+        f"scan and cache {scan_time:.3f}s, from cache {cached_time:.3f}s"
+    )
+    assert len(individuals) == len(sources) == BENCHMARK_TASKS * 5
@@ -0,0 +1,40 @@
+""" Tests for the synthetic project generator """
+
+from grant.research.serializers import load_file
+from tests.benchmark.generator import generate_project_data, main
+
+
+def test_same_seed_gives_same_project():
+    """ Generated projects are reproducible """
+    # When
+    first = generate_project_data(plans=5, seed=3)
+    second = generate_project_data(plans=5, seed=3)
+
+    # Then
+    assert first == second
+    assert first != generate_project_data(plans=5, seed=4)
+
+
+def test_project_has_requested_shape():
+    """ The number of plans and tasks and the share of results are as asked """
+    # When
+    data = generate_project_data(plans=10, tasks_per_plan=30, result_ratio=0)
+
+    # Then
+    assert len(data["plans"]) == 10
+    assert all(len(plan["tasks"]) == 30 for plan in data["plans"])
+    assert all(task["result"] is None for task in data["plans"][0]["tasks"])
+
+
+def test_command_line_writes_project(tmpdir):
+    """ The generator can write a project file from the command line """
+    # Given
+    filename = str(tmpdir.join("generated.gra"))
+
+    # When
+    main([filename, "--plans", "3", "--tasks-per-plan", "2", "--format", "json"])
+
+    # Then
+    (data, serializer) = load_file(filename)
+    assert serializer.name == "json"
+    assert data == generate_project_data(plans=3, tasks_per_plan=2)
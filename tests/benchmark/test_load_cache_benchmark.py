@@ -0,0 +1,28 @@
+""" Compares loading a YAML project with and without the load cache """
+
+import time
+from grant.research.load_cache import load_file_cached
+from grant.research.serializers import save_file
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def test_load_cache_benchmark(large_project_data, tmpdir):
+    """ Load a large project once to fill the cache and once from it """
+    # Given
+    filename = str(tmpdir.join("benchmark.gra"))
+    save_file(filename, large_project_data)
+
+    # When
+    start = time.perf_counter()
+    (parsed, _) = load_file_cached(filename)
+    parse_time = time.perf_counter() - start
+    start = time.perf_counter()
+    (cached, _) = load_file_cached(filename)
+    cached_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\nload cache, {BENCHMARK_TASKS} tasks: "
+        f"parse and cache {parse_time:.3f}s, from cache {cached_time:.3f}s"
+    )
+    assert parsed == cached == large_project_data
@@ -0,0 +1,30 @@
+""" Compares converting the plans serially and in worker processes """
+
+import os
+import time
+from grant.research import ResearchProject
+from grant.research.parallel_loader import from_py_parallel
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def test_parallel_loader_benchmark(large_project_data):
+    """ Convert a large project both ways """
+    # Given
+    processes = max(2, os.cpu_count() or 1)
+
+    # When
+    start = time.perf_counter()
+    expected = ResearchProject("")
+    expected.from_py(large_project_data)
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    project = ResearchProject("")
+    from_py_parallel(project, large_project_data, processes=processes, threshold=0)
+    parallel_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\nparallel loader, {BENCHMARK_TASKS} tasks: serial {serial_time:.3f}s, "
+        f"{processes} processes {parallel_time:.3f}s"
+    )
+    assert project.to_py() == expected.to_py()
@@ -0,0 +1,41 @@
+""" Compares the peak memory of dumping to_py() with streaming the project """
+
+import time
+import tracemalloc
+from grant.research import ResearchProject
+from grant.research.serializers import save_file, save_project, load_file
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def measure(function):
+    """ Returns the run time and peak memory of calling function """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (elapsed, peak)
+
+
+def test_project_writer_benchmark(large_project_data, tmpdir):
+    """ Save a large project both ways """
+    # Given
+    project = ResearchProject("")
+    project.from_py(large_project_data)
+    dumped = str(tmpdir.join("dumped.gra"))
+    streamed = str(tmpdir.join("streamed.gra"))
+
+    # When
+    (dump_time, dump_peak) = measure(lambda: save_file(dumped, project.to_py()))
+    (stream_time, stream_peak) = measure(lambda: save_project(streamed, project))
+
+    # Then
+    print(
+        f"\nproject writer, {BENCHMARK_TASKS} tasks: "
+        f"to_py + dump {dump_time:.3f}s peak {dump_peak / 2**20:.1f}MiB, "
+        f"streamed {stream_time:.3f}s peak {stream_peak / 2**20:.1f}MiB"
+    )
+    with open(dumped, "rb") as file_one, open(streamed, "rb") as file_two:
+        assert file_one.read() == file_two.read()
+    assert load_file(streamed)[0] == project.to_py()
@@ -0,0 +1,85 @@
+""" Measures the memory the research classes need per task """
+
+import gc
+import os
+import tracemalloc
+from PyQt5.QtCore import QObject
+from grant.research import ResearchProject
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+class BaselineResult(QObject):
+    """ ResearchResult as it was, a QObject so that a Qt property can carry it """
+
+    def __init__(self, data: dict):
+        super().__init__()
+        self.date = data.get("date", None)
+        self.document = data.get("document", "")
+        self.summary = data.get("summary", "")
+        self.nil = data.get("nil", True)
+
+
+class BaselineTask:
+    """ ResearchTask as it was, with an instance dict and without shared strings """
+
+    def __init__(self, data: dict):
+        self.source = data.get("source", "")
+        self.source_link = data.get("source_link", "")
+        self.description = data.get("description", "")
+        result = data.get("result", None)
+        self.result = None if result is None else BaselineResult(result)
+
+
+def resident_size() -> int:
+    """ Resident memory of the process in bytes, 0 where it can't be read """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def measure(build) -> tuple:
+    """
+    Returns what build() returned, and the python heap and resident memory
+    it added. Only the latter includes the C++ side of QObjects.
+    """
+    gc.collect()
+    resident = resident_size()
+    tracemalloc.start()
+    result = build()
+    (current, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (result, current, resident_size() - resident)
+
+
+def test_research_memory_benchmark(large_project_data):
+    """ Memory of the converted project per task, against the QObject baseline """
+
+    def build_baseline():
+        return [
+            [BaselineTask(task) for task in plan["tasks"]]
+            for plan in large_project_data["plans"]
+        ]
+
+    def build_project():
+        project = ResearchProject("")
+        project.from_py(large_project_data)
+        return project
+
+    # When
+    (baseline, baseline_heap, baseline_resident) = measure(build_baseline)
+    (project, heap, resident) = measure(build_project)
+
+    # Then
+    tasks = sum(len(plan.tasks) for plan in project.plans)
+    sharing = project.string_sharing()
+    print(
+        f"\nresearch memory, {BENCHMARK_TASKS} tasks: {heap / tasks:.0f}B per task "
+        f"against {baseline_heap / tasks:.0f}B for the QObject baseline "
+        f"(ratio {heap / baseline_heap:.2f}), resident "
+        f"{resident / tasks:.0f}B against {baseline_resident / tasks:.0f}B, "
+        f"{sharing['saved_bytes'] / tasks:.0f}B per task saved by sharing strings"
+    )
+    assert tasks == sum(len(plan) for plan in baseline)
+    assert heap < baseline_heap
@@ -0,0 +1,149 @@
+"""
+Records how loading and saving scale with the size of the project
+
+Every operation is run twice, once to time it and once under tracemalloc for
+its peak memory, since tracing slows python down considerably. Sizes above
+GRANT_BENCHMARK_MAX_TASKS are skipped. If GRANT_BENCHMARK_RESULTS names a
+file, every measurement is appended to it as a line of JSON.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+import pytest
+from PyQt5.QtWidgets import QFileDialog
+from grant.research import ResearchProject
+from grant.research.load_cache import cache_filename
+from grant.research.serializers import load_file, save_file
+from grant.windows.project_file_manager import ProjectFileManager
+from tests.benchmark.generator import generate_project_data
+
+SIZES = [1000, 10000, 100000, 1000000]
+TASKS_PER_PLAN = 20
+MAX_TASKS = int(os.getenv("GRANT_BENCHMARK_MAX_TASKS", "1000"))
+RESULTS = os.getenv("GRANT_BENCHMARK_RESULTS", "")
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}tasks")
+def generated_project(request, tmp_path_factory):
+    """ The data of a generated project and the file it was saved to """
+    tasks = request.param
+    if tasks > MAX_TASKS:
+        pytest.skip(f"{tasks} tasks is above GRANT_BENCHMARK_MAX_TASKS")
+    data = generate_project_data(plans=tasks // TASKS_PER_PLAN)
+    filename = str(tmp_path_factory.mktemp("scaling").joinpath("project.gra"))
+    save_file(filename, data)
+    return (tasks, data, filename)
+
+
+@pytest.fixture
+def manager(qapp):  # pylint: disable=unused-argument
+    """ A project manager that loads and saves synchronously """
+    return ProjectFileManager()
+
+
+def measure(record_property, operation: str, tasks: int, function, setup=None):
+    """ Times function and measures its peak memory, calling setup before each """
+    if setup is not None:
+        setup()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    function()
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    record_property("seconds", round(elapsed, 4))
+    record_property("peak_bytes", peak)
+    print(f"\n{operation}, {tasks} tasks: {elapsed:.3f}s, peak {peak / 2**20:.1f}MiB")
+    if RESULTS:
+        with open(RESULTS, "a") as file:
+            result = {"operation": operation, "tasks": tasks}
+            result.update({"seconds": elapsed, "peak_bytes": peak})
+            file.write(json.dumps(result) + "\n")
+
+
+def open_file(manager: ProjectFileManager, filename: str, monkeypatch):
+    """ Opens filename through the file dialog code path """
+    monkeypatch.setattr(QFileDialog, "getOpenFileName", lambda *args: (filename, ""))
+    manager.open_project()
+
+
+def remove_cache(filename: str):
+    """ Makes the next load parse the file again """
+    if os.path.exists(cache_filename(filename)):
+        os.remove(cache_filename(filename))
+
+
+def test_from_py(generated_project, record_property):
+    """ Converting the pythonic data into the research classes """
+    (tasks, data, _) = generated_project
+    measure(
+        record_property, "from_py", tasks, lambda: ResearchProject("").from_py(data),
+    )
+
+
+def test_to_py(generated_project, record_property):
+    """ Converting the research classes back into pythonic data """
+    (tasks, data, _) = generated_project
+    project = ResearchProject("")
+    project.from_py(data)
+    measure(record_property, "to_py", tasks, project.to_py)
+
+
+def test_open_project(generated_project, record_property, manager, monkeypatch):
+    """ Opening a project that was never loaded before """
+    (tasks, _, filename) = generated_project
+    measure(
+        record_property,
+        "open_project",
+        tasks,
+        lambda: open_file(manager, filename, monkeypatch),
+        lambda: remove_cache(filename),
+    )
+    assert len(manager.project.plans) == tasks // TASKS_PER_PLAN
+
+
+def test_reopen_project(generated_project, record_property, manager, monkeypatch):
+    """ Opening a project again, with its load cache in place """
+    (tasks, _, filename) = generated_project
+    open_file(manager, filename, monkeypatch)
+    measure(
+        record_property,
+        "reopen_project",
+        tasks,
+        lambda: open_file(manager, filename, monkeypatch),
+    )
+
+
+def test_save_project(generated_project, record_property, manager, monkeypatch):
+    """ Writing a loaded project """
+    (tasks, _, filename) = generated_project
+    open_file(manager, filename, monkeypatch)
+    manager.project.filename = filename + ".saved"
+    measure(record_property, "save_project", tasks, manager.save_project)
+
+
+def test_round_trip(generated_project, record_property, manager, monkeypatch):
+    """ Opening a project and saving it again gives the same data """
+    (tasks, data, filename) = generated_project
+    copy = filename + ".copy"
+
+    def round_trip():
+        open_file(manager, filename, monkeypatch)
+        manager.project.filename = copy
+        manager.save_project()
+
+    measure(
+        record_property,
+        "round_trip",
+        tasks,
+        round_trip,
+        lambda: remove_cache(filename),
+    )
+    assert load_file(copy)[0] == data
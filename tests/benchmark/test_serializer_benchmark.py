@@ -0,0 +1,81 @@
+""" Compares load and save times of the project file serializers """
+
+import time
+import pytest
+import yaml
+from grant.research.serializers import SERIALIZERS, load_file, save_file
+from grant.research.serializers import COMPRESSIONS, CompressedSerializer
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def _timed(function, *args):
+    """ Returns the result and the runtime of function """
+    start = time.perf_counter()
+    result = function(*args)
+    return (result, time.perf_counter() - start)
+
+
+def test_pure_python_yaml_baseline(large_project_data, tmpdir):
+    """ The way projects were saved and loaded before serializers """
+    # Given
+    filename = tmpdir.join("baseline.gra")
+
+    # When
+    def save():
+        with open(filename, "w") as file:
+            yaml.dump(large_project_data, file)
+
+    def load():
+        with open(filename) as file:
+            return yaml.safe_load(file)
+
+    (_, save_time) = _timed(save)
+    (data, load_time) = _timed(load)
+
+    # Then
+    print(
+        f"\npure-python yaml, {BENCHMARK_TASKS} tasks: "
+        f"save {save_time:.3f}s, load {load_time:.3f}s, {filename.size()} bytes"
+    )
+    assert data == large_project_data
+
+
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_serializer_benchmark(name, large_project_data, tmpdir):
+    """ Save and load a large project with every serializer """
+    # Given
+    filename = str(tmpdir.join(f"benchmark.{name}"))
+    serializer = SERIALIZERS[name]
+
+    # When
+    (_, save_time) = _timed(save_file, filename, large_project_data, serializer)
+    ((data, detected), load_time) = _timed(load_file, filename)
+
+    # Then
+    print(
+        f"\n{name}, {BENCHMARK_TASKS} tasks: "
+        f"save {save_time:.3f}s, load {load_time:.3f}s, "
+        f"{tmpdir.join(f'benchmark.{name}').size()} bytes"
+    )
+    assert detected is serializer
+    assert data == large_project_data
+
+
+@pytest.mark.parametrize("compression", ["gzip", "xz"])
+def test_compressed_yaml_benchmark(compression, large_project_data, tmpdir):
+    """ Save and load a large project as compressed YAML """
+    # Given
+    filename = tmpdir.join(f"benchmark.yaml.{compression}")
+    serializer = CompressedSerializer(SERIALIZERS["yaml"], COMPRESSIONS[compression])
+
+    # When
+    (_, save_time) = _timed(save_file, str(filename), large_project_data, serializer)
+    ((data, detected), load_time) = _timed(load_file, str(filename))
+
+    # Then
+    print(
+        f"\nyaml+{compression}, {BENCHMARK_TASKS} tasks: "
+        f"save {save_time:.3f}s, load {load_time:.3f}s, {filename.size()} bytes"
+    )
+    assert detected.name == serializer.name
+    assert data == large_project_data
@@ -0,0 +1,45 @@
+""" Compares the columnar task store with one object per task """
+
+import time
+import tracemalloc
+from grant.research import ResearchProject
+from grant.research.task_store import TaskStore, OPEN
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def load(data: dict, store: TaskStore = None):
+    """ Converts the project and returns it with its traced memory """
+    tracemalloc.start()
+    project = ResearchProject("", store)
+    project.from_py(data)
+    (current, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (project, current)
+
+
+def test_task_store_benchmark(large_project_data):
+    """ Memory per task and the time to count the open tasks """
+    # Given
+    (objects, object_memory) = load(large_project_data)
+    (columns, column_memory) = load(large_project_data, TaskStore())
+
+    # When
+    start = time.perf_counter()
+    object_count = sum(
+        1 for plan in objects.plans for task in plan.tasks if task.is_open()
+    )
+    object_time = time.perf_counter() - start
+    start = time.perf_counter()
+    column_count = columns.store.count_status(OPEN)
+    column_time = time.perf_counter() - start
+
+    # Then
+    print(
+        f"\ntask store, {BENCHMARK_TASKS} tasks: "
+        f"objects {object_memory / BENCHMARK_TASKS:.0f}B per task, "
+        f"{object_time * 1000:.2f}ms to count open tasks; "
+        f"columns {column_memory / BENCHMARK_TASKS:.0f}B per task, "
+        f"{column_time * 1000:.2f}ms"
+    )
+    assert column_count == object_count
+    assert columns.to_py() == objects.to_py()
@@ -0,0 +1,52 @@
+""" Compares building a project from YAML events with safe_load() and from_py() """
+
+import io
+import time
+import tracemalloc
+from grant.research import ResearchProject
+from grant.research.serializers import SERIALIZERS, save_file
+from grant.research.yaml_builder import build_project
+from tests.benchmark.conftest import BENCHMARK_TASKS
+
+
+def measure(function):
+    """ Returns the result, run time and peak memory of calling function """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (result, elapsed, peak)
+
+
+def test_yaml_builder_benchmark(large_project_data, tmpdir):
+    """ Load a large project both ways """
+    # Given
+    filename = str(tmpdir.join("benchmark.gra"))
+    save_file(filename, large_project_data)
+    with open(filename, "rb") as file:
+        content = file.read()
+
+    def load_and_convert():
+        project = ResearchProject(filename)
+        project.from_py(SERIALIZERS["yaml"].load(io.BytesIO(content)))
+        return project
+
+    # When
+    (expected, dict_time, dict_peak) = measure(load_and_convert)
+
+    def build():
+        project = ResearchProject(filename)
+        build_project(io.BytesIO(content), project)
+        return project
+
+    (project, built_time, built_peak) = measure(build)
+
+    # Then
+    print(
+        f"\nyaml builder, {BENCHMARK_TASKS} tasks: "
+        f"safe_load + from_py {dict_time:.3f}s peak {dict_peak / 2**20:.1f}MiB, "
+        f"event builder {built_time:.3f}s peak {built_peak / 2**20:.1f}MiB"
+    )
+    assert project.to_py() == expected.to_py()
@@ -0,0 +1,127 @@
+""" Tests for the AutoSaver """
+
+from unittest import mock
+from grant.models.journal_recorder import JournalRecorder
+from grant.models.tree_model import TreeModel
+from grant.research import ResearchProject
+from grant.windows.auto_saver import AutoSaver
+from grant.windows.project_file_manager import ProjectFileManager
+
+
+def _auto_saver(filename):
+    """ An AutoSaver for a saved project with a mocked background save """
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.save_project()
+    manager.needs_saving = True
+    manager.save_in_background = mock.MagicMock(return_value=True)
+    saver = AutoSaver(manager)
+    saver.delay = 10
+    return saver
+
+
+def test_schedule_saves_after_delay(qtbot, tmpdir):
+    """ A save is triggered once the delay has passed """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+
+    # When
+    saver.schedule()
+    qtbot.waitUntil(lambda: saver.project_manager.save_in_background.called)
+
+    # Then
+    saver.project_manager.save_in_background.assert_called_once()
+
+
+def test_burst_of_edits_saves_once(qtbot, tmpdir):
+    """ Edits in quick succession are debounced into a single save """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+
+    # When
+    for _ in range(5):
+        saver.schedule()
+    qtbot.wait(50)
+
+    # Then
+    saver.project_manager.save_in_background.assert_called_once()
+
+
+def test_disabled_auto_saver_does_nothing(qtbot, tmpdir):
+    """ No save is scheduled when auto saving is switched off """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+    saver.enabled = False
+
+    # When
+    saver.schedule()
+    qtbot.wait(50)
+
+    # Then
+    saver.project_manager.save_in_background.assert_not_called()
+
+
+def test_unsaved_project_is_not_auto_saved(tmpdir):
+    """ A project that was never saved by the user has no file to save to """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+    saver.project_manager.project.filename = str(tmpdir.join("untitled.gra"))
+
+    # When
+    saver.save()
+
+    # Then
+    saver.project_manager.save_in_background.assert_not_called()
+
+
+def test_busy_writer_reschedules_save(tmpdir):
+    """ When the previous save is still running, the save is retried later """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+    saver.project_manager.save_in_background.return_value = False
+
+    # When
+    saver.save()
+
+    # Then
+    assert saver.timer.isActive()
+
+
+def test_project_change_cancels_pending_save(tmpdir):
+    """ A pending save is dropped when another project is opened """
+    # Given
+    saver = _auto_saver(tmpdir.join("test.gra"))
+    saver.schedule()
+
+    # When
+    saver.project_manager.project_changed.emit()
+
+    # Then
+    assert not saver.timer.isActive()
+
+
+def test_journaled_project_is_auto_saved_by_appending(tmpdir):
+    """ With a journal, an auto save appends the edits instead of a snapshot """
+    # Given
+    filename = tmpdir.join("test.gra")
+    manager = ProjectFileManager()
+    manager.journaling = True
+    manager.project = ResearchProject(str(filename))
+    model = TreeModel()
+    model.set_project(manager.project)
+    manager.recorder = JournalRecorder(model)
+    manager.save_project()
+    base = filename.read()
+    model.add_node(model.plans_index)
+    manager.needs_saving = True
+    manager.save_in_background = mock.MagicMock(return_value=True)
+    saver = AutoSaver(manager)
+
+    # When
+    saver.save()
+
+    # Then
+    manager.save_in_background.assert_not_called()
+    assert filename.read() == base
+    assert tmpdir.join("test.gra.journal").exists()
+    assert not manager.needs_saving
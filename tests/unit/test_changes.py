@@ -0,0 +1,112 @@
+""" Tests for the ChangeSet """
+
+from grant.research.changes import ChangeSet, PLAN, TASK
+
+
+def test_new_change_set_is_empty():
+    """ Nothing is listed before anything changes """
+    # Given
+    changes = ChangeSet()
+
+    # Then
+    assert not changes
+    assert changes.summary() == "No changes"
+    assert changes.changed_plans() == set()
+
+
+def test_edits_of_new_items_only_count_as_added():
+    """ Modifying a plan that was added since the checkpoint keeps it added """
+    # Given
+    changes = ChangeSet()
+
+    # When
+    changes.add(PLAN, 1, 1)
+    changes.modify(PLAN, 1, 1)
+
+    # Then
+    assert changes.added == {1: PLAN}
+    assert changes.modified == {}
+
+
+def test_deleting_a_new_item_forgets_it():
+    """ A task that was added and deleted again isn't a change """
+    # Given
+    changes = ChangeSet()
+    changes.add(TASK, 2, 1)
+
+    # When
+    changes.delete(TASK, 2, 1)
+
+    # Then
+    assert not changes
+
+
+def test_deleted_item_that_comes_back_counts_as_modified():
+    """ Re-adding a deleted ID records a modification """
+    # Given
+    changes = ChangeSet()
+    changes.delete(TASK, 2, 1)
+
+    # When
+    changes.add(TASK, 2, 3)
+
+    # Then
+    assert changes.modified == {2: TASK}
+    assert changes.deleted == {}
+    assert changes.changed_plans() == {3}
+
+
+def test_deleting_a_plan_drops_its_task_changes():
+    """ The tasks of a deleted plan are covered by the plan's deletion """
+    # Given
+    changes = ChangeSet()
+    changes.modify(TASK, 2, 1)
+    changes.add(TASK, 3, 1)
+    changes.modify(TASK, 5, 4)
+
+    # When
+    changes.delete(PLAN, 1, 1)
+
+    # Then
+    assert changes.deleted == {1: PLAN}
+    assert changes.modified == {5: TASK}
+    assert changes.added == {}
+    assert changes.changed_plans() == {4}
+
+
+def test_update_merges_later_changes():
+    """ Changes recorded after a failed save are added to the earlier ones """
+    # Given
+    earlier = ChangeSet()
+    earlier.add(TASK, 2, 1)
+    earlier.modify(TASK, 3, 1)
+    later = ChangeSet()
+    later.delete(TASK, 2, 1)
+    later.modify(PLAN, 4, 4)
+    later.modify_field("gedcom")
+
+    # When
+    earlier.update(later)
+
+    # Then
+    assert earlier.added == {}
+    assert earlier.modified == {3: TASK, 4: PLAN}
+    assert earlier.fields == {"gedcom"}
+
+
+def test_summary_counts_each_kind_of_change():
+    """ The summary lists the number of plans and tasks per change """
+    # Given
+    changes = ChangeSet()
+    changes.add(PLAN, 1, 1)
+    changes.modify(TASK, 2, 4)
+    changes.modify(TASK, 3, 4)
+    changes.delete(PLAN, 5, 5)
+    changes.modify_field("gedcom")
+
+    # Then
+    assert changes.summary() == (
+        "1 plan added, 2 tasks modified, 1 plan deleted, gedcom changed"
+    )
+    assert changes.is_changed(2)
+    assert not changes.is_changed(5)
@@ -0,0 +1,146 @@
+""" Tests for the gedcom extraction cache """
+
+import shutil
+from unittest import mock
+from grant.models.gedcom_cache import CACHE_MAGIC, cache_filename, fingerprint
+from grant.models.gedcom_cache import scan_cached
+from grant.models.gedcom_scanner import GedcomFile
+from grant.research.load_cache import write_cache_file
+from grant.windows.data_context import DataContext
+from grant.windows.gedcom_manager import GedcomManager
+
+
+def copy_gedcom(tmpdir) -> str:
+    """ A copy of the test gedcom file that the tests may change """
+    file_path = str(tmpdir.join("test.ged"))
+    shutil.copyfile("tests/unit/test.ged", file_path)
+    return file_path
+
+
+def scan_file(file_path: str, cache_directory: str):
+    """ Scans the file through the cache, closing it again """
+    gedcom_file = GedcomFile(file_path)
+    try:
+        return (scan_cached(gedcom_file, cache_directory), gedcom_file.pointers)
+    finally:
+        gedcom_file.close()
+
+
+def test_cache_file_is_named_after_the_gedcom_path(tmpdir):
+    """ Different gedcom files get different cache files """
+    # Given
+    directory = str(tmpdir)
+
+    # Then
+    assert cache_filename(directory, "a.ged") != cache_filename(directory, "b.ged")
+    assert cache_filename(directory, "a.ged").startswith(directory)
+
+
+def test_first_scan_creates_cache(tmpdir):
+    """ Scanning a gedcom file writes its cache """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    cache_directory = str(tmpdir.join("cache"))
+
+    # When
+    ((individuals, sources), _) = scan_file(file_path, cache_directory)
+
+    # Then
+    assert tmpdir.join("cache").listdir() != []
+    assert [i.pointer for i in individuals] == ["I0000", "I0001"]
+    assert [s.pointer for s in sources] == ["S0000", "S0001"]
+
+
+def test_matching_cache_skips_scanning(tmpdir, monkeypatch):
+    """ With an up-to-date cache the gedcom file is not scanned again """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    cache_directory = str(tmpdir.join("cache"))
+    ((individuals, sources), pointers) = scan_file(file_path, cache_directory)
+    monkeypatch.setattr(GedcomFile, "scan", mock.MagicMock())
+
+    # When
+    gedcom_file = GedcomFile(file_path)
+    (cached_individuals, cached_sources) = scan_cached(gedcom_file, cache_directory)
+
+    # Then
+    GedcomFile.scan.assert_not_called()  # pylint: disable=no-member
+    assert [vars(i) for i in cached_individuals] == [vars(i) for i in individuals]
+    assert [vars(s) for s in cached_sources] == [vars(s) for s in sources]
+    assert gedcom_file.pointers == pointers
+    assert gedcom_file.record("I0001")[0] == "0 @I0001@ INDI"
+    gedcom_file.close()
+
+
+def test_changed_file_is_scanned_again(tmpdir):
+    """ A change to the gedcom file invalidates its cache """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    cache_directory = str(tmpdir.join("cache"))
+    scan_file(file_path, cache_directory)
+    with open(file_path, encoding="utf-8") as file:
+        content = file.read()
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content.replace("Dawson", "Dyson"))
+
+    # When
+    ((individuals, _), _) = scan_file(file_path, cache_directory)
+
+    # Then
+    assert individuals[0].last_name == "Dyson"
+
+
+def test_corrupt_cache_is_ignored(tmpdir):
+    """ A damaged cache file is replaced by a fresh scan """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    cache_directory = str(tmpdir.join("cache"))
+    scan_file(file_path, cache_directory)
+    with open(cache_filename(cache_directory, file_path), "wb") as file:
+        file.write(b"GRANTG\x02\ngarbage")
+
+    # When
+    ((individuals, _), _) = scan_file(file_path, cache_directory)
+
+    # Then
+    assert len(individuals) == 2
+
+
+def test_cache_of_unexpected_shape_is_ignored(tmpdir):
+    """ Cached data that can't be restored is replaced by a fresh scan """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    cache_directory = str(tmpdir.join("cache"))
+    gedcom_file = GedcomFile(file_path)
+    write_cache_file(
+        cache_filename(cache_directory, file_path),
+        CACHE_MAGIC,
+        fingerprint(gedcom_file),
+        {"individuals": [("I0000",)], "sources": None},
+    )
+
+    # When
+    (individuals, _) = scan_cached(gedcom_file, cache_directory)
+
+    # Then
+    assert len(individuals) == 2
+    assert gedcom_file.has_record("N0000")
+    gedcom_file.close()
+
+
+def test_manager_loads_through_the_cache(tmpdir):
+    """ Linking the same gedcom file again uses its cache """
+    # Given
+    file_path = copy_gedcom(tmpdir)
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir.join("cache"))
+    manager.load_link(file_path)
+
+    # When
+    with mock.patch.object(GedcomFile, "scan") as scan:
+        manager.refresh_link(file_path)
+
+    # Then
+    scan.assert_not_called()
+    assert len(manager.individuals) == 2
+    assert manager.has_record("N0000")
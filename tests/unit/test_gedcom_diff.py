@@ -0,0 +1,99 @@
+""" Tests for applying a gedcom refresh to the models """
+
+from grant.models.gedcom_diff import INDIVIDUAL, SOURCE, GedcomChanges
+from grant.models.individuals_model import Individual, IndividualsModel
+from grant.models.sources_model import Source, SourcesModel
+
+
+def individual(pointer: str, first_name: str = "Given") -> Individual:
+    """ An individual with the pointer and first name """
+    return Individual(pointer, first_name, "Surname", 1800, 1850)
+
+
+def record_signals(model) -> list:
+    """ Collects the row signals of the model as they are emitted """
+    signals = []
+    model.rowsInserted.connect(
+        lambda _, first, last: signals.append(("+", first, last))
+    )
+    model.rowsRemoved.connect(lambda _, first, last: signals.append(("-", first, last)))
+    model.dataChanged.connect(lambda first, _: signals.append(("~", first.row())))
+    model.modelReset.connect(lambda: signals.append(("reset",)))
+    return signals
+
+
+def test_unchanged_records_emit_nothing():
+    """ Refreshing with the same records leaves the model alone """
+    # Given
+    model = IndividualsModel([individual("I1"), individual("I2")])
+    signals = record_signals(model)
+    changes = GedcomChanges()
+
+    # When
+    model.merge_list([individual("I1"), individual("I2")], changes)
+
+    # Then
+    assert signals == []
+    assert not changes
+    assert changes.summary() == "No changes"
+
+
+def test_merge_inserts_removes_and_updates_rows():
+    """ Only the rows that differ are inserted, removed or changed """
+    # Given
+    model = IndividualsModel(
+        [individual("I1"), individual("I2"), individual("I3"), individual("I4")]
+    )
+    signals = record_signals(model)
+    changes = GedcomChanges()
+    records = [
+        individual("I0"),
+        individual("I1", "Renamed"),
+        individual("I4"),
+        individual("I5"),
+        individual("I6"),
+    ]
+
+    # When
+    model.merge_list(records, changes)
+
+    # Then
+    assert [row.pointer for row in model.individuals] == [r.pointer for r in records]
+    assert model.individuals[1].first_name == "Renamed"
+    assert signals == [("-", 1, 2), ("+", 0, 0), ("~", 1), ("+", 3, 4)]
+    assert changes.added[INDIVIDUAL] == ["I0", "I5", "I6"]
+    assert changes.removed[INDIVIDUAL] == ["I2", "I3"]
+    assert changes.renamed[INDIVIDUAL] == ["I1"]
+    assert changes.summary() == (
+        "3 individuals added, 2 individuals removed, 1 individual renamed"
+    )
+
+
+def test_changed_fields_that_keep_the_name_are_updated_quietly():
+    """ A field outside the autocomplete name updates the row, but no rename """
+    # Given
+    model = SourcesModel([Source("S1", "Title", "Author", "Publisher", "ABBR")])
+    signals = record_signals(model)
+    changes = GedcomChanges()
+
+    # When
+    model.merge_list([Source("S1", "Title", "Author", "Other", "ABBR")], changes)
+
+    # Then
+    assert signals == [("~", 0)]
+    assert model.sources[0].publisher == "Other"
+    assert not changes.renamed[SOURCE]
+
+
+def test_reordered_records_reset_the_model():
+    """ The model is only reset when the remaining records changed order """
+    # Given
+    model = IndividualsModel([individual("I1"), individual("I2")])
+    signals = record_signals(model)
+
+    # When
+    model.merge_list([individual("I2"), individual("I1")], GedcomChanges())
+
+    # Then
+    assert signals == [("reset",)]
+    assert [row.pointer for row in model.individuals] == ["I2", "I1"]
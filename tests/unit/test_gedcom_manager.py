@@ -42,10 +42,11 @@ def test_load_link_invalid_filename_shows_message(monkeypatch):
     QMessageBox.warning.assert_called()  # pylint: disable=no-member
 
 
-def test_loading_file_creates_models():
+def test_loading_file_creates_models(tmpdir):
     """ When loading a gedcom file, models should be populated """
     # Given
     manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
 
     # When
     manager.load_link("tests/unit/test.ged")
@@ -55,10 +56,11 @@ def test_loading_file_creates_models():
     assert manager.data_context.sources_model.rowCount() != 0
 
 
-def test_loading_creates_individuals():
+def test_loading_creates_individuals(tmpdir):
     """ Individuals should have their values set correctly """
     # Given
     manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
 
     # When
     manager.load_link("tests/unit/test.ged")
@@ -73,10 +75,11 @@ def test_loading_creates_individuals():
     assert manager.individuals[0].death_year == 1851
 
 
-def test_loading_creates_sources():
+def test_loading_creates_sources(tmpdir):
     """ Sources should have their values set correctly """
     # Given
     manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
 
     # When
     manager.load_link("tests/unit/test.ged")
@@ -106,10 +109,11 @@ def test_clear_link_removes_caches():
     assert len(manager.sources) == 0
 
 
-def test_refresh_link_reloads_file():
+def test_refresh_link_reloads_file(tmpdir):
     """ When the link is removed, the caches should be cleared too """
     # Given
     manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
     manager.individuals.append(Individual("IND01", "Test", "User", 1900, 1999))
     manager.sources.append(Source("SOU01", "Test", "User", "S/O", "ABB"))
 
@@ -121,3 +125,137 @@ def test_refresh_link_reloads_file():
     assert manager.individuals[0].pointer == "I0000"
     assert len(manager.sources) == 2
     assert manager.sources[0].pointer == "S0000"
+
+
+def test_records_are_read_on_demand(tmpdir):
+    """ Full records of the linked file are read from the record index """
+    # Given
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
+    manager.load_link("tests/unit/test.ged")
+
+    # When
+    record = manager.record("I0001")
+
+    # Then
+    assert manager.has_record("S0000")
+    assert not manager.has_record("X0000")
+    assert record[0] == "0 @I0001@ INDI"
+    assert all(not line.startswith("0 ") for line in record[1:])
+    assert manager.record("X0000") is None
+
+
+def test_clear_link_closes_the_file(tmpdir):
+    """ Records can no longer be read once the link is removed """
+    # Given
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
+    manager.load_link("tests/unit/test.ged")
+
+    # When
+    manager.clear_link()
+
+    # Then
+    assert manager.gedcom_file is None
+    assert not manager.has_record("I0000")
+    assert manager.record("I0000") is None
+
+
+def test_background_load_adds_records_in_batches(qtbot, tmpdir):
+    """ The loader hands the records over in batches, inserting model rows """
+    # Given
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
+    manager.batch_size = 1
+    model = manager.data_context.individuals_model
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+
+    # When
+    with qtbot.waitSignal(manager.link_loaded):
+        manager.load_link_in_background("tests/unit/test.ged")
+
+    # Then
+    assert [i.pointer for i in manager.individuals] == ["I0000", "I0001"]
+    assert [s.pointer for s in manager.sources] == ["S0000", "S0001"]
+    assert model.rowCount() == 2
+    assert inserted == [0, 1]
+    assert manager.has_record("N0000")
+    assert manager.loader is None
+
+
+def test_background_load_of_missing_file_shows_message(qtbot, monkeypatch):
+    """ A gedcom file that cannot be found is reported once the loader fails """
+    # Given
+    manager = GedcomManager(DataContext())
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    manager.load_link_in_background("foo")
+
+    # Then
+    qtbot.waitUntil(lambda: manager.loader is None)
+    QMessageBox.warning.assert_called()  # pylint: disable=no-member
+    assert manager.gedcom_file is None
+
+
+def test_cancelled_background_load_is_ignored(qtbot, tmpdir):
+    """ Batches of a load that was replaced by clearing the link are dropped """
+    # Given
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
+    manager.load_link_in_background("tests/unit/test.ged")
+    loader = manager.loader
+
+    # When
+    manager.clear_link()
+    loader.wait()
+    qtbot.wait(10)
+
+    # Then
+    assert manager.individuals == []
+    assert manager.data_context.individuals_model.rowCount() == 0
+    assert manager.gedcom_file is None
+
+
+def test_wait_for_loader_waits_for_cancelled_loads(qtbot, tmpdir):
+    """ A load cancelled by clearing the link is still waited for on close """
+    # Given
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir)
+    manager.load_link_in_background("tests/unit/test.ged")
+    loader = manager.loader
+    manager.clear_link()
+
+    # When
+    manager.wait_for_loader()
+
+    # Then
+    assert loader.isFinished()
+    qtbot.waitUntil(lambda: not manager.cancelled_loaders)
+
+
+def test_refresh_link_applies_only_the_differences(qtbot, tmpdir):
+    """ Refreshing a changed file updates rows instead of resetting the models """
+    # Given
+    file_path = str(tmpdir.join("test.ged"))
+    with open("tests/unit/test.ged", encoding="utf-8") as file:
+        content = file.read()
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    manager = GedcomManager(DataContext())
+    manager.cache_directory = str(tmpdir.join("cache"))
+    manager.load_link(file_path)
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(content.replace("Adam Brian", "Adam Bryan"))
+    model = manager.data_context.individuals_model
+
+    # When
+    with qtbot.assertNotEmitted(model.modelReset):
+        with qtbot.waitSignal(model.dataChanged):
+            changes = manager.refresh_link(file_path)
+
+    # Then
+    assert changes.summary() == "1 individual renamed"
+    assert manager.individuals[0].first_name == "Adam Bryan Charles"
+    assert model.individuals[0].first_name == "Adam Bryan Charles"
@@ -0,0 +1,210 @@
+""" Tests for the streaming gedcom scanner """
+
+import os
+import pytest
+from gedcom.parser import GedcomFormatViolationError, Parser
+from gedcom.element.individual import IndividualElement
+from grant.models.gedcom_scanner import GedcomFile, scan_gedcom
+
+
+def parse_with_gedcom(file_path: str):
+    """ Individuals and sources read through python-gedcom's element tree """
+    parser = Parser()
+    parser.parse_file(file_path)
+    individuals = []
+    sources = []
+    for element in parser.get_root_child_elements():
+        if isinstance(element, IndividualElement):
+            (first, last) = element.get_name()
+            individuals.append(
+                (
+                    element.get_pointer()[1:-1],
+                    first,
+                    last,
+                    element.get_birth_year(),
+                    element.get_death_year(),
+                )
+            )
+        if element.get_tag() == "SOUR":
+            fields = {
+                child.get_tag(): child.get_value()
+                for child in element.get_child_elements()
+            }
+            sources.append(
+                (
+                    element.get_pointer()[1:-1],
+                    fields.get("TITL", ""),
+                    fields.get("AUTH", ""),
+                    fields.get("PUBL", ""),
+                    fields.get("ABBR", ""),
+                )
+            )
+    return (individuals, sources)
+
+
+def scan(file_path: str):
+    """ Individuals and sources from the scanner, as tuples """
+    (individuals, sources) = scan_gedcom(file_path)
+    return (
+        [
+            (i.pointer, i.first_name, i.last_name, i.birth_year, i.death_year)
+            for i in individuals
+        ],
+        [(s.pointer, s.title, s.author, s.publisher, s.abbreviation) for s in sources],
+    )
+
+
+def write_gedcom(tmp_path, lines) -> str:
+    """ Writes the lines to a gedcom file and returns its name """
+    file_path = str(tmp_path / "test.ged")
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        file.write("".join(line + "\r\n" for line in lines))
+    return file_path
+
+
+def test_scanner_matches_gedcom_parser():
+    """ The scanner finds the same individuals and sources as the parser """
+    # When
+    (individuals, sources) = scan("tests/unit/test.ged")
+
+    # Then
+    assert (individuals, sources) == parse_with_gedcom("tests/unit/test.ged")
+    assert len(individuals) != 0
+    assert len(sources) != 0
+
+
+def test_scanner_matches_gedcom_parser_for_name_parts_and_dates(tmp_path):
+    """ Names from GIVN and SURN, and the last of several dates, are handled alike """
+    # Given
+    file_path = write_gedcom(
+        tmp_path,
+        [
+            "0 HEAD",
+            "1 CHAR UTF-8",
+            "0 @I1@ INDI",
+            "1 NAME",
+            "2 GIVN Mary",
+            "1 NAME",
+            "2 SURN Smith",
+            "1 NAME Ignored /Name/",
+            "1 BIRT",
+            "2 DATE 1 JAN 1800",
+            "2 PLAC Somewhere",
+            "2 DATE ABT 1801",
+            "1 DEAT",
+            "2 DATE unknown",
+            "0 @I2@ INDI",
+            "1 NAME John",
+            "1 NAME Other /Later/",
+            "0 @S1@ SOUR",
+            "1 TITL First",
+            "1 TITL Second",
+            "1 NOTE",
+            "2 TITL Not a source title",
+            "0 TRLR",
+        ],
+    )
+
+    # When
+    result = scan(file_path)
+
+    # Then
+    assert result == parse_with_gedcom(file_path)
+    assert result[0] == [
+        ("I1", "Mary", "Smith", 1801, -1),
+        ("I2", "John", "", -1, -1),
+    ]
+    assert result[1] == [("S1", "Second", "", "", "")]
+
+
+def test_scanner_rejects_invalid_lines(tmp_path):
+    """ Lines the parser doesn't accept are format violations """
+    # Given
+    file_path = write_gedcom(tmp_path, ["0 HEAD", "not gedcom"])
+
+    # Then
+    with pytest.raises(GedcomFormatViolationError):
+        scan_gedcom(file_path)
+
+
+def test_scanner_rejects_skipped_levels(tmp_path):
+    """ A line can be at most one level below the line before it """
+    # Given
+    file_path = write_gedcom(tmp_path, ["0 HEAD", "2 CHAR UTF-8"])
+
+    # Then
+    with pytest.raises(GedcomFormatViolationError):
+        scan_gedcom(file_path)
+
+
+def test_record_index_holds_the_offsets_of_level_0_records(tmp_path):
+    """ Each pointer maps to the lines of its record, up to the next one """
+    # Given
+    file_path = write_gedcom(
+        tmp_path,
+        ["\ufeff0 HEAD", "0 @I1@ INDI", "1 NAME A /B/", "0 @N1@ NOTE Text", "0 TRLR"],
+    )
+    gedcom_file = GedcomFile(file_path)
+
+    # When
+    gedcom_file.scan()
+
+    # Then
+    assert sorted(gedcom_file.pointers) == ["I1", "N1"]
+    assert gedcom_file.record("I1") == ["0 @I1@ INDI", "1 NAME A /B/"]
+    assert gedcom_file.record("N1") == ["0 @N1@ NOTE Text"]
+    gedcom_file.close()
+
+
+def test_records_of_a_changed_file_are_not_read(tmp_path):
+    """ The record index is no longer used once the file was changed on disk """
+    # Given
+    file_path = write_gedcom(tmp_path, ["0 HEAD", "0 @I1@ INDI", "0 TRLR"])
+    gedcom_file = GedcomFile(file_path)
+    gedcom_file.scan()
+
+    # When
+    write_gedcom(tmp_path, ["0 HEAD"])
+
+    # Then
+    assert gedcom_file.has_record("I1")
+    assert gedcom_file.record("I1") is None
+    gedcom_file.close()
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/maps"), reason="Needs /proc to list mappings"
+)
+def test_linked_file_is_neither_mapped_nor_open_after_the_scan(tmp_path):
+    """ The file can be overwritten while it is linked, which Windows needs """
+    # Given
+    file_path = write_gedcom(tmp_path, ["0 HEAD", "0 @I1@ INDI", "0 TRLR"])
+    gedcom_file = GedcomFile(file_path)
+
+    # When
+    gedcom_file.scan()
+    record = gedcom_file.record("I1")
+
+    # Then
+    with open("/proc/self/maps", encoding="utf-8") as maps:
+        assert str(file_path) not in maps.read()
+    open_files = [
+        os.readlink(os.path.join("/proc/self/fd", fd))
+        for fd in os.listdir("/proc/self/fd")
+        if os.path.exists(os.path.join("/proc/self/fd", fd))
+    ]
+    assert str(file_path) not in open_files
+    assert record == ["0 @I1@ INDI"]
+    gedcom_file.close()
+
+
+def test_empty_file_has_no_records(tmp_path):
+    """ An empty file can be scanned, though it cannot be mapped """
+    # Given
+    file_path = write_gedcom(tmp_path, [])
+
+    # When
+    result = scan_gedcom(file_path)
+
+    # Then
+    assert result == ([], [])
@@ -0,0 +1,318 @@
+""" Tests for the project change journal """
+
+import copy
+import os
+import pytest
+from grant.research.journal import append_records
+from grant.research.journal import apply_records
+from grant.research.journal import journal_filename
+from grant.research.journal import journal_size
+from grant.research.journal import read_records
+from grant.research.journal import remove_journal
+from grant.research.journal import replay_journal
+from grant.research.journal import trim_journal
+from grant.research.serializers import FormatError
+
+
+def _project_data():
+    """ Small project to apply records to """
+    return {
+        "version": "1.0",
+        "gedcom": "",
+        "plans": [
+            {"ancestor": "A", "tasks": [{"source": "S1"}, {"source": "S2"}]},
+            {"ancestor": "B", "tasks": []},
+        ],
+    }
+
+
+def test_journal_is_a_sidecar_file():
+    """ The journal lives next to the project """
+    assert journal_filename("foo/bar.gra") == "foo/bar.gra.journal"
+
+
+def test_read_records_of_missing_journal_is_empty(tmpdir):
+    """ A project without a journal has no records """
+    assert read_records(str(tmpdir.join("project.gra"))) == []
+    assert journal_size(str(tmpdir.join("project.gra"))) == 0
+
+
+def test_appended_records_are_read_back_in_order(tmpdir):
+    """ Several saves append to the same journal """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+
+    # When
+    append_records(filename, [{"op": "add_plan", "data": {"ancestor": "C"}}])
+    append_records(filename, [])
+    append_records(
+        filename,
+        [
+            {"op": "set", "plan": 0, "field": "goal", "value": "line 1\nline 2"},
+            {"op": "delete_plan", "plan": 1},
+        ],
+    )
+
+    # Then
+    assert read_records(filename) == [
+        {"op": "add_plan", "data": {"ancestor": "C"}},
+        {"op": "set", "plan": 0, "field": "goal", "value": "line 1\nline 2"},
+        {"op": "delete_plan", "plan": 1},
+    ]
+
+
+def _two_appends(filename: str) -> int:
+    """ Journals two saves and returns the journal size after the first """
+    append_records(filename, [{"op": "add_plan", "data": {"ancestor": "C"}}])
+    size = journal_size(filename)
+    append_records(filename, [{"op": "set", "field": "gedcom", "value": "x.ged"}])
+    return size
+
+
+def test_torn_append_is_dropped(tmpdir):
+    """ A save cut short by a crash loses its records, not the journal """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    size = _two_appends(filename)
+    os.truncate(journal_filename(filename), journal_size(filename) - 5)
+
+    # When
+    records = read_records(filename)
+    append_records(filename, [{"op": "delete_plan", "plan": 1}])
+
+    # Then
+    assert records == [{"op": "add_plan", "data": {"ancestor": "C"}}]
+    assert read_records(filename) == records + [{"op": "delete_plan", "plan": 1}]
+    assert journal_size(filename) > size
+
+
+def test_corrupt_append_is_dropped(tmpdir):
+    """ A frame that doesn't match its checksum is dropped with what follows """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    size = _two_appends(filename)
+    with open(journal_filename(filename), "r+b") as file:
+        file.seek(-3, os.SEEK_END)
+        file.write(b"yyy")
+
+    # When
+    records = read_records(filename)
+
+    # Then
+    assert records == [{"op": "add_plan", "data": {"ancestor": "C"}}]
+    assert journal_size(filename) == size
+
+
+def test_journal_without_frames_is_read(tmpdir):
+    """ Journals written before the frames are a plain YAML list """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    with open(journal_filename(filename), "w") as file:
+        file.write("- op: delete_plan\n  plan: 1\n")
+
+    # When
+    records = read_records(filename)
+
+    # Then
+    assert records == [{"op": "delete_plan", "plan": 1}]
+
+
+def test_apply_records_adds_plans_and_tasks():
+    """ Add records append the new entities """
+    # Given
+    data = _project_data()
+
+    # When
+    apply_records(
+        data,
+        [
+            {"op": "add_plan", "data": {"ancestor": "C", "tasks": []}},
+            {"op": "add_task", "plan": 2, "data": {"source": "S3"}},
+        ],
+    )
+
+    # Then
+    assert data["plans"][2] == {"ancestor": "C", "tasks": [{"source": "S3"}]}
+
+
+def test_apply_records_deletes_plans_and_tasks():
+    """ Delete records remove the entities at their position """
+    # Given
+    data = _project_data()
+
+    # When
+    apply_records(
+        data,
+        [{"op": "delete_task", "plan": 0, "task": 0}, {"op": "delete_plan", "plan": 1}],
+    )
+
+    # Then
+    assert data["plans"] == [{"ancestor": "A", "tasks": [{"source": "S2"}]}]
+
+
+def test_apply_records_sets_fields_on_every_level():
+    """ Set records update project, plan and task fields """
+    # Given
+    data = _project_data()
+
+    # When
+    apply_records(
+        data,
+        [
+            {"op": "set", "field": "gedcom", "value": "tree.ged"},
+            {"op": "set", "plan": 1, "field": "ancestor", "value": "D"},
+            {"op": "set", "plan": 0, "task": 1, "field": "source", "value": "S9"},
+        ],
+    )
+
+    # Then
+    assert data["gedcom"] == "tree.ged"
+    assert data["plans"][1]["ancestor"] == "D"
+    assert data["plans"][0]["tasks"][1]["source"] == "S9"
+
+
+def test_replay_journal_rejects_records_that_do_not_fit(tmpdir):
+    """ A journal that doesn't belong to the project is reported """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    append_records(filename, [{"op": "delete_plan", "plan": 5}])
+
+    # Then
+    with pytest.raises(FormatError):
+        replay_journal(filename, _project_data())
+
+
+def test_trim_journal_keeps_records_after_offset(tmpdir):
+    """ Compaction only removes the records it has written """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    append_records(filename, [{"op": "delete_plan", "plan": 0}])
+    offset = journal_size(filename)
+    append_records(filename, [{"op": "delete_plan", "plan": 1}])
+
+    # When
+    trim_journal(filename, offset)
+
+    # Then
+    assert read_records(filename) == [{"op": "delete_plan", "plan": 1}]
+
+
+def test_trim_journal_removes_fully_compacted_journal(tmpdir):
+    """ Nothing is left behind once everything is compacted """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    append_records(filename, [{"op": "delete_plan", "plan": 0}])
+
+    # When
+    trim_journal(filename, journal_size(filename))
+    remove_journal(filename)
+
+    # Then
+    assert not tmpdir.join("project.gra.journal").exists()
+
+
+def _project_data_with_ids():
+    """ Small project whose plans and tasks have IDs """
+    return {
+        "version": "1.0",
+        "gedcom": "",
+        "plans": [
+            {
+                "id": 1,
+                "ancestor": "A",
+                "tasks": [{"id": 2, "source": "S1"}, {"id": 3, "source": "S2"}],
+            },
+            {"id": 4, "ancestor": "B", "tasks": []},
+        ],
+    }
+
+
+def test_apply_records_addresses_plans_and_tasks_by_id():
+    """ ID based records find their targets wherever they are """
+    # Given
+    data = _project_data_with_ids()
+
+    # When
+    apply_records(
+        data,
+        [
+            {"op": "delete_plan", "plan_id": 1},
+            {"op": "add_task", "plan_id": 4, "data": {"id": 5, "source": "S3"}},
+            {"op": "set", "task_id": 5, "field": "source", "value": "S9"},
+            {"op": "set", "plan_id": 4, "field": "ancestor", "value": "D"},
+            {"op": "add_plan", "data": {"id": 6, "ancestor": "C", "tasks": []}},
+            {"op": "delete_task", "task_id": 5},
+            {"op": "set", "plan_id": 6, "field": "goal", "value": "G"},
+        ],
+    )
+
+    # Then
+    assert data["plans"] == [
+        {"id": 4, "ancestor": "D", "tasks": []},
+        {"id": 6, "ancestor": "C", "tasks": [], "goal": "G"},
+    ]
+
+
+def test_apply_records_inserts_at_the_given_position():
+    """ Added plans and tasks with a position are inserted there """
+    # Given
+    data = _project_data_with_ids()
+
+    # When
+    apply_records(
+        data,
+        [
+            {"op": "add_task", "plan_id": 1, "position": 0, "data": {"id": 5}},
+            {"op": "add_plan", "position": 1, "data": {"id": 6, "tasks": []}},
+        ],
+    )
+
+    # Then
+    assert [task["id"] for task in data["plans"][0]["tasks"]] == [5, 2, 3]
+    assert [plan["id"] for plan in data["plans"]] == [1, 6, 4]
+
+
+def test_records_of_ids_that_are_gone_are_skipped(tmpdir):
+    """ Changing or deleting an ID the project doesn't have changes nothing """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    append_records(
+        filename,
+        [
+            {"op": "delete_task", "task_id": 99},
+            {"op": "set", "plan_id": 98, "field": "goal", "value": "G"},
+            {"op": "add_task", "plan_id": 98, "data": {"id": 97}},
+        ],
+    )
+    data = _project_data_with_ids()
+
+    # When
+    replay_journal(filename, data)
+
+    # Then
+    assert data == _project_data_with_ids()
+
+
+def test_replaying_compacted_records_again_changes_nothing(tmpdir):
+    """ A crash between compaction and trimming the journal duplicates nothing """
+    # Given
+    records = [
+        {"op": "add_plan", "data": {"id": 6, "ancestor": "C", "tasks": []}},
+        {"op": "add_task", "plan_id": 6, "data": {"id": 5, "source": "S3"}},
+        {"op": "set", "task_id": 5, "field": "source", "value": "S9"},
+        {"op": "delete_task", "task_id": 2},
+        {"op": "add_task", "plan_id": 1, "position": 0, "data": {"id": 2}},
+        {"op": "delete_plan", "plan_id": 4},
+        {"op": "set", "field": "gedcom", "value": "tree.ged"},
+    ]
+    compacted = _project_data_with_ids()
+    apply_records(compacted, copy.deepcopy(records))
+    filename = str(tmpdir.join("project.gra"))
+    append_records(filename, records)
+    data = copy.deepcopy(compacted)
+
+    # When
+    replay_journal(filename, data)
+
+    # Then
+    assert data == compacted
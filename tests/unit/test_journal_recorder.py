@@ -0,0 +1,130 @@
+""" Tests for the JournalRecorder """
+
+from grant.models.journal_recorder import JournalRecorder
+from grant.models.tree_model import TreeModel, TreeModelCols
+from grant.research import ResearchProject, ResearchResult
+
+
+def _model_with_project():
+    """ A model holding a project with one plan and one task """
+    model = TreeModel()
+    project = ResearchProject("")
+    project.add_plan().add_task()
+    model.set_project(project)
+    return model
+
+
+def test_set_project_clears_records():
+    """ A new project starts with an empty journal """
+    # Given
+    model = _model_with_project()
+    recorder = JournalRecorder(model)
+    recorder.record({"op": "set", "field": "gedcom", "value": ""})
+
+    # When
+    model.set_project(ResearchProject(""))
+
+    # Then
+    assert recorder.records == []
+    assert recorder.project is None
+
+
+def test_same_project_keeps_records():
+    """ Showing the same project again, e.g. after Save As, loses no edits """
+    # Given
+    model = _model_with_project()
+    recorder = JournalRecorder(model)
+    recorder.record({"op": "set", "field": "gedcom", "value": "tree.ged"})
+
+    # When
+    model.set_project(model.project)
+
+    # Then
+    assert recorder.records == [{"op": "set", "field": "gedcom", "value": "tree.ged"}]
+    assert recorder.project is model.project
+
+
+def test_set_data_records_field_changes():
+    """ Edits are recorded with the plan/task ID and field name """
+    # Given
+    model = _model_with_project()
+    recorder = JournalRecorder(model)
+    plan_index = model.index(0, TreeModelCols.DESCRIPTION, model.plans_index)
+    task_index = model.index(0, TreeModelCols.LINK, plan_index)
+
+    # When
+    model.setData(plan_index, "New goal")
+    model.setData(task_index, "S0001")
+
+    # Then
+    plan = model.project.plans[0]
+    assert recorder.take_records() == [
+        {"op": "set", "plan_id": plan.id, "field": "goal", "value": "New goal"},
+        {
+            "op": "set",
+            "task_id": plan.tasks[0].id,
+            "field": "source_link",
+            "value": "S0001",
+        },
+    ]
+    assert recorder.records == []
+
+
+def test_results_are_recorded_as_pythonic_data():
+    """ Result objects are converted before they are recorded """
+    # Given
+    model = _model_with_project()
+    recorder = JournalRecorder(model)
+    plan_index = model.index(0, 0, model.plans_index)
+    task_index = model.index(0, TreeModelCols.RESULT, plan_index)
+    result = ResearchResult(True)
+
+    # When
+    model.setData(task_index, result)
+
+    # Then
+    assert recorder.records[0]["value"] == result.to_py()
+
+
+def test_add_and_delete_nodes_are_recorded():
+    """ Structural changes are recorded """
+    # Given
+    model = _model_with_project()
+    recorder = JournalRecorder(model)
+    plan_index = model.index(0, 0, model.plans_index)
+    plan = model.project.plans[0]
+    task = plan.tasks[0]
+
+    # When
+    model.add_node(plan_index)
+    model.add_node(model.plans_index)
+    model.delete_node(model.index(0, 0, plan_index))
+
+    # Then
+    assert [record["op"] for record in recorder.records] == [
+        "add_task",
+        "add_plan",
+        "delete_task",
+    ]
+    assert recorder.records[0]["plan_id"] == plan.id
+    assert recorder.records[1]["data"]["tasks"] == []
+    assert recorder.records[2] == {"op": "delete_task", "task_id": task.id}
+
+
+def test_undone_deletion_is_recorded_with_its_position():
+    """ A task put back by undo is replayed at the same position """
+    # Given
+    model = _model_with_project()
+    plan_index = model.index(0, 0, model.plans_index)
+    model.add_node(plan_index)
+    recorder = JournalRecorder(model)
+    task = model.project.plans[0].tasks[0]
+    model.delete_node(model.index(0, 0, plan_index))
+
+    # When
+    model.undo()
+
+    # Then
+    assert recorder.records[1]["op"] == "add_task"
+    assert recorder.records[1]["position"] == 0
+    assert recorder.records[1]["data"]["id"] == task.id
@@ -167,6 +167,40 @@ def test_task_links_are_checked():
     assert len(updater.source_updates) == 1
 
 
+def test_links_are_checked_against_the_record_index():
+    """ Links to pointers the GEDCOM file has no record for are broken """
+
+    # Given
+    project = ResearchProject("")
+    indi_linked = Individual("I1234", "Link", "Indi", 1000, 2000)
+    indi_dropped = Individual("I9876", "Dropped", "Indi", 1000, 2000)
+    for indi in (indi_linked, indi_dropped):
+        plan = ResearchPlan()
+        plan.ancestor = "Old Name"
+        plan.ancestor_link = indi.pointer
+        project.plans.append(plan)
+
+    tree_model = TreeModel()
+    tree_model.set_project(project)
+
+    context = DataContext(
+        data_model=tree_model,
+        individuals_model=IndividualsModel([indi_linked, indi_dropped]),
+        sources_model=SourcesModel([]),
+    )
+    updater = LinkUpdater(context, {"I1234"}.__contains__)
+
+    # When
+    updater.calculate_updates()
+
+    # Then
+    assert [update["value"] for update in updater.ancestor_updates] == [
+        indi_linked.autocomplete_name()
+    ]
+    assert len(updater.ancestor_fixes) == 1
+    assert updater.ancestor_fixes[0]["index"].row() == 1
+
+
 @pytest.fixture(name="link_updater")
 def fixture_link_updater():
     """ Fixture to create an updater with uncommitted updates """
@@ -0,0 +1,165 @@
+""" Tests for the binary load cache """
+
+import os
+from unittest import mock
+from grant.research import load_cache
+from grant.research.load_cache import cache_filename
+from grant.research.load_cache import load_file_cached
+from grant.research.load_cache import read_cache_file, write_cache_file
+from grant.research.serializers import SERIALIZERS, YamlSerializer, save_file
+
+PROJECT = "gedcom: ''\nplans:\n- ancestor: Foo\n  tasks: []\nversion: '1.0'\n"
+
+
+def test_cache_is_a_sidecar_file():
+    """ The cache lives next to the project """
+    assert cache_filename("foo/bar.gra") == "foo/bar.gra.cache"
+
+
+def test_first_load_creates_cache(tmpdir):
+    """ Loading a YAML project writes the cache """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+
+    # When
+    (data, serializer) = load_file_cached(str(filename))
+
+    # Then
+    assert tmpdir.join("project.gra.cache").exists()
+    assert serializer is SERIALIZERS["yaml"]
+    assert data["plans"][0]["ancestor"] == "Foo"
+
+
+def test_matching_cache_skips_parsing(tmpdir, monkeypatch):
+    """ With an up-to-date cache the YAML is not parsed again """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+    load_file_cached(str(filename))
+    monkeypatch.setattr(YamlSerializer, "load", mock.MagicMock())
+
+    # When
+    (data, serializer) = load_file_cached(str(filename))
+
+    # Then
+    YamlSerializer.load.assert_not_called()  # pylint: disable=no-member
+    assert serializer is SERIALIZERS["yaml"]
+    assert data["plans"][0]["ancestor"] == "Foo"
+
+
+def test_stale_cache_is_regenerated(tmpdir):
+    """ A changed project file is parsed and re-cached """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+    load_file_cached(str(filename))
+    filename.write(PROJECT.replace("Foo", "Bar"))
+    os.utime(str(filename), ns=(0, 0))
+
+    # When
+    (data, _) = load_file_cached(str(filename))
+
+    # Then
+    assert data["plans"][0]["ancestor"] == "Bar"
+    assert load_file_cached(str(filename))[0]["plans"][0]["ancestor"] == "Bar"
+
+
+def test_corrupt_cache_is_regenerated(tmpdir):
+    """ A broken cache is ignored and replaced """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+    load_file_cached(str(filename))
+    cache = tmpdir.join("project.gra.cache")
+    cache.write_binary(cache.read_binary()[:-10])
+
+    # When
+    (data, _) = load_file_cached(str(filename))
+
+    # Then
+    assert data["plans"][0]["ancestor"] == "Foo"
+    assert load_file_cached(str(filename))[0] == data
+
+
+def test_binary_projects_are_not_cached(tmpdir):
+    """ Formats that load quickly don't need a cache """
+    # Given
+    filename = tmpdir.join("project.gra")
+    save_file(str(filename), {"version": "1.0", "plans": []}, SERIALIZERS["binary"])
+
+    # When
+    (data, serializer) = load_file_cached(str(filename))
+
+    # Then
+    assert serializer is SERIALIZERS["binary"]
+    assert data == {"version": "1.0", "plans": []}
+    assert not tmpdir.join("project.gra.cache").exists()
+
+
+def test_damaged_cache_is_never_loaded(tmpdir):
+    """ Any changed byte of the cache makes it a miss, never wrong data """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+    (expected, _) = load_file_cached(str(filename))
+    cache = tmpdir.join("project.gra.cache")
+    content = cache.read_binary()
+
+    for position in range(len(content)):
+        damaged = bytearray(content)
+        damaged[position] ^= 0xFF
+        cache.write_binary(bytes(damaged))
+
+        # When
+        (data, _) = load_file_cached(str(filename))
+
+        # Then
+        assert data == expected
+
+
+def test_cache_files_only_match_their_key(tmpdir):
+    """ The shared cache file helpers round trip data for the same key only """
+    # Given
+    path = str(tmpdir.join("sub", "data.cache"))
+    write_cache_file(path, b"TEST\n", ("a", 1), {"values": [1, 2]})
+
+    # When
+    data = read_cache_file(path, b"TEST\n", ("a", 1))
+    other = read_cache_file(path, b"TEST\n", ("a", 2))
+
+    # Then
+    assert data == {"values": [1, 2]}
+    assert other is None
+    assert read_cache_file(path, b"OTHER\n", ("a", 1)) is None
+
+
+def test_file_is_hashed_and_parsed_in_chunks(tmpdir, monkeypatch):
+    """ Neither the fingerprint nor the parser reads the whole file at once """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+    monkeypatch.setattr(load_cache, "CHUNK_SIZE", 8)
+    reads = []
+    real_open = open
+
+    def recording_open(path, mode="r", *args, **kwargs):
+        file = real_open(path, mode, *args, **kwargs)
+        if path != str(filename):
+            return file
+        recording = mock.MagicMock(wraps=file)
+        recording.__enter__.return_value = recording
+        recording.__exit__.side_effect = lambda *_: file.close()
+        recording.read.side_effect = lambda *size: reads.append(size) or file.read(
+            *size
+        )
+        return recording
+
+    monkeypatch.setattr("builtins.open", recording_open)
+
+    # When
+    (data, _) = load_file_cached(str(filename))
+
+    # Then
+    assert data["plans"][0]["ancestor"] == "Foo"
+    assert () not in reads and (-1,) not in reads
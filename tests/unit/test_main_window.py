@@ -2,6 +2,7 @@
 
 from unittest import mock
 from PyQt5.QtCore import QModelIndex
+from PyQt5.QtWidgets import QMessageBox
 from grant.windows.main_window import MainWindow
 from grant.research import ResearchProject
 
@@ -139,6 +140,70 @@ def test_project_change_loads_gedcom_if_project_has_link(qtbot):
     window.project_changed_handler()
 
     # Then
-    window.gedcom_manager.load_link.assert_called_with(
+    window.gedcom_manager.load_link_in_background.assert_called_with(
         window.project_manager.project.gedcom
     )
+
+
+def test_links_are_validated_once_the_gedcom_file_is_loaded(qtbot, monkeypatch, tmpdir):
+    """ Link validation waits for the background load of the gedcom file """
+    # Given
+    window = MainWindow()
+    qtbot.addWidget(window)
+    window.gedcom_manager.cache_directory = str(tmpdir)
+    monkeypatch.setattr(window, "validate_links", mock.MagicMock())
+    window.gedcom_manager.link_loaded.disconnect()
+    window.gedcom_manager.link_loaded.connect(window.validate_links)
+    window.project_manager.project = ResearchProject("")
+    window.project_manager.project.gedcom = "tests/unit/test.ged"
+
+    # When
+    with qtbot.waitSignal(window.gedcom_manager.link_loaded):
+        window.project_changed_handler()
+        window.validate_links.assert_not_called()
+
+    # Then
+    window.validate_links.assert_called_once()
+    assert window.data_context.individuals_model.rowCount() == 2
+
+
+def test_edit_menu_follows_the_undo_stack(qtbot):
+    """ Undo and redo are only enabled when there is something to undo or redo """
+    # Given
+    window = MainWindow()
+    qtbot.addWidget(window)
+    window.project_manager.project = ResearchProject("")
+    window.project_manager.project_changed.emit()
+    model = window.data_context.data_model
+
+    # When
+    model.add_node(model.plans_index)
+    can_undo = window.menu_bar.edit_undo_action.isEnabled()
+    window.menu_bar.edit_undo_action.trigger()
+
+    # Then
+    assert can_undo
+    assert not window.menu_bar.edit_undo_action.isEnabled()
+    assert window.menu_bar.edit_redo_action.isEnabled()
+    assert window.project_manager.project.plans == []
+
+
+def test_refresh_gedcom_shows_the_change_summary(qtbot, monkeypatch):
+    """ Reloading the gedcom file tells the user what changed """
+    # Given
+    window = MainWindow()
+    qtbot.addWidget(window)
+    window.gedcom_manager = mock.MagicMock()
+    window.gedcom_manager.refresh_link.return_value.summary.return_value = "Summary"
+    window.project_manager.project = ResearchProject("")
+    window.project_manager.project.gedcom = "abcd"
+    monkeypatch.setattr(QMessageBox, "information", mock.MagicMock())
+
+    # When
+    window.refresh_gedcom()
+
+    # Then
+    window.gedcom_manager.refresh_link.assert_called_with("abcd")
+    QMessageBox.information.assert_called_with(  # pylint: disable=no-member
+        window, "Gedcom File Reloaded", "Summary"
+    )
@@ -0,0 +1,103 @@
+""" Tests for converting the plans in worker processes """
+
+from unittest import mock
+from grant.research import ResearchProject
+from grant.research import parallel_loader
+from grant.research.parallel_loader import from_py_parallel, split
+
+PROJECT = {
+    "version": "1.0",
+    "gedcom": "family.ged",
+    "plans": [
+        {
+            "id": plan * 10 + 1000,
+            "ancestor": f"Ancestor {plan}",
+            "goal": "<p>Find the <b>parents</b></p>",
+            "tasks": [
+                {
+                    "id": plan * 10 + task,
+                    "source": f"Source {task}",
+                    "description": "Search",
+                    "result": {"nil": False, "summary": "found"} if task else None,
+                }
+                for task in range(3)
+            ],
+        }
+        for plan in range(10)
+    ],
+}
+
+
+def test_split_keeps_order():
+    """ The chunks put back together give the original list """
+    # Given
+    items = list(range(10))
+
+    # When
+    chunks = split(items, 4)
+
+    # Then
+    assert len(chunks) == 4
+    assert sum(chunks, []) == items
+
+
+def test_parallel_load_matches_serial_load():
+    """ Plans converted by worker processes are the same as converted here """
+    # Given
+    expected = ResearchProject("")
+    expected.from_py(PROJECT)
+    progress = mock.MagicMock()
+
+    # When
+    project = ResearchProject("")
+    from_py_parallel(project, PROJECT, progress, processes=2, threshold=0)
+
+    # Then
+    assert project.to_py() == expected.to_py()
+    assert project.plans[0].goal == "Find the parents"
+    progress.assert_called_with(10, 10)
+
+
+def test_small_projects_are_loaded_serially(monkeypatch):
+    """ Below the threshold no worker processes are started """
+    # Given
+    pool = mock.MagicMock()
+    monkeypatch.setattr(parallel_loader, "ProcessPoolExecutor", pool)
+
+    # When
+    project = ResearchProject("")
+    from_py_parallel(project, PROJECT, processes=2, threshold=31)
+
+    # Then
+    assert not pool.called
+    assert len(project.plans) == 10
+
+
+def test_lazy_loading_is_done_serially(monkeypatch):
+    """ Lazy plans are not converted up front, so there is nothing to spread """
+    # Given
+    pool = mock.MagicMock()
+    monkeypatch.setattr(parallel_loader, "ProcessPoolExecutor", pool)
+
+    # When
+    project = ResearchProject("")
+    from_py_parallel(project, PROJECT, lazy=True, processes=2, threshold=0)
+
+    # Then
+    assert not pool.called
+    assert not project.plans[0].is_materialized()
+
+
+def test_parallel_loaded_plans_are_connected_to_the_project():
+    """ Plans from the workers update the project's index and counts """
+    # Given
+    project = ResearchProject("")
+    from_py_parallel(project, PROJECT, processes=2, threshold=0)
+
+    # When
+    task = project.plans[0].add_task()
+
+    # Then
+    assert project.find(task.id) is task
+    assert project.stats.tasks == 31
+    assert project.stats.success == 20
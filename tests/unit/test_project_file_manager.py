@@ -1,9 +1,14 @@
 """ Tests for the project file manager """
 
+from unittest import mock
 from PyQt5.QtWidgets import QFileDialog
 from PyQt5.QtWidgets import QMessageBox
+from grant.windows import project_file_manager
 from grant.windows.project_file_manager import ProjectFileManager
+from grant.models.journal_recorder import JournalRecorder
+from grant.models.tree_model import TreeModel
 from grant.research import ResearchProject
+from grant.research.serializers import SERIALIZERS, save_file
 
 
 def test_needs_save(qtbot):
@@ -421,3 +426,621 @@ def test_unlink_discard_ok_removes_link(monkeypatch, qtbot):
     # Then
     assert manager.project.gedcom == ""
     assert manager.needs_saving is True
+
+
+def test_background_open_emits_project_changed(qtbot, monkeypatch, tmpdir):
+    """ A background load hands the project over and then signals the change """
+    # Given
+    filename = tmpdir.join("test_background_open.gra")
+    filename.write(
+        "gedcom: ''\n"
+        + "plans:\n"
+        + "- ancestor: Foo\n"
+        + "  tasks: []\n"
+        + "version: '1.0'"
+    )
+    manager = ProjectFileManager()
+    manager.background_loading = True
+    monkeypatch.setattr(
+        QFileDialog, "getOpenFileName", lambda _, __, ___, ____: (str(filename), False)
+    )
+
+    # When
+    with qtbot.waitSignals([manager.load_progress, manager.project_changed]):
+        manager.open_project()
+
+    # Then
+    assert manager.project is not None
+    assert manager.project.filename == filename
+    assert manager.project.plans[0].ancestor == "Foo"
+    assert manager.loader is None
+
+
+def test_background_open_does_not_set_project_before_finished(qtbot, tmpdir):
+    """ The project is only replaced once the loader has finished """
+    # Given
+    filename = tmpdir.join("test_background_open.gra")
+    filename.write("gedcom: ''\n" + "plans: []\n" + "version: '1.0'")
+    manager = ProjectFileManager()
+    manager.background_loading = True
+
+    # When
+    with qtbot.waitSignal(manager.project_changed):
+        manager.load_project(str(filename))
+        assert manager.project is None
+
+    # Then
+    assert manager.project is not None
+
+
+def test_cancelled_background_open_keeps_project(qtbot, tmpdir):
+    """ Cancelling a background load never emits project_changed """
+    # Given
+    filename = tmpdir.join("test_background_cancel.gra")
+    filename.write("gedcom: ''\n" + "plans: []\n" + "version: '1.0'")
+    manager = ProjectFileManager()
+    manager.background_loading = True
+    manager.load_project(str(filename))
+    loader = manager.loader
+
+    # When
+    with qtbot.assertNotEmitted(manager.project_changed, wait=100):
+        manager.cancel_loading()
+        loader.wait()
+
+    # Then
+    assert manager.project is None
+    assert manager.loader is None
+
+
+def test_cancelled_loader_is_kept_until_finished(qtbot, tmpdir):
+    """ A cancelled loader is not dropped while its thread is still running """
+    # Given
+    filename = tmpdir.join("test_background_cancel.gra")
+    filename.write("gedcom: ''\n" + "plans: []\n" + "version: '1.0'")
+    manager = ProjectFileManager()
+    manager.background_loading = True
+    manager.load_project(str(filename))
+    loader = manager.loader
+
+    # When
+    manager.cancel_loading()
+    kept = loader in manager.cancelled_loaders
+
+    # Then
+    assert kept
+    qtbot.waitUntil(lambda: not manager.cancelled_loaders)
+
+
+def test_wait_for_loader_stops_running_load(tmpdir):
+    """ Waiting for the loader, e.g. on close, leaves no thread running """
+    # Given
+    filename = tmpdir.join("test_background_wait.gra")
+    filename.write("gedcom: ''\n" + "plans: []\n" + "version: '1.0'")
+    manager = ProjectFileManager()
+    manager.background_loading = True
+    manager.load_project(str(filename))
+    loader = manager.loader
+
+    # When
+    manager.wait_for_loader()
+
+    # Then
+    assert loader.isFinished()
+    assert manager.loader is None
+
+
+def test_background_open_shows_error_for_invalid_file(qtbot, monkeypatch, tmpdir):
+    """ A file that cannot be parsed is reported instead of loaded """
+    # Given
+    filename = tmpdir.join("test_background_invalid.gra")
+    filename.write("plans: [\n")
+    manager = ProjectFileManager()
+    manager.background_loading = True
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    with qtbot.assertNotEmitted(manager.project_changed, wait=100):
+        manager.load_project(str(filename))
+        manager.loader.wait()
+
+    # Then
+    QMessageBox.warning.assert_called()  # pylint: disable=no-member
+    assert manager.project is None
+
+
+def test_save_as_uses_format_of_selected_filter(qtbot, monkeypatch, tmpdir):
+    """ Choosing the JSON filter writes the project as JSON """
+    # Given
+    filename = tmpdir.join("test_save_as_json.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject("")
+    monkeypatch.setattr(
+        QFileDialog,
+        "getSaveFileName",
+        lambda _, __, ___, ____: (str(filename), "Grant Project - JSON (*.gra)"),
+    )
+
+    # When
+    manager.save_project_as()
+
+    # Then
+    assert manager.serializer is SERIALIZERS["json"]
+    assert filename.read().startswith("{")
+
+
+def test_open_remembers_detected_format(qtbot, tmpdir):
+    """ A project is saved back in the format it was opened in """
+    # Given
+    filename = tmpdir.join("test_open_binary.gra")
+    save_file(
+        str(filename),
+        {"version": "1.0", "gedcom": "", "plans": []},
+        SERIALIZERS["binary"],
+    )
+    manager = ProjectFileManager()
+
+    # When
+    with qtbot.waitSignal(manager.project_changed):
+        manager.load_project(str(filename))
+
+    # Then
+    assert manager.serializer is SERIALIZERS["binary"]
+
+
+def _journaled_manager(filename):
+    """ Creates a manager with a saved project and a journal recorder """
+    manager = ProjectFileManager()
+    manager.journaling = True
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan()
+    manager.save_project()
+    model = TreeModel()
+    model.set_project(manager.project)
+    manager.recorder = JournalRecorder(model)
+    return (manager, model)
+
+
+def test_journaled_save_appends_instead_of_rewriting(tmpdir):
+    """ Once the project is on disk, saves only append to the journal """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    base = filename.read()
+
+    # When
+    model.setData(model.index(0, 0, model.plans_index), "Foo")
+    manager.save_project()
+
+    # Then
+    assert filename.read() == base
+    assert tmpdir.join("test_journaled.gra.journal").exists()
+    assert manager.needs_saving is False
+
+
+def test_open_replays_journal(qtbot, tmpdir):
+    """ Loading applies the journal over the project file """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    model.setData(model.index(0, 0, model.plans_index), "Foo")
+    model.add_node(model.plans_index)
+    manager.save_project()
+
+    # When
+    reopened = ProjectFileManager()
+    with qtbot.waitSignal(reopened.project_changed):
+        reopened.load_project(str(filename))
+
+    # Then
+    assert len(reopened.project.plans) == 2
+    assert reopened.project.plans[0].ancestor == "Foo"
+
+
+def test_journal_is_compacted_in_background_past_limit(qtbot, tmpdir):
+    """ A journal past the size limit is folded back into the project file """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    manager.journal_limit = 0
+    model.setData(model.index(0, 0, model.plans_index), "Foo")
+
+    # When
+    manager.save_project()
+    manager.wait_for_writer()
+
+    # Then
+    assert not tmpdir.join("test_journaled.gra.journal").exists()
+    assert "Foo" in filename.read()
+
+
+def test_changes_outside_the_model_survive_project_changed(tmpdir):
+    """ A linked gedcom file is journaled although the model shows it again """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    manager.project_changed.connect(lambda: model.set_project(manager.project))
+    manager.project.gedcom = "tree.ged"
+    manager.record_change({"op": "set", "field": "gedcom", "value": "tree.ged"})
+    manager.project_changed.emit()
+
+    # When
+    manager.save_project()
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+
+    # Then
+    assert reopened.project.gedcom == "tree.ged"
+
+
+def test_other_project_with_the_same_filename_is_written_in_full(tmpdir):
+    """ Edits recorded for another project never end up in its journal """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    manager.project = ResearchProject(str(filename))
+    model.set_project(manager.project)
+    model.add_node(model.plans_index)
+
+    # When
+    manager.save_project()
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+
+    # Then
+    assert not tmpdir.join("test_journaled.gra.journal").exists()
+    assert len(reopened.project.plans) == 1
+    assert reopened.project.plans[0].id == manager.project.plans[0].id
+
+
+def test_full_save_removes_stale_journal(tmpdir):
+    """ Writing the whole project makes the journal obsolete """
+    # Given
+    filename = tmpdir.join("test_journaled.gra")
+    (manager, model) = _journaled_manager(filename)
+    model.setData(model.index(0, 0, model.plans_index), "Foo")
+    manager.save_project()
+
+    # When
+    manager.journaling = False
+    manager.save_project()
+
+    # Then
+    assert not tmpdir.join("test_journaled.gra.journal").exists()
+    assert "Foo" in filename.read()
+
+
+def test_save_in_background_writes_snapshot(qtbot, tmpdir):
+    """ The project as it was when the save started is written """
+    # Given
+    filename = tmpdir.join("test_background_save.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan().ancestor = "Foo"
+    manager.needs_saving = True
+
+    # When
+    with qtbot.waitSignal(manager.project_saved):
+        assert manager.save_in_background() is True
+        manager.project.plans[0].ancestor = "Bar"
+
+    # Then
+    assert "Foo" in filename.read()
+    assert manager.writer is None
+    assert manager.needs_saving is False
+
+
+def test_save_in_background_refuses_while_busy(tmpdir):
+    """ Only one background write runs at a time """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("test_busy.gra")))
+    manager.save_in_background()
+
+    # When
+    retval = manager.save_in_background()
+    manager.wait_for_writer()
+
+    # Then
+    assert retval is False
+
+
+def test_failed_background_save_needs_saving_again(qtbot, monkeypatch, tmpdir):
+    """ If the snapshot cannot be written the project stays dirty """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("missing", "test.gra")))
+    manager.needs_saving = True
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    manager.save_in_background()
+    manager.wait_for_writer()
+
+    # Then
+    assert manager.needs_saving is True
+    assert QMessageBox.warning.called  # pylint: disable=no-member
+
+
+def test_background_save_of_unwritable_data_shows_error(qtbot, monkeypatch, tmpdir):
+    """ Data the format can't represent fails the save like a disk error """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("test.gra")))
+    manager.project.add_plan().goal = object()
+    manager.needs_saving = True
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    manager.save_in_background()
+    manager.wait_for_writer()
+
+    # Then
+    assert manager.needs_saving is True
+    assert QMessageBox.warning.called  # pylint: disable=no-member
+    assert not tmpdir.join("test.gra").exists()
+
+
+def test_failed_save_shows_error_and_stays_dirty(qtbot, monkeypatch, tmpdir):
+    """ A synchronous save that fails tells the user and can be retried """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("missing", "test.gra")))
+    manager.needs_saving = True
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    saved = manager.save_project()
+
+    # Then
+    assert not saved
+    assert manager.needs_saving is True
+    assert QMessageBox.warning.called  # pylint: disable=no-member
+
+
+def test_project_without_ids_is_written_in_full_first(qtbot, tmpdir):
+    """ IDs given to an old project's plans are saved before journaling """
+    # Given
+    filename = tmpdir.join("test_old.gra")
+    save_file(
+        str(filename),
+        {"version": "1.0", "plans": [{"ancestor": "A", "tasks": [{}]}]},
+        SERIALIZERS["yaml"],
+    )
+    manager = ProjectFileManager()
+    manager.journaling = True
+    manager.lazy_loading = True
+    manager.load_project(str(filename))
+    model = TreeModel()
+    model.set_project(manager.project)
+    manager.recorder = JournalRecorder(model)
+    plan_index = model.index(0, 0, model.plans_index)
+
+    # When
+    model.setData(model.index(0, 0, plan_index), "Census")
+    manager.save_project()
+    model.setData(model.index(0, 0, plan_index), "Church Books")
+    manager.save_project()
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+
+    # Then
+    assert tmpdir.join("test_old.gra.journal").exists()
+    assert reopened.project.plans[0].tasks[0].source == "Church Books"
+    assert reopened.project.plans[0].id == manager.project.plans[0].id
+
+
+def test_eager_load_builds_plain_yaml_without_the_data(qtbot, monkeypatch, tmpdir):
+    """ A YAML project is built from the parser events, not loaded as data """
+    # Given
+    filename = tmpdir.join("test_built.gra")
+    data = {"version": "1.0", "plans": [{"id": 1, "ancestor": "A", "tasks": [{}]}]}
+    save_file(str(filename), data, SERIALIZERS["yaml"])
+    manager = ProjectFileManager()
+    monkeypatch.setattr(
+        project_file_manager, "load_file_cached", mock.MagicMock(side_effect=OSError)
+    )
+
+    # When
+    manager.load_project(str(filename))
+
+    # Then
+    assert manager.project.plans[0].ancestor == "A"
+    assert manager.project.stats.tasks == 1
+    assert manager.serializer is SERIALIZERS["yaml"]
+    assert not manager.sharded
+
+
+def test_save_checkpoints_the_changes(tmpdir):
+    """ Once saved, the project has no changes left """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("test_changes.gra")))
+    manager.project.add_plan()
+
+    # When
+    manager.save_project()
+
+    # Then
+    assert not manager.project.changes
+
+
+def test_failed_background_save_keeps_the_changes(qtbot, monkeypatch, tmpdir):
+    """ The changes of a snapshot that wasn't written are merged back """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("missing", "test.gra")))
+    plan = manager.project.add_plan()
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    manager.save_in_background()
+    task = plan.add_task()
+    manager.wait_for_writer()
+
+    # Then
+    assert manager.project.changes.added == {plan.id: "plan", task.id: "task"}
+
+
+def test_discard_prompt_lists_the_changes(monkeypatch, tmpdir):
+    """ The discard confirmation tells what would be lost """
+    # Given
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(tmpdir.join("test_changes.gra")))
+    manager.project.add_plan()
+    manager.project.gedcom = "test.ged"
+    manager.project.changes.modify_field("gedcom")
+    manager.needs_saving = True
+    monkeypatch.setattr(manager.project_discard, "exec_", lambda: QMessageBox.Cancel)
+
+    # When
+    manager.open_project()
+
+    # Then
+    text = manager.project_discard.informativeText()
+    assert text == "1 plan added, gedcom changed"
+
+
+def test_sharded_project_saves_only_edited_plans(tmpdir):
+    """ A project with one file per plan is reopened with just the edits saved """
+    # Given
+    filename = tmpdir.join("test_sharded.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan().add_task()
+    manager.project.add_plan()
+    manager.sharded = True
+    manager.save_project()
+    manager.load_project(str(filename))
+    model = TreeModel()
+    model.set_project(manager.project)
+    untouched = manager.project.plans[1]
+    shard = tmpdir.join("test_sharded.gra.plans", f"{untouched.id}.gra")
+    shard.write("not a shard")
+
+    # When
+    plan_index = model.index(0, 0, model.plans_index)
+    model.setData(model.index(0, 0, plan_index), "Census")
+    manager.save_project()
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+
+    # Then
+    assert manager.sharded is True
+    assert reopened.sharded is True
+    assert reopened.project.plans[0].tasks[0].source == "Census"
+    assert shard.read() == "not a shard"
+    assert not untouched.is_materialized()
+
+
+def test_sharded_save_keeps_edits_of_a_plan_restored_by_undo(qtbot, tmpdir):
+    """ A deleted plan that undo put back unmaterialized still saves its edits """
+    # Given
+    filename = tmpdir.join("test_sharded.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan().add_task()
+    manager.sharded = True
+    manager.save_project()
+    manager.load_project(str(filename))
+    model = TreeModel()
+    model.set_project(manager.project)
+    plan_index = model.index(0, 0, model.plans_index)
+    model.setData(model.index(0, 0, plan_index), "Census")
+    model.delete_node(plan_index)
+    model.undo()
+
+    # When
+    manager.save_project()
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+
+    # Then
+    assert not manager.project.plans[0].is_materialized()
+    assert reopened.project.plans[0].tasks[0].source == "Census"
+
+
+def test_unreadable_shard_is_shown_as_a_warning(qtbot, monkeypatch, tmpdir):
+    """ Showing a plan whose shard is broken warns instead of crashing """
+    # Given
+    filename = tmpdir.join("test_sharded.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan().add_task()
+    manager.sharded = True
+    manager.save_project()
+    plan_id = manager.project.plans[0].id
+    shard = tmpdir.join("test_sharded.gra.plans", f"{plan_id}.gra")
+    shard.write("tasks: [\n")
+    manager.load_project(str(filename))
+    model = TreeModel()
+    model.set_project(manager.project)
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+
+    # When
+    rows = model.rowCount(model.index(0, 0, model.plans_index))
+    manager.save_project()
+
+    # Then
+    assert rows == 0
+    qtbot.waitUntil(lambda: QMessageBox.warning.called)  # pylint: disable=no-member
+    assert shard.read() == "tasks: [\n"
+
+
+def test_save_as_refuses_a_project_with_an_unreadable_shard(qtbot, monkeypatch, tmpdir):
+    """ Saving elsewhere would drop the plan that couldn't be read """
+    # Given
+    filename = tmpdir.join("test_sharded.gra")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject(str(filename))
+    manager.project.add_plan().add_task()
+    manager.sharded = True
+    manager.save_project()
+    plan_id = manager.project.plans[0].id
+    tmpdir.join("test_sharded.gra.plans", f"{plan_id}.gra").write("tasks: [\n")
+    manager.load_project(str(filename))
+    copy = tmpdir.join("test_copy.gra")
+    monkeypatch.setattr(QMessageBox, "warning", mock.MagicMock())
+    monkeypatch.setattr(
+        QFileDialog, "getSaveFileName", lambda _, __, ___, ____: (str(copy), True)
+    )
+
+    # When
+    manager.save_project_as()
+
+    # Then
+    assert not copy.exists()
+    assert manager.project.filename == str(filename)
+    assert manager.sharded
+    assert QMessageBox.warning.called  # pylint: disable=no-member
+
+
+def test_compressed_project_stays_compressed(qtbot, monkeypatch, tmpdir):
+    """ A project saved compressed is detected on open and saved compressed again """
+    # Given
+    filename = tmpdir.join("test_compressed.gra.gz")
+    manager = ProjectFileManager()
+    manager.project = ResearchProject("")
+    manager.project.add_plan().ancestor = "Foo"
+    monkeypatch.setattr(
+        QFileDialog,
+        "getSaveFileName",
+        lambda _, __, ___, ____: (
+            str(filename),
+            "Grant Project - Compressed (*.gra.gz)",
+        ),
+    )
+    manager.save_project_as()
+
+    # When
+    reopened = ProjectFileManager()
+    reopened.load_project(str(filename))
+    reopened.project.plans[0].ancestor = "Bar"
+    reopened.save_project()
+
+    # Then
+    assert reopened.serializer.name == "yaml+gzip"
+    assert filename.read_binary().startswith(b"\x1f\x8b")
+    again = ProjectFileManager()
+    again.load_project(str(filename))
+    assert again.project.plans[0].ancestor == "Bar"
@@ -1,5 +1,6 @@
 """ Tests for the ProjectOverview dialog """
 
+from PyQt5.QtWidgets import QLabel
 from grant.windows.project_overview_dialog import ProjectOverviewDialog
 from grant.windows.data_context import DataContext
 from grant.research import ResearchProject
@@ -27,3 +28,18 @@ def test_show_classmethod(monkeypatch):
     ProjectOverviewDialog.show(DataContext(), ResearchProject("Foobar"), None)
 
     # Then
+
+
+def test_dialog_shows_project_stats(qtbot):
+    """ The counts come from the project's live stats """
+    # Given
+    project = ResearchProject("Foobar")
+    project.add_plan().add_task()
+
+    # When
+    dialog = ProjectOverviewDialog(DataContext(), project, None)
+    qtbot.add_widget(dialog)
+
+    # Then
+    texts = [label.text() for label in dialog.findChildren(QLabel)]
+    assert "0 (0 success, 0 nil)" in texts
@@ -110,4 +110,54 @@ def test_to_py_sets_fields():
     assert data["ancestor_link"] == plan.ancestor_link
     assert data["goal"] == plan.goal
     assert data["tasks"] == plan.tasks
-    assert len(data.keys()) == 4  # To verify nothing else was added
+    assert data["id"] == plan.id
+    assert len(data.keys()) == 5  # To verify nothing else was added
+
+
+def test_lazy_from_py_defers_tasks():
+    """ A lazily loaded plan only converts its tasks once they are accessed """
+    # Given
+    plan = ResearchPlan()
+    plan_data = {"ancestor": "ANCESTOR", "tasks": [{"source": "SOURCE"}]}
+
+    # When
+    plan.from_py(plan_data, lazy=True)
+
+    # Then
+    assert plan.ancestor == "ANCESTOR"
+    assert not plan.is_materialized()
+    assert plan.tasks[0].source == "SOURCE"
+    assert plan.is_materialized()
+
+
+def test_task_count_does_not_materialize():
+    """ task_count() and has_linked_tasks() work on the unconverted data """
+    # Given
+    plan = ResearchPlan()
+    plan_data = {"tasks": [{"source": "ONE"}, {"source": "TWO", "source_link": "@S1@"}]}
+    plan.from_py(plan_data, lazy=True)
+
+    # When
+    count = plan.task_count()
+    linked = plan.has_linked_tasks()
+
+    # Then
+    assert count == 2
+    assert linked is True
+    assert not plan.is_materialized()
+
+
+def test_to_py_of_lazy_plan_returns_loaded_data():
+    """ Saving a plan that was never used returns the data it was loaded from """
+    # Given
+    plan = ResearchPlan()
+    plan_data = {"ancestor": "ANCESTOR", "goal": "GOAL", "tasks": [{"source": "S"}]}
+    plan.from_py(plan_data, lazy=True)
+
+    # When
+    data = plan.to_py()
+
+    # Then
+    assert data["goal"] == "GOAL"
+    assert data["tasks"] == [{"source": "S"}]
+    assert not plan.is_materialized()
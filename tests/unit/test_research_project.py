@@ -1,7 +1,10 @@
 """ Tests related to the ResearchProject class """
 
+from unittest import mock
+import pytest
 from grant.research import ResearchProject
 from grant.research import ResearchPlan
+from grant.research.task_store import TaskStore
 
 
 def test_gedcom_is_empty_by_default():
@@ -123,3 +126,307 @@ def test_versioning_loads_gedcom_none_as_empty():
     project = ResearchProject("")
     project.from_py(project_data)
     assert project.gedcom == ""
+
+
+def test_from_py_reports_progress_per_plan():
+    """ The progress callback is called once for every converted plan """
+    # Given
+    project_data = {}
+    project_data["version"] = "1.0"
+    project_data["plans"] = [{}, {}, {}]
+    calls = []
+
+    # When
+    project = ResearchProject("")
+    project.from_py(project_data, lambda done, total: calls.append((done, total)))
+
+    # Then
+    assert calls == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_equal_sources_and_links_share_one_string():
+    """ Loading interns the sources and links of all plans """
+    # Given
+    task_data = {"source": "Census", "source_link": "@S1@", "description": ""}
+    plan_data = {"ancestor": "Ancestor", "tasks": [dict(task_data), dict(task_data)]}
+    project_data = {
+        "version": "1.0",
+        "plans": [dict(plan_data), {"ancestor": "Ancestor", "tasks": [task_data]}],
+    }
+    # Make every value its own object, like a parser would
+    for plan in project_data["plans"]:
+        plan["ancestor"] = "".join(plan["ancestor"])
+        for task in plan["tasks"]:
+            task["source"] = "".join(["Cen", "sus"])
+    project = ResearchProject("")
+
+    # When
+    project.from_py(project_data)
+
+    # Then
+    tasks = [task for plan in project.plans for task in plan.tasks]
+    assert all(task.source is tasks[0].source for task in tasks)
+    assert project.plans[0].ancestor is project.plans[1].ancestor
+
+
+def test_string_sharing_reports_saved_memory():
+    """ string_sharing() counts the references to every shared string """
+    # Given
+    project = ResearchProject("")
+    project.from_py(
+        {
+            "version": "1.0",
+            "plans": [
+                {"ancestor": "Ancestor", "tasks": [{"source": "".join("Census")}]},
+                {"ancestor": "Other", "tasks": [{"source": "".join("Census")}]},
+            ],
+        }
+    )
+
+    # When
+    report = project.string_sharing()
+
+    # Then
+    assert report["references"] == 4
+    assert report["objects"] == 3
+    assert report["saved_bytes"] > 0
+
+
+def _project_with_ids(lazy=False, store=None):
+    """ A project with two plans of two tasks each, with IDs 1 to 6 """
+    project = ResearchProject("", store)
+    project.from_py(
+        {
+            "version": "1.0",
+            "plans": [
+                {"id": 1, "tasks": [{"id": 2}, {"id": 3}]},
+                {"id": 4, "tasks": [{"id": 5}, {"id": 6}]},
+            ],
+        },
+        lazy=lazy,
+    )
+    return project
+
+
+def test_find_returns_plans_and_tasks_by_id():
+    """ find() looks up plans and tasks, None for unknown IDs """
+    # Given
+    project = _project_with_ids()
+
+    # When
+    plan = project.find(4)
+    task = project.find(3)
+
+    # Then
+    assert plan is project.plans[1]
+    assert task is project.plans[0].tasks[1]
+    assert project.find(7) is None
+
+
+def test_find_materializes_only_the_lazy_plan_with_the_task():
+    """ Tasks of lazy plans are found by converting just their plan """
+    # Given
+    project = _project_with_ids(lazy=True)
+
+    # When
+    task = project.find(5)
+
+    # Then
+    assert task is project.plans[1].tasks[0]
+    assert not project.plans[0].is_materialized()
+
+
+def test_index_follows_added_and_deleted_items():
+    """ The index is kept up to date by the add and delete methods """
+    # Given
+    project = _project_with_ids()
+    project.find(1)
+
+    # When
+    plan = project.add_plan()
+    task = plan.add_task()
+    project.delete(2)
+    project.delete(4)
+
+    # Then
+    assert project.find(plan.id) is plan
+    assert project.find(task.id) is task
+    assert project.find(2) is None
+    assert project.find(5) is None
+    assert [task.id for task in project.plans[0].tasks] == [3]
+    assert len(project.plans) == 2
+
+
+def test_move_task_keeps_its_id():
+    """ A moved task can still be found by its ID """
+    # Given
+    project = _project_with_ids()
+
+    # When
+    project.move_task(2, 4, 1)
+
+    # Then
+    assert [task.id for task in project.plans[0].tasks] == [3]
+    assert [task.id for task in project.plans[1].tasks] == [5, 2, 6]
+    assert project.ids.owner(2) is project.plans[1]
+
+
+def test_move_task_keeps_its_id_in_a_task_store():
+    """ The moved task's new store view is the same task, not an ID clash """
+    # Given
+    project = _project_with_ids(store=TaskStore())
+    project.find(1)
+
+    # When
+    project.move_task(2, 4, 1)
+
+    # Then
+    assert [task.id for task in project.plans[1].tasks] == [5, 2, 6]
+    assert project.find(2) == project.plans[1].tasks[1]
+    assert project.ids.position(2) == 1
+
+
+def test_positions_follow_inserts_in_front():
+    """ A cached position that has gone stale is looked up again """
+    # Given
+    project = _project_with_ids()
+    before = (project.ids.position(4), project.ids.position(6))
+
+    # When
+    project.insert_plan(0, {"id": 7, "tasks": []})
+    project.plans[1].insert_task(0, {"id": 8})
+
+    # Then
+    assert before == (1, 1)
+    assert project.ids.position(4) == 2
+    assert project.ids.position(1) == 1
+    assert project.ids.position(3) == 2
+    assert project.ids.position(8) == 0
+    assert project.ids.position(9) is None
+
+
+def test_misses_do_not_read_the_lazy_plans_again(monkeypatch):
+    """ The task IDs of lazy plans are collected once, on the first miss """
+    # Given
+    project = _project_with_ids(lazy=True)
+    project.find(7)
+    monkeypatch.setattr(
+        ResearchPlan, "task_ids", mock.MagicMock(side_effect=AssertionError)
+    )
+
+    # When
+    missing = project.find(8)
+    task = project.find(5)
+
+    # Then
+    assert missing is None
+    assert task is project.plans[1].tasks[0]
+    assert not project.plans[0].is_materialized()
+
+
+def test_missing_ids_are_added_to_the_loaded_data():
+    """ Old projects get IDs, which to_py() then saves """
+    # Given
+    task_data = {}
+    data = {"version": "1.0", "plans": [{"ancestor": "A", "tasks": [task_data]}]}
+    project = ResearchProject("")
+
+    # When
+    project.from_py(data, lazy=True)
+
+    # Then
+    assert project.new_ids is True
+    assert project.to_py()["plans"][0]["tasks"][0]["id"] == task_data["id"]
+    assert project.plans[0].tasks[0].id == task_data["id"]
+
+
+def _project_for_stats(lazy=False):
+    """ Two plans, one linked, with an open, a successful and a nil task """
+    project = ResearchProject("")
+    project.from_py(
+        {
+            "version": "1.0",
+            "plans": [
+                {
+                    "ancestor_link": "@I1@",
+                    "tasks": [{"source_link": "@S1@"}, {"result": {"nil": False}},],
+                },
+                {"ancestor_link": "", "tasks": [{"result": {"nil": True}}]},
+            ],
+        },
+        lazy=lazy,
+    )
+    return project
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_stats_are_counted_on_load(lazy):
+    """ Loading counts the plans and tasks, lazy ones from their data """
+    # When
+    stats = _project_for_stats(lazy).stats
+
+    # Then
+    assert (stats.plans, stats.tasks, stats.open_tasks) == (2, 3, 1)
+    assert (stats.success, stats.nil, stats.complete_tasks) == (1, 1, 2)
+    assert (stats.linked_individuals, stats.linked_sources) == (1, 1)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_stats_follow_added_and_deleted_items(lazy):
+    """ Adding and deleting plans and tasks updates the counts """
+    # Given
+    project = _project_for_stats(lazy)
+
+    # When
+    project.delete_plan(0)
+    project.add_plan().add_task()
+    project.plans[0].delete_task(0)
+
+    # Then
+    stats = project.stats
+    assert (stats.plans, stats.tasks, stats.open_tasks) == (2, 1, 1)
+    assert (stats.success, stats.nil) == (0, 0)
+    assert (stats.linked_individuals, stats.linked_sources) == (0, 0)
+
+
+def test_changes_record_added_and_deleted_items():
+    """ The project's change set follows plans and tasks being added and deleted """
+    # Given
+    project = _project_with_ids()
+    project.checkpoint()
+
+    # When
+    plan = project.add_plan()
+    plan.add_task()
+    project.plans[0].delete_task(0)
+
+    # Then
+    assert project.changes.added == {plan.id: "plan", plan.tasks[0].id: "task"}
+    assert project.changes.deleted == {2: "task"}
+    assert project.changes.changed_plans() == {1, plan.id}
+
+
+def test_checkpoint_starts_a_new_change_set():
+    """ The changes since the last checkpoint are handed over and forgotten """
+    # Given
+    project = _project_with_ids()
+    project.add_plan()
+
+    # When
+    changes = project.checkpoint()
+
+    # Then
+    assert len(changes.added) == 1
+    assert not project.changes
+
+
+def test_loading_is_not_a_change():
+    """ Plans and tasks read from a file are not listed as added """
+    # Given
+    project = _project_with_ids(lazy=True)
+
+    # When
+    project.plans[0].materialize()
+
+    # Then
+    assert not project.changes
@@ -1,5 +1,8 @@
 """ Tests for the ResearchResult class """
 
+import datetime
+import pickle
+import pytest
 from grant.research import ResearchResult
 
 
@@ -113,3 +116,29 @@ def test_to_py_encodes_data_fields():
     assert data["document"] == result.document
     assert data["nil"] == result.is_nil()
     assert len(data.keys()) == 4  # To verify nothing else was added
+
+
+def test_result_can_be_pickled():
+    """ A result survives pickling, e.g. to be sent from a worker process """
+    # Given
+    result = ResearchResult(True)
+    result.date = datetime.datetime(2020, 1, 2)
+    result.document = "DOC"
+    result.summary = "SUMMARY"
+
+    # When
+    copy = pickle.loads(pickle.dumps(result))
+
+    # Then
+    assert copy.to_py() == result.to_py()
+
+
+def test_result_is_slotted():
+    """ Results don't carry a per-instance dict, or a Qt object """
+    # Given
+    result = ResearchResult(True)
+
+    # Then
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.description = "Not a field"
@@ -58,4 +58,5 @@ def test_to_py_sets_fields():
     assert data["source"] == task.source
     assert data["source_link"] == task.source_link
     assert data["result"] == task.result
-    assert len(data.keys()) == 4  # To verify nothing else was added
+    assert data["id"] == task.id
+    assert len(data.keys()) == 5  # To verify nothing else was added
@@ -1,5 +1,7 @@
 """ Test conversion functions in research.py """
 
+import pytest
+from PyQt5.QtGui import QTextDocument
 from grant.research.research import convert_html
 
 
@@ -29,3 +31,114 @@ def test_html_is_stripped():
     # Then
     print(f">{text}<")
     assert text == "Describe your goals for this plan..."
+
+
+def test_plain_text_is_kept():
+    """ Text without markup keeps its line breaks and spacing """
+    # Given
+    text = "  Check the baptisms\n  and   burials 1841 < 1851\n"
+
+    # When
+    converted = convert_html(text)
+
+    # Then
+    assert converted == "Check the baptisms\n  and   burials 1841 < 1851"
+
+
+def test_plain_text_non_breaking_spaces_become_spaces():
+    """ Plain text is normalized like HTML, whichever way a field was saved """
+    # When
+    converted = convert_html("\xa0a\xa0b ")
+
+    # Then
+    assert converted == "a b" == convert_html("<p>&nbsp;a&nbsp;b</p>")
+
+
+def test_qt_html_is_converted_like_qt():
+    """ The HTML written by a QTextEdit converts back to the text it came from """
+    # Given
+    text = "Line one\n  indented  two\n\nfour & <five>"
+    document = QTextDocument()
+    document.setPlainText(text)
+
+    # When
+    converted = convert_html(document.toHtml())
+
+    # Then
+    assert converted == text
+
+
+def test_non_breaking_spaces_become_spaces_like_qt():
+    """ Qt turns the non-breaking spaces of a document into plain spaces """
+    # Given
+    document = QTextDocument()
+    document.setPlainText("a\xa0b")
+    html = document.toHtml()
+    document.setHtml(html)
+
+    # When
+    converted = convert_html(html)
+
+    # Then
+    assert converted == "a b" == document.toPlainText()
+
+
+@pytest.mark.parametrize(
+    "html,text",
+    [
+        ("<p>a</p><p>b</p>", "a\nb"),
+        ("x<br><br>y", "x\n\ny"),
+        ("<p> a  <b>b</b>\n c </p>", "a b c"),
+        ("<pre>a\n  b</pre>", "a\n  b"),
+        ("<ul><li>one</li><li>two</li></ul>", "one\ntwo"),
+        ("<p>caf&eacute; &#65; &amp;amp; &unknown;</p>", "café A &amp; &unknown;"),
+        ("<style>p {}</style><script>var a</script>body", "body"),
+        ("<p>x&nbsp;y\xa0z</p>", "x y z"),
+        ("<div><div>a</div><div>b</div></div>", "a\nb"),
+        ("<div><p>a</p>b</div>", "a\nb"),
+        ("<div>a<p>b</p>c</div>", "a\nb\nc"),
+        ("<div>a<div><div>b</div></div>c</div>", "a\nb\nc"),
+        ("<div>a<ul><li>b</li></ul>c</div>", "a\nb\nc"),
+        ("<ul><li>a</li><li>b<ul><li>c</li></ul></li><li>d</li></ul>", "a\nb\nc\nd"),
+        ("<ul><li>a<ul><li>b</li></ul>c</li></ul>", "a\nb\nc"),
+        ("<ol><li><p>a</p></li><li>b</li></ol>", "a\nb"),
+        ("<ul><li></li><li>a</li></ul>", "a"),
+        ("<blockquote>a<p>b</p>c</blockquote>", "a\nb\nc"),
+        ("<dl><dt>a</dt><dd>b</dd></dl>", "a\nb"),
+    ],
+)
+def test_html_matches_qt(html, text):
+    """ Hand written HTML converts like QTextDocument.toPlainText() """
+    # Given
+    document = QTextDocument()
+    document.setHtml(html)
+
+    # When
+    converted = convert_html(html)
+
+    # Then
+    assert converted == text == document.toPlainText().strip()
+
+
+@pytest.mark.parametrize(
+    "html,text,qt_text",
+    [
+        ("<div>a</div>b", "a\nb", "ab"),
+        ("<div>a<div>b</div>c</div>", "a\nb\nc", "a\nbc"),
+        ("<div><div><div>a</div>b</div>c</div>", "a\nb\nc", "ab\nc"),
+        ("<div>\n  <div>a</div>\n  <div>b</div>\n</div>", "a\nb", "a \nb"),
+        ("<ul>\n <li>a</li>\n <li>b</li>\n</ul>", "a\nb", "a \nb"),
+    ],
+)
+def test_nested_blocks_differ_from_qt_on_purpose(html, text, qt_text):
+    """ Text after a div and whitespace between blocks follow the blocks """
+    # Given
+    document = QTextDocument()
+    document.setHtml(html)
+
+    # When
+    converted = convert_html(html)
+
+    # Then
+    assert converted == text
+    assert document.toPlainText().strip() == qt_text
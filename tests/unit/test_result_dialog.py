@@ -108,3 +108,20 @@ def test_get_result_classmethod(monkeypatch):
     # Then
     assert result is not None
     assert result.is_nil() is False
+
+
+def test_ok_does_not_change_the_original_result(qtbot):
+    """ The dialog hands back a new result rather than editing the task's """
+    # Given
+    result = ResearchResult(True)
+    dialog = ResultDialog(result)
+    qtbot.add_widget(dialog)
+    dialog.status.setCurrentText("nil")
+
+    # When
+    dialog.ok_pressed()
+
+    # Then
+    assert dialog.result is not result
+    assert dialog.result.is_nil()
+    assert not result.is_nil()
@@ -1,9 +1,11 @@
 """ Tests for the ResultWidget class """
 
 import pytest
-from grant.windows.result_widget import ResultWidget
+from PyQt5.QtWidgets import QDataWidgetMapper
+from grant.windows.result_widget import ResultDelegate, ResultWidget
 from grant.windows.result_dialog import ResultDialog
-from grant.research import ResearchResult
+from grant.research import ResearchProject, ResearchResult
+from grant.models.tree_model import TreeModel, TreeModelCols
 
 
 def test_result_is_none_by_default(qtbot):
@@ -90,3 +92,35 @@ def test_record_result_creates_result_object(result_type, qtbot, monkeypatch):
     # Then
     assert widget.result is not None
     assert widget.result.is_nil() is not result_type
+
+
+def test_delegate_maps_results_to_and_from_model(qtbot):
+    """ A mapper with the ResultDelegate moves results between widget and model """
+    # Given
+    project = ResearchProject("")
+    plan = project.add_plan()
+    plan.add_task()
+    plan.add_task()
+    plan.tasks[0].result = ResearchResult(False)
+    model = TreeModel()
+    model.set_project(project)
+    widget = ResultWidget()
+    qtbot.add_widget(widget)
+    mapper = QDataWidgetMapper()
+    mapper.setModel(model)
+    mapper.setItemDelegate(ResultDelegate(mapper))
+    mapper.addMapping(widget, TreeModelCols.RESULT)
+    mapper.setRootIndex(model.index(0, 0, model.plans_index))
+
+    # When
+    mapper.setCurrentIndex(0)
+    first = widget.result
+    mapper.setCurrentIndex(1)
+    second = widget.result
+    widget.result = ResearchResult(True)
+    mapper.submit()
+
+    # Then
+    assert first is plan.tasks[0].result
+    assert second is None
+    assert plan.tasks[1].result is widget.result
@@ -0,0 +1,268 @@
+""" Tests for the project file serializers """
+
+import copy
+import datetime
+import io
+import os
+import pickle
+import stat
+import pytest
+from grant.research.serializers import SERIALIZERS
+from grant.research.serializers import COMPRESSIONS, CompressedSerializer
+from grant.research.serializers import DEFAULT_SERIALIZER
+from grant.research.serializers import FormatError
+from grant.research.serializers import detect_serializer
+from grant.research.serializers import load_file
+from grant.research.serializers import save_file
+from grant.research.serializers import save_project
+from grant.research.load_cache import load_file_cached
+from grant.research import ResearchProject
+
+PROJECT_DATA = {
+    "version": "1.0",
+    "gedcom": "",
+    "plans": [
+        {
+            "id": 1,
+            "ancestor": "Jöhn Doe",
+            "ancestor_link": "I0001",
+            "goal": "Find\nthe baptism",
+            "tasks": [
+                {
+                    "id": 2,
+                    "source": "Church Books",
+                    "source_link": "S0001",
+                    "description": "",
+                    "result": {
+                        "date": datetime.datetime(2020, 5, 3, 12, 30),
+                        "document": "",
+                        "summary": "nothing",
+                        "nil": True,
+                    },
+                },
+                {
+                    "id": 3,
+                    "source": "Census",
+                    "source_link": "",
+                    "description": "1841",
+                    "result": {
+                        "date": datetime.date(2020, 5, 4),
+                        "document": "12",
+                        "summary": "",
+                        "nil": False,
+                    },
+                },
+            ],
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_serializer_round_trip(name):
+    """ Data written by a serializer is read back unchanged """
+    # Given
+    serializer = SERIALIZERS[name]
+    file = io.BytesIO()
+
+    # When
+    serializer.dump(PROJECT_DATA, file)
+    file.seek(0)
+
+    # Then
+    assert serializer.load(file) == PROJECT_DATA
+
+
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_serializer_is_detected_from_header(name):
+    """ The format is picked up from the start of the file """
+    # Given
+    file = io.BytesIO()
+    SERIALIZERS[name].dump(PROJECT_DATA, file)
+
+    # When
+    serializer = detect_serializer(file.getvalue()[:16])
+
+    # Then
+    assert serializer is SERIALIZERS[name]
+
+
+def test_existing_yaml_project_is_detected(tmpdir):
+    """ Projects written before serializers existed still load as YAML """
+    # Given
+    filename = tmpdir.join("old.gra")
+    filename.write("gedcom: none\n" + "plans: []\n" + "version: '1.0'")
+
+    # When
+    (data, serializer) = load_file(str(filename))
+
+    # Then
+    assert serializer is DEFAULT_SERIALIZER
+    assert data == {"gedcom": "none", "plans": [], "version": "1.0"}
+
+
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_save_file_and_load_file_match(name, tmpdir):
+    """ save_file() and load_file() round trip in every format """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+
+    # When
+    save_file(filename, PROJECT_DATA, SERIALIZERS[name])
+    (data, serializer) = load_file(filename)
+
+    # Then
+    assert serializer is SERIALIZERS[name]
+    assert data == PROJECT_DATA
+
+
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_dump_project_matches_dump_of_to_py(name):
+    """ Writing the project directly gives the same bytes as dumping to_py() """
+    # Given
+    project = ResearchProject("")
+    project.from_py(copy.deepcopy(PROJECT_DATA))
+    project.add_plan()
+    tasks = project.plans[0].tasks
+    tasks[1].result.date = tasks[0].result.date  # Written as an alias
+    expected = io.BytesIO()
+    SERIALIZERS[name].dump(project.to_py(), expected)
+
+    # When
+    file = io.BytesIO()
+    SERIALIZERS[name].dump_project(project, file)
+
+    # Then
+    assert file.getvalue() == expected.getvalue()
+
+
+def test_save_project_streams_lazy_plans(tmpdir):
+    """ Unused lazily loaded plans are saved from their loaded data """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    project = ResearchProject(filename)
+    project.from_py(copy.deepcopy(PROJECT_DATA), lazy=True)
+
+    # When
+    save_project(filename, project)
+    (data, _) = load_file(filename)
+
+    # Then
+    assert data == PROJECT_DATA
+    assert not project.plans[0].is_materialized()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"plans: [\n", b'{"plans": ', SERIALIZERS["binary"].magic + b"\x80\x04"],
+)
+def test_load_file_raises_format_error_for_corrupt_files(content, tmpdir):
+    """ Broken files are reported with a common exception """
+    # Given
+    filename = tmpdir.join("broken.gra")
+    filename.write_binary(content)
+
+    # Then
+    with pytest.raises(FormatError):
+        load_file(str(filename))
+
+
+def test_binary_serializer_refuses_unknown_classes():
+    """ Only the types that appear in projects may be unpickled """
+    # Given
+    file = io.BytesIO()
+    file.write(SERIALIZERS["binary"].magic)
+    pickle.dump(io.BytesIO, file)
+    file.seek(0)
+
+    # Then
+    with pytest.raises(pickle.UnpicklingError):
+        SERIALIZERS["binary"].load(file)
+
+
+def test_failed_save_keeps_previous_file(tmpdir):
+    """ An error while writing never corrupts the existing project """
+    # Given
+    filename = tmpdir.join("project.gra")
+    save_file(str(filename), PROJECT_DATA)
+    previous = filename.read_binary()
+
+    # When
+    with pytest.raises(TypeError):
+        save_file(str(filename), {"plans": [object()]}, SERIALIZERS["json"])
+
+    # Then
+    assert filename.read_binary() == previous
+    assert tmpdir.listdir() == [filename]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="File modes are POSIX only")
+def test_new_file_gets_the_mode_of_open(tmpdir):
+    """ A new project file is created like open() would, not private """
+    # Given
+    filename = tmpdir.join("project.gra")
+    tmpdir.join("plain").write("")
+    expected = stat.S_IMODE(os.stat(str(tmpdir.join("plain"))).st_mode)
+
+    # When
+    save_file(str(filename), PROJECT_DATA)
+
+    # Then
+    assert stat.S_IMODE(os.stat(str(filename)).st_mode) == expected
+
+
+@pytest.mark.parametrize("compression", ["gzip", "xz"])
+@pytest.mark.parametrize("name", ["yaml", "json", "binary"])
+def test_compressed_files_are_detected_by_magic(compression, name, tmpdir):
+    """ Compressed projects are read back in their format, whatever the name """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    written = CompressedSerializer(SERIALIZERS[name], COMPRESSIONS[compression])
+
+    # When
+    save_file(filename, PROJECT_DATA, written)
+    (data, serializer) = load_file(filename)
+    (cached, _) = load_file_cached(filename)
+
+    # Then
+    assert data == PROJECT_DATA
+    assert cached == PROJECT_DATA
+    assert serializer.serializer is SERIALIZERS[name]
+    assert serializer.compression is COMPRESSIONS[compression]
+    with open(filename, "rb") as file:
+        assert file.read(2) == COMPRESSIONS[compression].magic[:2]
+
+
+def test_compressed_project_is_streamed_and_smaller(tmpdir):
+    """ save_project() compresses the emitted YAML, deterministically """
+    # Given
+    project = ResearchProject("")
+    project.from_py(copy.deepcopy(PROJECT_DATA))
+    for _ in range(50):
+        project.add_plan()
+    plain = tmpdir.join("plain.gra")
+    save_project(str(plain), project)
+    compressed = CompressedSerializer(SERIALIZERS["yaml"], COMPRESSIONS["gzip"])
+
+    # When
+    save_project(str(tmpdir.join("one.gra.gz")), project, compressed)
+    save_project(str(tmpdir.join("two.gra.gz")), project, compressed)
+
+    # Then
+    first = tmpdir.join("one.gra.gz").read_binary()
+    assert first == tmpdir.join("two.gra.gz").read_binary()
+    assert len(first) < len(plain.read_binary()) / 4
+    assert load_file(str(tmpdir.join("one.gra.gz")))[0] == project.to_py()
+
+
+def test_corrupt_compressed_file_raises_format_error(tmpdir):
+    """ Truncated compressed data is reported like other broken files """
+    # Given
+    filename = tmpdir.join("broken.gra.xz")
+    compressed = CompressedSerializer(SERIALIZERS["yaml"], COMPRESSIONS["xz"])
+    save_file(str(filename), PROJECT_DATA, compressed)
+    filename.write_binary(filename.read_binary()[:40])
+
+    # Then
+    with pytest.raises(FormatError):
+        load_file(str(filename))
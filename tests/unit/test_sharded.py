@@ -0,0 +1,189 @@
+""" Tests for the sharded project layout """
+
+import os
+from grant.research import ResearchProject
+from grant.research import sharded
+from grant.research.serializers import load_file
+from grant.research.sharded import open_shards, save_sharded, shard_filename
+
+PROJECT_DATA = {
+    "version": "1.0",
+    "gedcom": "test.ged",
+    "plans": [
+        {
+            "id": 1,
+            "ancestor": "A",
+            "ancestor_link": "@I1@",
+            "goal": "Goal A",
+            "tasks": [
+                {"id": 2, "source": "S1", "source_link": "@S1@", "result": None},
+                {"id": 3, "source": "S2", "result": {"nil": True, "summary": ""}},
+            ],
+        },
+        {"id": 4, "ancestor": "B", "goal": "Goal B", "tasks": []},
+    ],
+}
+
+
+def _saved_project(filename) -> ResearchProject:
+    """ Saves PROJECT_DATA as shards and returns the saved project """
+    project = ResearchProject(str(filename))
+    project.from_py(PROJECT_DATA)
+    save_sharded(str(filename), project)
+    return project
+
+
+def _open(filename) -> ResearchProject:
+    """ Loads a sharded project like the file manager does """
+    (data, _) = load_file(str(filename))
+    assert open_shards(str(filename), data)
+    project = ResearchProject(str(filename))
+    project.from_py(data, lazy=True)
+    return project
+
+
+def _writes(monkeypatch) -> list:
+    """ Records the names of the files save_sharded writes """
+    written = []
+    save_file = sharded.save_file
+
+    def recording_save_file(filename, data, serializer):
+        written.append(os.path.basename(filename))
+        save_file(filename, data, serializer)
+
+    monkeypatch.setattr(sharded, "save_file", recording_save_file)
+    return written
+
+
+def test_sharded_project_round_trips(tmpdir):
+    """ Loading the index and its shards gives back the same project """
+    # Given
+    filename = tmpdir.join("project.gra")
+    saved = _saved_project(filename)
+
+    # When
+    project = _open(filename)
+
+    # Then
+    assert project.to_py() == saved.to_py()
+    assert os.path.exists(shard_filename(str(filename), 4))
+
+
+def test_shards_are_only_read_when_the_plan_is_used(tmpdir):
+    """ Opening reads the index only, the stats come from its summaries """
+    # Given
+    filename = tmpdir.join("project.gra")
+    _saved_project(filename)
+    os.remove(shard_filename(str(filename), 4))
+
+    # When
+    project = _open(filename)
+    goal = project.plans[0].goal
+
+    # Then
+    assert goal == "Goal A"
+    assert project.stats.tasks == 2
+    assert project.stats.nil == 1
+    assert project.stats.linked_sources == 1
+    assert project.plans[0].task_count() == 2
+    assert not project.plans[1].is_materialized()
+    assert project.plans[1].task_count() == 0
+
+
+def test_only_changed_shards_are_rewritten(tmpdir, monkeypatch):
+    """ Given the changed plans, the other shards are left alone """
+    # Given
+    filename = tmpdir.join("project.gra")
+    _saved_project(filename)
+    project = _open(filename)
+    project.plans[1].goal = "New goal"
+    written = _writes(monkeypatch)
+
+    # When
+    save_sharded(str(filename), project, changed={4})
+
+    # Then
+    assert written == ["4.gra", "project.gra"]
+    assert _open(filename).plans[1].goal == "New goal"
+
+
+def test_shards_of_deleted_plans_are_removed(tmpdir):
+    """ A plan that is gone loses its shard """
+    # Given
+    filename = tmpdir.join("project.gra")
+    project = _saved_project(filename)
+
+    # When
+    project.delete_plan(0)
+    save_sharded(str(filename), project, changed=set())
+
+    # Then
+    assert not os.path.exists(shard_filename(str(filename), 1))
+    assert [plan.id for plan in _open(filename).plans] == [4]
+
+
+def test_unreadable_shard_is_reported_instead_of_raised(tmpdir):
+    """ A broken shard gives an empty plan and its error goes to on_error """
+    # Given
+    filename = tmpdir.join("project.gra")
+    _saved_project(filename)
+    with open(shard_filename(str(filename), 1), "w") as file:
+        file.write("plans: [\n")
+    (data, _) = load_file(str(filename))
+    errors = []
+    open_shards(str(filename), data, errors.append)
+    project = ResearchProject(str(filename))
+    project.from_py(data, lazy=True)
+
+    # When
+    tasks = project.plans[0].tasks
+    goal = project.plans[0].goal
+
+    # Then
+    assert tasks == []
+    assert goal == ""
+    assert len(errors) == 1
+    assert "1.gra" in errors[0]
+
+
+def test_unreadable_shard_keeps_its_summary_but_not_its_stats(tmpdir):
+    """ The tasks of a broken shard aren't counted, nor dropped from the index """
+    # Given
+    filename = tmpdir.join("project.gra")
+    _saved_project(filename)
+    with open(shard_filename(str(filename), 1), "w") as file:
+        file.write("plans: [\n")
+    project = _open(filename)
+
+    # When
+    project.plans[0].materialize()
+    save_sharded(str(filename), project, changed=set())
+
+    # Then
+    assert project.plans[0].load_error() is not None
+    assert project.unreadable_plans() == [project.plans[0]]
+    assert project.stats.tasks == 0
+    (data, _) = load_file(str(filename))
+    assert data["plans"][0]["summary"]["tasks"] == 2
+
+
+def test_tasks_are_found_without_reading_the_shards(tmpdir):
+    """ The index lists the task IDs, so a lookup reads only the right shard """
+    # Given
+    filename = tmpdir.join("project.gra")
+    _saved_project(filename)
+    project = _open(filename)
+    os.remove(shard_filename(str(filename), 4))  # Reading it would fail
+
+    # When
+    missing = project.find(7)
+    task = project.find(3)
+
+    # Then
+    assert missing is None
+    assert task is project.plans[0].tasks[1]
+    assert project.plans[0].is_materialized()
+    assert project.plans[1].load_error() is None
+    (data, _) = load_file(str(filename))
+    assert data["plans"][0]["task_ids"] == [2, 3]
+    assert data["plans"][1]["task_ids"] == []
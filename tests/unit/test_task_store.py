@@ -0,0 +1,174 @@
+""" Tests related to the columnar TaskStore """
+
+import datetime
+from grant.research import ResearchProject, ResearchTask, ResearchResult
+from grant.research.task_store import TaskStore, TaskView, OPEN, SUCCESS, NIL
+
+PROJECT_DATA = {
+    "version": "1.0",
+    "gedcom": "",
+    "plans": [
+        {
+            "id": 1,
+            "ancestor": "Ancestor",
+            "ancestor_link": "@I1@",
+            "goal": "Goal",
+            "tasks": [
+                {
+                    "id": 2,
+                    "source": "Census",
+                    "source_link": "@S1@",
+                    "description": "Find the household",
+                    "result": None,
+                },
+                {
+                    "id": 3,
+                    "source": "Parish Register",
+                    "source_link": "",
+                    "description": "<p>Find the baptism</p>",
+                    "result": {
+                        "date": datetime.datetime(2020, 1, 2, 3, 4, 5),
+                        "document": "Page 1",
+                        "summary": "Baptised",
+                        "nil": False,
+                    },
+                },
+            ],
+        },
+        {"id": 4, "ancestor": "Other", "ancestor_link": "", "goal": "", "tasks": []},
+    ],
+}
+
+
+def columnar_project(lazy=False) -> ResearchProject:
+    """ Loads PROJECT_DATA into a project with a task store """
+    project = ResearchProject("", TaskStore())
+    project.from_py(PROJECT_DATA, lazy=lazy)
+    return project
+
+
+def test_columnar_conversion_matches_object_conversion():
+    """ to_py() is the same whether the tasks are objects or rows """
+    # Given
+    objects = ResearchProject("")
+    objects.from_py(PROJECT_DATA)
+
+    # When
+    project = columnar_project()
+
+    # Then
+    assert project.to_py() == objects.to_py()
+    assert project.store.description[1] == "Find the baptism"
+
+
+def test_lazy_plans_fill_the_store_when_materialized():
+    """ A lazy plan only adds its rows when the tasks are first used """
+    # Given
+    project = columnar_project(lazy=True)
+    assert len(project.store) == 0
+
+    # When
+    tasks = project.plans[0].tasks
+
+    # Then
+    assert len(tasks) == 2
+    assert len(project.store) == 2
+
+
+def test_task_views_write_through_to_the_columns():
+    """ Changing a task view changes its row """
+    # Given
+    project = columnar_project()
+    task = project.plans[0].tasks[0]
+
+    # When
+    task.source = "Tax List"
+    task.result = ResearchResult(False)
+    task.result.summary = "Not found"
+
+    # Then
+    assert isinstance(task, TaskView)
+    assert project.store.source[0] == "Tax List"
+    assert project.store.status[0] == NIL
+    assert project.plans[0].tasks[0].result.summary == "Not found"
+    assert not project.plans[0].tasks[0].is_open()
+
+
+def test_clearing_the_result_reopens_the_task():
+    """ Setting the result to None marks the row as open """
+    # Given
+    project = columnar_project()
+    task = project.plans[0].tasks[1]
+
+    # When
+    task.result = None
+
+    # Then
+    assert task.is_open()
+    assert task.to_py()["result"] is None
+
+
+def test_add_and_delete_task_update_the_plan_rows():
+    """ Tasks added to a plan get new rows, deleted ones are marked """
+    # Given
+    project = columnar_project()
+    plan = project.plans[1]
+
+    # When
+    task = plan.add_task()
+    task.description = "New"
+    project.plans[0].delete_task(0)
+
+    # Then
+    assert [task.description for task in plan.tasks] == ["New"]
+    assert len(project.plans[0].tasks) == 1
+    assert project.plans[0].tasks[0].source == "Parish Register"
+    assert list(project.store.rows()) == [1, 2]
+
+
+def test_reinserted_task_revives_its_row():
+    """ Putting a deleted task view back into a plan reuses its row """
+    # Given
+    project = columnar_project()
+    tasks = project.plans[0].tasks
+    task = tasks[0]
+    del tasks[0]
+
+    # When
+    tasks.insert(0, task)
+
+    # Then
+    assert tasks[0] == task
+    assert len(project.store) == 2
+    assert project.store.count_status(OPEN) == 1
+
+
+def test_plain_tasks_are_copied_into_the_store():
+    """ Appending a ResearchTask copies its fields into a new row """
+    # Given
+    project = columnar_project()
+    task = ResearchTask()
+    task.source = "Newspaper"
+    task.result = ResearchResult(True)
+
+    # When
+    project.plans[1].tasks.append(task)
+
+    # Then
+    assert project.store.source[2] == "Newspaper"
+    assert project.store.status[2] == SUCCESS
+    assert project.plans[1].tasks[0].to_py() == task.to_py()
+
+
+def test_deleting_a_plan_takes_its_tasks_out_of_the_store():
+    """ The rows of a deleted plan are no longer counted """
+    # Given
+    project = columnar_project()
+
+    # When
+    project.delete_plan(0)
+
+    # Then
+    assert list(project.store.rows()) == []
+    assert project.store.count_status(OPEN) == 0
+    assert project.store.count_status(SUCCESS) == 0
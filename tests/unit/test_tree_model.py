@@ -6,6 +6,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from grant.models.tree_model import TreeModel, TreeModelCols
 from grant.research import ResearchProject, ResearchPlan, ResearchTask, ResearchResult
+from grant.research.task_store import TaskStore
 
 
 def test_model_checker(qtmodeltester):
@@ -342,7 +343,7 @@ def test_setdata_updates_result():
     task_index = model.index(0, 2, plan_index)
 
     result = ResearchResult(True)
-    result.description = "Test"
+    result.summary = "Test"
 
     # When
     retval = model.setData(task_index, result)
@@ -562,3 +563,245 @@ def test_flags_not_editable_for_ancestor_column():
     # Then
     assert model.flags(plan_index) & Qt.ItemIsEditable != Qt.ItemIsEditable
     assert model.flags(task_index) & Qt.ItemIsEditable != Qt.ItemIsEditable
+
+
+def test_setdata_fires_signal_for_changed_result(qtbot):
+    """ A new result with other values than the current one is a change """
+    # Given
+    model = TreeModel()
+    project = ResearchProject("")
+    project.add_plan().add_task()
+    result = ResearchResult(True)
+    project.plans[0].tasks[0].result = result
+
+    model.set_project(project)
+    plan_index = model.index(0, 0, model.plans_index)
+    task_index = model.index(0, TreeModelCols.RESULT, plan_index)
+    changed = ResearchResult(True)
+    changed.date = result.date
+    changed.summary = "Found it"
+
+    # When
+    with qtbot.waitSignal(model.dataChanged):
+        model.setData(task_index, changed)
+
+
+def test_text_of_lazy_plan_does_not_materialize():
+    """ Displaying a plan's ancestor does not convert its goal and tasks """
+    # Given
+    project = ResearchProject("")
+    project.from_py(
+        {"version": "1.0", "plans": [{"ancestor": "ANCESTOR", "tasks": [{}]}]},
+        lazy=True,
+    )
+    model = TreeModel()
+    model.set_project(project)
+    index = model.index(0, TreeModelCols.TEXT, QModelIndex())
+
+    # When
+    text = model.data(index, Qt.DisplayRole)
+
+    # Then
+    assert text == "ANCESTOR"
+    assert not project.plans[0].is_materialized()
+
+
+def test_columnar_project_is_edited_through_the_model():
+    """ Adding, changing and deleting tasks works on a task store """
+    # Given
+    project = ResearchProject("", TaskStore())
+    project.add_plan()
+    model = TreeModel()
+    model.set_project(project)
+    plan_index = model.index(0, 0, model.plans_index)
+
+    # When
+    model.add_node(plan_index)
+    model.add_node(plan_index)
+    model.setData(model.index(1, TreeModelCols.TEXT, plan_index), "Second")
+    model.delete_node(model.index(0, 0, plan_index))
+
+    # Then
+    assert model.rowCount(plan_index) == 1
+    text_index = model.index(0, TreeModelCols.TEXT, plan_index)
+    assert model.data(text_index, Qt.DisplayRole) == "Second"
+    assert project.store.source == ["", "Second"]
+    assert list(project.store.rows()) == [1]
+
+
+def test_set_data_marks_only_real_changes():
+    """ Edits are recorded in the project's change set, unchanged values aren't """
+    # Given
+    project = ResearchProject("")
+    plan = project.add_plan()
+    task = plan.add_task()
+    project.checkpoint()
+    model = TreeModel()
+    model.set_project(project)
+    plan_index = model.index(0, 0, model.plans_index)
+
+    # When
+    model.setData(model.index(0, TreeModelCols.TEXT, model.plans_index), plan.ancestor)
+    model.setData(model.index(0, TreeModelCols.TEXT, plan_index), "Census")
+
+    # Then
+    assert project.changes.modified == {task.id: "task"}
+    assert project.changes.changed_plans() == {plan.id}
+
+
+def _model_for_undo(store=None):
+    """ A model with one plan holding two tasks """
+    project = ResearchProject("", store)
+    plan = project.add_plan()
+    plan.add_task().source = "First"
+    plan.add_task().source = "Second"
+    model = TreeModel()
+    model.set_project(project)
+    return model
+
+
+def test_undo_and_redo_set_data(qtbot):
+    """ A changed value is put back and reapplied through dataChanged """
+    # Given
+    model = _model_for_undo()
+    plan_index = model.index(0, 0, model.plans_index)
+    task_index = model.index(0, TreeModelCols.TEXT, plan_index)
+    model.setData(task_index, "Census")
+
+    # When
+    with qtbot.waitSignal(model.dataChanged):
+        model.undo()
+    undone = model.data(task_index, Qt.DisplayRole)
+    model.redo()
+
+    # Then
+    assert undone == "First"
+    assert model.data(task_index, Qt.DisplayRole) == "Census"
+    assert not model.undo_stack.can_redo()
+
+
+@pytest.mark.parametrize("store", [None, TaskStore()])
+def test_undo_restores_results(store):
+    """ Results are restored from a copy, also for task store rows """
+    # Given
+    model = _model_for_undo(store)
+    plan_index = model.index(0, 0, model.plans_index)
+    task_index = model.index(0, TreeModelCols.RESULT, plan_index)
+    first = ResearchResult(True)
+    first.summary = "Found"
+    model.setData(task_index, first)
+    model.setData(task_index, ResearchResult(False))
+
+    # When
+    model.undo()
+
+    # Then
+    result = model.data(task_index, Qt.DisplayRole)
+    assert result.summary == "Found"
+    assert not result.is_nil()
+
+
+def test_undo_delete_puts_the_task_back_in_place(qtbot):
+    """ A deleted task comes back at its row, with its ID, without a reset """
+    # Given
+    model = _model_for_undo()
+    plan = model.project.plans[0]
+    task_id = plan.tasks[0].id
+    plan_index = model.index(0, 0, model.plans_index)
+    model.delete_node(model.index(0, 0, plan_index))
+
+    # When
+    with qtbot.assertNotEmitted(model.modelReset):
+        with qtbot.waitSignal(model.rowsInserted):
+            model.undo()
+
+    # Then
+    assert [task.source for task in plan.tasks] == ["First", "Second"]
+    assert plan.tasks[0].id == task_id
+    assert model.project.find(task_id) is plan.tasks[0]
+    assert model.data(model.index(0, 0, plan_index), Qt.DisplayRole) == "First"
+
+
+def test_undo_add_removes_the_plan_and_redo_restores_it():
+    """ Undoing an added plan deletes it, redoing brings back the same plan """
+    # Given
+    model = _model_for_undo()
+    model.add_node(model.plans_index)
+    plan_id = model.project.plans[1].id
+
+    # When
+    model.undo()
+    count = len(model.project.plans)
+    model.redo()
+
+    # Then
+    assert count == 1
+    assert [plan.id for plan in model.project.plans][1] == plan_id
+    assert model.rowCount(model.plans_index) == 2
+
+
+def test_undo_of_deleted_plan_keeps_later_steps_working():
+    """ Edits of a plan's tasks can be undone after the plan was restored """
+    # Given
+    model = _model_for_undo()
+    plan_index = model.index(0, 0, model.plans_index)
+    model.setData(model.index(1, TreeModelCols.TEXT, plan_index), "Changed")
+    model.delete_node(plan_index)
+
+    # When
+    model.undo()
+    model.undo()
+
+    # Then
+    tasks = model.project.plans[0].tasks
+    assert [task.source for task in tasks] == ["First", "Second"]
+    assert not model.undo_stack.can_undo()
+
+
+def test_set_project_clears_the_undo_stack():
+    """ Edits of another project can't be undone """
+    # Given
+    model = _model_for_undo()
+    model.add_node(model.plans_index)
+
+    # When
+    model.set_project(ResearchProject(""))
+
+    # Then
+    assert not model.undo_stack.can_undo()
+
+
+def test_set_project_keeps_the_undo_stack_of_the_same_project():
+    """ Showing the same project again, e.g. after Save As, keeps its edits """
+    # Given
+    model = _model_for_undo()
+    model.add_node(model.plans_index)
+
+    # When
+    model.set_project(model.project)
+    model.undo()
+
+    # Then
+    assert len(model.project.plans) == 1
+
+
+def test_setting_an_equal_result_is_not_an_edit():
+    """ A new result with the values of the current one changes nothing """
+    # Given
+    model = _model_for_undo()
+    plan_index = model.index(0, 0, model.plans_index)
+    task_index = model.index(0, TreeModelCols.RESULT, plan_index)
+    result = ResearchResult(True)
+    result.summary = "Found"
+    model.setData(task_index, result)
+    same = ResearchResult(True)
+    same.summary = "Found"
+    same.date = result.date
+
+    # When
+    model.setData(task_index, same)
+    model.undo()
+
+    # Then
+    assert model.data(task_index, Qt.DisplayRole) is None
+    assert not model.undo_stack.can_undo()
@@ -3,6 +3,9 @@
 from types import SimpleNamespace
 import pytest
 from grant.models.tree_node import TreeNode
+from grant.research import ResearchPlan
+from grant.research import ResearchProject
+from grant.research import ResearchResult
 
 
 def test_empty_icon_returned_for_unknown_node_type():
@@ -155,3 +158,90 @@ def test_is_complete_false_for_plan_if_task_open():
 
     # Then
     assert retval is False
+
+
+def test_delete_child_renumbers_following_rows():
+    """ The rows of the remaining children match their new position """
+    # Given
+    project = ResearchProject("")
+    for _ in range(3):
+        project.add_plan()
+    node = TreeNode("plans", project, None, 0)
+
+    # When
+    node.delete_child(0)
+
+    # Then
+    assert [child.row for child in node.children] == [0, 1]
+
+
+def test_child_count_of_lazy_plan_does_not_materialize():
+    """ Counting the tasks of a lazily loaded plan leaves it unconverted """
+    # Given
+    plan = ResearchPlan()
+    plan.from_py({"tasks": [{}, {}, {}]}, lazy=True)
+    node = TreeNode("plan", plan, None, 0)
+
+    # When
+    count = node.child_count()
+
+    # Then
+    assert count == 3
+    assert not plan.is_materialized()
+
+
+def test_create_child_before_children_are_built():
+    """ A new child is only added once when the children were not yet built """
+    # Given
+    project = ResearchProject("")
+    project.add_plan()
+    node = TreeNode("plans", project, None, 0)
+
+    # When
+    node.create_child()
+
+    # Then
+    assert len(node.children) == 2
+    assert [child.row for child in node.children] == [0, 1]
+
+
+def test_set_text_and_link_intern_the_value():
+    """ Edited sources and links share the project's strings """
+    # Given
+    project = ResearchProject("")
+    plan = project.add_plan()
+    plan.add_task()
+    plan.add_task()
+    plans = TreeNode("plans", project, None, 2)
+    (first, second) = plans.children[0].children
+
+    # When
+    first.set_text("".join(["Cen", "sus"]))
+    second.set_text("".join(["Cen", "sus"]))
+    first.set_link("".join(["@S1", "@"]))
+    second.set_link("".join(["@S1", "@"]))
+
+    # Then
+    assert first.data.source is second.data.source
+    assert first.data.source_link is second.data.source_link
+
+
+def test_set_result_and_link_update_the_project_stats():
+    """ Completing and linking through the tree keeps the counts current """
+    # Given
+    project = ResearchProject("")
+    project.add_plan().add_task()
+    plans = TreeNode("plans", project, None, 2)
+    plan = plans.children[0]
+    task = plan.children[0]
+
+    # When
+    task.set_result(ResearchResult(True))
+    task.set_link("@S1@")
+    plan.set_link("@I1@")
+    task.set_result(ResearchResult(False))
+
+    # Then
+    stats = project.stats
+    assert (stats.open_tasks, stats.success, stats.nil) == (0, 0, 1)
+    assert (stats.linked_individuals, stats.linked_sources) == (1, 1)
@@ -0,0 +1,64 @@
+""" Tests for the UndoStack """
+
+from grant.models.undo_stack import UndoStack, estimate_size
+
+
+def test_new_edit_clears_redo(qtbot):
+    """ Redo is only possible until something else is edited """
+    # Given
+    stack = UndoStack()
+    stack.push(("delete", 1))
+    stack.push_redo(stack.take_undo())
+
+    # When
+    with qtbot.waitSignal(stack.changed):
+        stack.push(("delete", 2))
+
+    # Then
+    assert stack.can_undo()
+    assert not stack.can_redo()
+    assert stack.size == estimate_size(("delete", 2))
+
+
+def test_paused_stack_ignores_pushes():
+    """ Operations applied by undo and redo don't create new undo steps """
+    # Given
+    stack = UndoStack()
+
+    # When
+    with stack.pause():
+        stack.push(("delete", 1))
+
+    # Then
+    assert not stack.can_undo()
+
+
+def test_oldest_operations_are_dropped_past_the_limit():
+    """ The memory limit evicts the oldest undo steps first """
+    # Given
+    operation = ("set", 1, 0, "x" * 100)
+    stack = UndoStack(limit=estimate_size(operation) * 2)
+
+    # When
+    for item_id in range(3):
+        stack.push(("set", item_id, 0, "x" * 100))
+
+    # Then
+    assert [op[1] for (op, _) in stack.undo_operations] == [1, 2]
+    assert stack.size <= stack.limit
+
+
+def test_clear_forgets_everything():
+    """ A cleared stack has nothing to undo or redo """
+    # Given
+    stack = UndoStack()
+    stack.push(("delete", 1))
+    stack.push_redo(("delete", 2))
+
+    # When
+    stack.clear()
+
+    # Then
+    assert not stack.can_undo()
+    assert not stack.can_redo()
+    assert stack.size == 0
@@ -0,0 +1,189 @@
+""" Tests for building projects straight from the YAML events """
+
+import datetime
+import pytest
+import yaml
+from grant.research import ResearchProject
+from grant.research.journal import append_records
+from grant.research.serializers import SERIALIZERS, FormatError, save_file
+from grant.research.sharded import save_sharded
+from grant.research.task_store import TaskStore
+from grant.research.yaml_builder import build_project, is_buildable, load_project
+
+PROJECT = """
+gedcom: family.ged
+plans:
+- ancestor: William Fitzhugh (1801-1854)
+  ancestor_link: '@I1@'
+  goal: Identify any children
+  id: 1
+  tasks:
+  - id: 2
+    source: Granthill Church Books
+    source_link: '@S1@'
+    description: Check the baptisms
+    result:
+      date: 2020-01-02 03:04:05
+      document: '1234'
+      summary: nothing found
+      nil: true
+  - id: 3
+    source: 1851
+    description: Another task
+    result:
+- ancestor: Guillaume Demarre (1765-1808)
+  id: 4
+  tasks: []
+version: '1.0'
+"""
+
+
+def test_builds_same_project_as_from_py():
+    """ The builder creates the same objects as yaml.safe_load() and from_py() """
+    # Given
+    expected = ResearchProject("test.gra")
+    expected.from_py(yaml.safe_load(PROJECT))
+
+    # When
+    project = ResearchProject("test.gra")
+    sharded = build_project(PROJECT, project)
+
+    # Then
+    assert not sharded
+    assert not project.new_ids
+    assert project.to_py() == expected.to_py()
+    assert project.stats.tasks == expected.stats.tasks
+    assert project.stats.open_tasks == 1
+    result = project.plans[0].tasks[0].result
+    assert result.date == datetime.datetime(2020, 1, 2, 3, 4, 5)
+    assert result.document == "1234"
+    assert project.plans[0].tasks[1].source == 1851
+
+
+def test_unknown_keys_are_ignored():
+    """ Keys the research classes don't know are parsed and dropped """
+    # Given
+    text = (
+        "version: '1.0'\nextra: {a: [1, 2]}\nplans:\n- ancestor: Foo\n  colour: red\n"
+    )
+
+    # When
+    project = ResearchProject("")
+    build_project(text, project)
+
+    # Then
+    assert project.plans[0].ancestor == "Foo"
+    assert project.plans[0].tasks == []
+
+
+def test_aliases_are_resolved():
+    """ Anchored values can be referenced again """
+    # Given
+    text = "version: '1.0'\nplans:\n- ancestor: &name Foo\n  goal: *name\n"
+
+    # When
+    project = ResearchProject("")
+    build_project(text, project)
+
+    # Then
+    assert project.plans[0].goal == "Foo"
+
+
+def test_load_project_reads_file(tmpdir):
+    """ load_project() builds the project from the given file """
+    # Given
+    filename = tmpdir.join("project.gra")
+    filename.write(PROJECT)
+
+    project = ResearchProject(str(filename))
+
+    # When
+    load_project(str(filename), project)
+
+    # Then
+    assert len(project.plans) == 2
+
+
+def test_tasks_go_into_the_task_store():
+    """ A project with a task store gets its tasks as store rows """
+    # Given
+    expected = ResearchProject("test.gra")
+    expected.from_py(yaml.safe_load(PROJECT))
+    project = ResearchProject("test.gra", TaskStore())
+
+    # When
+    build_project(PROJECT, project)
+
+    # Then
+    assert len(project.store) == 2
+    assert project.to_py() == expected.to_py()
+
+
+def test_missing_ids_are_assigned():
+    """ Plans and tasks without an ID get one, and the project knows it """
+    # Given
+    text = "version: '1.0'\nplans:\n- ancestor: Foo\n  tasks: [{source: S1}]\n"
+
+    # When
+    project = ResearchProject("")
+    build_project(text, project)
+
+    # Then
+    assert project.new_ids
+    task = project.plans[0].tasks[0]
+    assert project.find(task.id) is task
+    assert project.ids.owner(task.id) is project.plans[0]
+
+
+def test_shard_index_gives_lazy_plans(tmpdir):
+    """ The plans of a shard index read their shard when they are used """
+    # Given
+    filename = str(tmpdir.join("project.gra"))
+    saved = ResearchProject(filename)
+    saved.from_py(yaml.safe_load(PROJECT))
+    save_sharded(filename, saved)
+    project = ResearchProject(filename)
+
+    # When
+    sharded = load_project(filename, project)
+
+    # Then
+    assert sharded
+    assert not project.plans[0].is_materialized()
+    assert project.stats.tasks == 2
+    assert project.to_py() == saved.to_py()
+
+
+def test_only_plain_yaml_without_journal_is_buildable(tmpdir):
+    """ Other formats, and journals which need the pythonic data, aren't """
+    # Given
+    yaml_file = str(tmpdir.join("project.gra"))
+    json_file = str(tmpdir.join("project.json"))
+    save_file(yaml_file, yaml.safe_load(PROJECT))
+    save_file(json_file, {"version": "1.0", "plans": []}, SERIALIZERS["json"])
+    buildable = is_buildable(yaml_file)
+
+    # When
+    append_records(yaml_file, [{"op": "plan", "id": 1}])
+
+    # Then
+    assert buildable
+    assert not is_buildable(yaml_file)
+    assert not is_buildable(json_file)
+    assert not is_buildable(str(tmpdir.join("missing.gra")))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "plans: []\n",  # No version
+        "- not a project\n",
+        "version: '1.0'\nplans: foo\n",
+        "version: '1.0'\nplans: [\n",
+        "version: '1.0'\nplans: [{tasks: [bar]}]\n",
+    ],
+)
+def test_invalid_project_raises_format_error(text):
+    """ Documents that are not a project raise a FormatError """
+    with pytest.raises(FormatError):
+        build_project(text, ResearchProject(""))
@@ -14,8 +14,9 @@ from grant.windows.result_dialog import ResultDialog
 class WindowDriver:
     """ Test class automating common steps """
 
-    def __init__(self, qtbot, monkeypatch):
+    def __init__(self, qtbot, monkeypatch, cache_directory: str):
         self.window = MainWindow()
+        self.window.gedcom_manager.cache_directory = cache_directory
         self.qtbot = qtbot
         self.monkeypatch = monkeypatch
 
@@ -54,7 +55,8 @@ class WindowDriver:
             "getOpenFileName",
             lambda _, __, ___, ____: (str(filename), False),
         )
-        self.window.menu_bar.gedcom_link_action.trigger()
+        with self.qtbot.waitSignal(self.window.gedcom_manager.link_loaded):
+            self.window.menu_bar.gedcom_link_action.trigger()
         assert self.window.project_manager.project.gedcom == filename
 
     def unlink_gedcom(self):
@@ -132,9 +134,9 @@ class WindowDriver:
 
 
 @pytest.fixture
-def window_driver(qtbot, monkeypatch):
+def window_driver(qtbot, monkeypatch, tmpdir):
     """ Create a main_window """
-    driver = WindowDriver(qtbot, monkeypatch)
+    driver = WindowDriver(qtbot, monkeypatch, str(tmpdir.join("gedcom_cache")))
     qtbot.addWidget(driver.window)
     driver.window.show()
     return driver